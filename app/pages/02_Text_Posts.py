@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from pathlib import Path
 
-import pandas as pd
 import streamlit as st
 
-from services.ai_news_service import load_queue
+from services.dashboard_cache import queue_page, queue_values, text_posts_frame
 from services.theme_manager import theme_toggle
-from ui_utils import inject_global_styles
+from ui_utils import image_preview, inject_global_styles, paginate, queue_filters
+from xseller_ai.models import QueueQuery
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 
@@ -16,39 +17,40 @@ theme_toggle(default="dark")
 inject_global_styles()
 st.title("✍️ Text + Image Posts")
 
-queue_data = load_queue()
-queue_items = queue_data.get("items", [])
-text_posts = [item for item in queue_items if item.get("type") in {"text_post", "text", "caption"}]
+post_total = queue_page(QueueQuery(kind="text_posts", limit=0)).total
 col1, col2 = st.columns([3, 1])
-col1.metric("Draft Posts", len(text_posts))
+col1.metric("Draft Posts", post_total)
 col2.caption("Auto-generated from the top AI stories in the last 24 hours.")
 
 st.write("---")
 
-if not text_posts:
+if not post_total:
     st.info("No text posts generated yet. Run the pipeline to summarise fresh articles.")
 else:
+    query = queue_filters(
+        "text_posts",
+        statuses=queue_values("text_posts", "status"),
+        sources=queue_values("text_posts", "source"),
+        key="text_posts",
+    )
+    offset, limit = paginate(queue_page(replace(query, limit=0)).total, key="text_posts", page_sizes=(10, 25, 50))
+    # Only the current page's captions and images are rendered.
+    text_posts = queue_page(replace(query, offset=offset, limit=limit)).items
+    if not text_posts:
+        st.caption("No posts match these filters.")
     for post in text_posts:
-        with st.expander(post.get("story_title", "AI Update"), expanded=False):
-            for platform, payload in post.get("platforms", {}).items():
+        with st.expander(post.story_title or "AI Update", expanded=False):
+            for platform, payload in post.platforms.items():
                 st.markdown(f"### {platform}")
                 st.write(payload.get("caption", ""))
                 image_path = payload.get("image_path")
                 if image_path and Path(image_path).exists():
-                    st.image(image_path)
+                    image_preview(image_path, key=f"{post.id}_{platform}")
                 elif prompt := payload.get("image_prompt"):
                     st.caption(f"Prompt: {prompt}")
                 st.divider()
 
-    df = pd.DataFrame(
-        [
-            {
-                "Story": post.get("story_title"),
-                "Platforms": ", ".join(post.get("platforms", {}).keys()),
-            }
-            for post in text_posts
-        ]
-    )
+    df = text_posts_frame()
     st.download_button(
         "⬇️ Export summary CSV",
         df.to_csv(index=False).encode("utf-8"),
@@ -1,17 +1,22 @@
 import json
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
 import streamlit as st
 
 from app.services import buffer_client, getlate_client, publer_client
+from services.dashboard_cache import publish_queue, rendered_videos
 from services.theme_manager import theme_toggle
+from services.schedule import suggest_slot
 from services.publish_service import (
     PROVIDERS,
+    active_workers,
     enqueue_post,
-    process_queue,
     _last_provider,
 )
 from ui_utils import inject_global_styles
+from xseller_ai.archive import archive_root, query_archive
+from xseller_ai.storage import read_json
 
 st.set_page_config(page_title="Social Posts", page_icon="📣", layout="wide")
 theme_toggle(default="dark")
@@ -21,8 +26,6 @@ st.title("📣 Multi-Provider Social Posts")
 APP_ROOT = Path(__file__).resolve().parents[1]
 DATA = APP_ROOT / "data"
 CONFIG = APP_ROOT / "config" / "channels.json"
-DB = DATA / "ai_shorts_db.json"
-QUEUE = DATA / "publish_queue.json"
 
 if CONFIG.exists():
     channel_meta = {item["id"]: item for item in json.loads(CONFIG.read_text(encoding="utf-8"))}
@@ -30,24 +33,6 @@ else:
     channel_meta = {}
 
 
-def load_db() -> list:
-    if DB.exists():
-        try:
-            return json.loads(DB.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            return []
-    return []
-
-
-def load_queue() -> dict:
-    if QUEUE.exists():
-        try:
-            return json.loads(QUEUE.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            return {"items": []}
-    return {"items": []}
-
-
 current_provider = st.session_state.get("provider", _last_provider())
 
 provider = st.selectbox(
@@ -59,7 +44,7 @@ st.session_state["provider"] = provider
 
 if provider == "getlate" and not getlate_client.GETLATE_KEY:
     st.warning("GetLate API key missing — posts will remain in queue until configured.")
-elif provider == "buffer" and (not buffer_client.BUFFER_TOKEN or not buffer_client.BUFFER_PROFILE):
+elif provider == "buffer" and (not buffer_client.BUFFER_TOKEN or not (buffer_client.BUFFER_PROFILE or buffer_client.BUFFER_PROFILES)):
     st.warning("Buffer credentials missing — set BUFFER_ACCESS_TOKEN and BUFFER_PROFILE_ID.")
 elif provider == "publer" and not publer_client.PUBLER_KEY:
     st.warning("Publer API key missing — enable PUBLER_API_KEY and PUBLER_WORKSPACE_ID.")
@@ -68,8 +53,7 @@ col1, col2 = st.columns([2, 1])
 
 with col1:
     st.subheader("Rendered Videos")
-    items = load_db()
-    videos = [item for item in items if item.get("render", {}).get("mp4_url")]
+    videos = rendered_videos()
     if not videos:
         st.info("No rendered videos yet.")
     else:
@@ -98,31 +82,71 @@ with col1:
             format_func=lambda pid: label_map.get(pid, pid.title()),
             default=["instagram", "tiktok"],
         )
+        timing = st.radio("When", ["As soon as possible", "Next optimal slot", "Pick a time"], horizontal=True)
+        scheduled_at = None
+        if timing == "Next optimal slot" and platforms:
+            scheduled_at = suggest_slot(platforms, publish_queue().get("items", []))
+            st.caption(f"Next free slot: {scheduled_at:%a %d %b, %H:%M} UTC")
+        elif timing == "Pick a time":
+            pick_day = st.date_input("Post on", value=date.today())
+            pick_time = st.time_input("At (UTC)", value=datetime.now(timezone.utc).time().replace(second=0, microsecond=0))
+            scheduled_at = datetime.combine(pick_day, pick_time, tzinfo=timezone.utc)
         disabled = not platforms
         if st.button("Enqueue Post", disabled=disabled):
-            enqueue_post(
+            queued = enqueue_post(
                 chosen["id"],
                 chosen.get("title", "Untitled"),
                 caption,
                 [chosen["render"]["mp4_url"]],
                 platforms,
                 provider,
+                scheduled_at=scheduled_at,
             )
-            st.success(f"✅ Queued for {provider.title()}!")
+            if queued and scheduled_at:
+                st.success(f"✅ Scheduled for {scheduled_at:%a %d %b, %H:%M} UTC via {provider.title()}!")
+            elif queued:
+                st.success(f"✅ Queued for {provider.title()}!")
+            else:
+                st.info("This post is already queued or was already sent.")
 
 with col2:
     st.subheader("Publish Queue")
-    if st.button("Process Queue Now"):
-        process_queue(provider)
-        st.success(f"Queue processed using {provider.title()}")
-    queue = load_queue()
+    workers = active_workers()
+    if workers:
+        inflight = sum(info.get("inflight", 0) for info in workers.values())
+        st.caption(f"{len(workers)} publish worker(s) running, {inflight} post(s) in flight.")
+    else:
+        st.warning("No publish worker running. Start one with `python pipelines/publish_worker.py`.")
+    provider_health = read_json(DATA / "provider_health.json", {})
+    unhealthy = [name for name, info in provider_health.items() if info.get("state") != "closed"]
+    if unhealthy:
+        st.warning(f"Circuit open for {', '.join(unhealthy)}; posts are failing over to other providers.")
+    if st.button("Refresh"):
+        st.rerun()
+    queue = publish_queue()
     if not queue.get("items"):
         st.caption("Queue is empty.")
     else:
         for entry in queue.get("items", []):
             pretty_platforms = ", ".join(label_map.get(pid, pid.title()) for pid in entry.get("platforms", []))
-            st.write(
-                f"{entry['title']} → {pretty_platforms} → {entry['status']} ({entry.get('provider', '-')})"
-            )
+            via = entry.get("provider", "-")
+            if entry.get("handled_by") and entry["handled_by"] != via:
+                via = f"{entry['handled_by']}, failed over from {via}"
+            st.write(f"{entry['title']} → {pretty_platforms} → {entry['status']} ({via})")
             if entry.get("error"):
                 st.caption(entry["error"])
+            if entry.get("status") == "queued" and entry.get("lease_owner"):
+                st.caption(f"Publishing on {entry['lease_owner']}")
+            elif entry.get("status") == "queued" and entry.get("retry_at"):
+                st.caption(f"Retry {entry.get('attempts', 0) + 1} scheduled for {entry['retry_at']}")
+            elif entry.get("status") == "queued" and entry.get("scheduled_at"):
+                st.caption(f"Scheduled for {entry['scheduled_at']}")
+
+    with st.expander("Archived posts", expanded=False):
+        since = st.date_input("Since", value=date.today() - timedelta(days=7))
+        if st.button("Load archive"):
+            archived = list(query_archive("publish_queue", since=since, limit=200, root=archive_root(DATA)))
+            if not archived:
+                st.caption("No archived posts in this range.")
+            for entry in archived:
+                st.write(f"{entry['title']} → {entry['status']} ({entry.get('provider', '-')}, {entry.get('finished_at', '-')})")
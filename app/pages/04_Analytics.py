@@ -1,9 +1,8 @@
 from __future__ import annotations
 import altair as alt
-import pandas as pd
 import streamlit as st
 
-from services.analytics_service import load_summary
+from services.dashboard_cache import analytics_frame, analytics_summary
 from services.theme_manager import theme_toggle
 from ui_utils import inject_global_styles
 
@@ -12,21 +11,24 @@ theme_toggle(default="dark")
 inject_global_styles()
 st.title("📊 Performance Analytics")
 
-analytics = load_summary()
+analytics = analytics_summary()
 if not analytics:
-    st.info("Analytics summary not found. Populate `app/data/analytics_summary.json` to enable charts.")
+    st.info(
+        "Analytics summary not found. Drop platform exports into `app/data/analytics_exports/` "
+        "and run `python -m xseller_ai.analytics refresh`."
+    )
     st.stop()
 metrics = analytics.get("metrics", {})
 col1, col2, col3 = st.columns(3)
-col1.metric("Retention @ 75%", f"{metrics.get('retention', 0):.0%}")
+# Rates are in percent, as written by xseller_ai.analytics and shown on the home page.
+col1.metric("Retention @ 75%", f"{metrics.get('retention', 0):.1f} %")
 col2.metric("Shares / 1K Views", f"{metrics.get('shares', 0):.1f}")
-col3.metric("Follower Conversion", f"{metrics.get('follower_conversion', 0):.1%}")
+col3.metric("Follower Conversion", f"{metrics.get('follower_conversion', 0):.2f} %")
 
 st.write("---")
 
-posts_data = analytics.get("daily_posts", [])
-if posts_data:
-    df_posts = pd.DataFrame(posts_data)
+df_posts = analytics_frame("daily_posts")
+if not df_posts.empty:
     chart_posts = (
         alt.Chart(df_posts)
         .mark_bar(cornerRadiusTopLeft=6, cornerRadiusTopRight=6)
@@ -37,9 +39,8 @@ if posts_data:
 else:
     st.warning("Daily posts data unavailable.")
 
-platform_views = analytics.get("platform_views", [])
-if platform_views:
-    df_views = pd.DataFrame(platform_views)
+df_views = analytics_frame("platform_views")
+if not df_views.empty:
     chart_views = (
         alt.Chart(df_views)
         .mark_area(line={"color": "#00b894"}, color="#00b89430")
@@ -60,5 +61,5 @@ if comments := analytics.get("feedback", []):
 else:
     st.caption("Add `feedback` entries inside analytics_summary.json to surface AI learning comments.")
 
-csv = pd.DataFrame(posts_data).to_csv(index=False).encode("utf-8") if posts_data else b""
+csv = df_posts.to_csv(index=False).encode("utf-8") if not df_posts.empty else b""
 st.download_button("⬇️ Export daily posts CSV", csv, file_name="analytics_daily_posts.csv", disabled=not csv)
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 
 import streamlit as st
 
 from services.theme_manager import theme_toggle
 from ui_utils import inject_global_styles
+from xseller_ai.storage import atomic_write_json, locked_json, read_json
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 LEARNING_PATH = DATA_DIR / "learning_log.json"
@@ -16,11 +16,9 @@ theme_toggle(default="dark")
 inject_global_styles()
 st.title("🧠 AI Learning Loop")
 
-if LEARNING_PATH.exists():
-    entries = json.loads(LEARNING_PATH.read_text(encoding="utf-8"))
-else:
-    entries = []
-    LEARNING_PATH.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+entries = read_json(LEARNING_PATH, [])
+if not LEARNING_PATH.exists():
+    atomic_write_json(LEARNING_PATH, entries)
 
 col1, col2 = st.columns([2, 1])
 with col1:
@@ -41,15 +39,15 @@ with col2:
     result = st.selectbox("Outcome", ["Win", "Neutral", "Miss"])
     summary = st.text_area("Summary")
     if st.button("Save Insight") and title and summary:
-        entries.append(
-            {
-                "title": title,
-                "hook_style": hook_style,
-                "result": result,
-                "summary": summary,
-            }
-        )
-        LEARNING_PATH.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+        with locked_json(LEARNING_PATH, []) as stored:
+            stored.append(
+                {
+                    "title": title,
+                    "hook_style": hook_style,
+                    "result": result,
+                    "summary": summary,
+                }
+            )
         st.success("Learning logged.")
         st.experimental_rerun()
 
@@ -2,11 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 
-import pandas as pd
 import streamlit as st
 
+from services.dashboard_cache import hook_lab_count, hook_lab_page, hook_lab_styles, hook_lab_top
 from services.theme_manager import theme_toggle
-from ui_utils import inject_global_styles
+from ui_utils import inject_global_styles, paginate
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 HOOKS_PATH = DATA_DIR / "hooks_lab.csv"
@@ -18,25 +18,27 @@ st.title("🧪 Hook Lab")
 
 if not HOOKS_PATH.exists():
     st.info("hooks_lab.csv not found. Populate it with weekly hook experiments.")
-    df = pd.DataFrame(
-        columns=["date", "story_title", "hook_style", "hook_text", "retention_3s", "ctr", "keep_or_kill"]
-    )
-else:
-    df = pd.read_csv(HOOKS_PATH)
+total = hook_lab_count()
 
-if df.empty:
+if not total:
     st.warning("No hook experiments logged yet.")
 else:
-    st.dataframe(df, use_container_width=True, height=400)
-    top_hooks = df.sort_values(by="retention_3s", ascending=False).head(5)
+    offset, limit = paginate(total, key="hook_lab")
+    st.dataframe(hook_lab_page(offset, limit), use_container_width=True, height=400)
+
+    st.subheader("Hook Styles")
+    st.dataframe(hook_lab_styles(), use_container_width=True, hide_index=True)
+
     st.subheader("Top Retention Hooks")
-    for _, row in top_hooks.iterrows():
+    for row in hook_lab_top(5):
         st.markdown(f"**{row['hook_style']}** — {row['story_title']}")
         st.write(row["hook_text"])
         st.caption(f"Retention 3s: {row['retention_3s']} • CTR: {row['ctr']}")
 
+    # The CSV is the source of record; exporting it needs no DataFrame.
     st.download_button(
         "⬇️ Export Hook Lab CSV",
-        df.to_csv(index=False).encode("utf-8"),
+        HOOKS_PATH.read_bytes() if HOOKS_PATH.exists() else b"",
         file_name="hook_lab.csv",
+        disabled=not HOOKS_PATH.exists(),
     )
@@ -5,9 +5,10 @@ from pathlib import Path
 
 import streamlit as st
 
-from services.healthcheck import run_all
+from services.healthcheck import TTL_SECONDS, cached_results, run_all, start_refresher
 from services.theme_manager import theme_toggle
 from ui_utils import inject_global_styles
+from xseller_ai import latency
 
 LOGS_PATH = Path("logs/health_last.json")
 
@@ -22,8 +23,8 @@ with st.expander("Environment Keys", expanded=False):
         """
 POST_PROVIDER
 GETLATE_API_KEY / GETLATE_BASE_URL
-BUFFER_ACCESS_TOKEN / BUFFER_PROFILE_ID / BUFFER_BASE_URL
-PUBLER_API_KEY / PUBLER_WORKSPACE_ID / PUBLER_BASE_URL
+BUFFER_ACCESS_TOKEN / BUFFER_PROFILE_ID / BUFFER_PROFILE_IDS / BUFFER_BASE_URL
+PUBLER_API_KEY / PUBLER_WORKSPACE_ID / PUBLER_BASE_URL / PUBLER_PLATFORMS
 OPENAI_API_KEY / ELEVENLABS_API_KEY
 """
     )
@@ -31,12 +32,15 @@ OPENAI_API_KEY / ELEVENLABS_API_KEY
 
 st.write("---")
 
-if st.button("Run healthcheck"):
-    results = run_all()
-    st.session_state["health_results"] = results
+# The refresher keeps logs/health_last.json current; the page only reads it.
+start_refresher()
+if st.button("Run healthcheck now"):
+    st.session_state["health_results"] = run_all()
 else:
-    if LOGS_PATH.exists():
+    results = cached_results(max_age=TTL_SECONDS * 2)
+    if results is None and LOGS_PATH.exists():
         results = json.loads(LOGS_PATH.read_text(encoding="utf-8"))
+    if results:
         st.session_state["health_results"] = results
 
 results = st.session_state.get("health_results")
@@ -47,5 +51,19 @@ else:
     for col, check in zip(cols, results.get("checks", [])):
         status = "✅" if check["ok"] else "⚠️"
         col.metric(check["name"], status, check.get("detail", ""))
+    if results.get("checked_at"):
+        st.caption(f"Checked at {results['checked_at']} in {results.get('elapsed_ms', '-')} ms")
 
     st.json(results)
+
+st.write("---")
+st.subheader("Dependency latency")
+latency_rows = latency.summarize(latency.load_merged())
+if not latency_rows:
+    st.info("No outbound calls recorded yet. Pipelines and publish workers report here as they run.")
+else:
+    st.dataframe(latency_rows, use_container_width=True, hide_index=True)
+    st.caption(
+        f"Last {latency.WINDOW_SECONDS / 60:.0f} minutes across all processes; "
+        "percentiles are bucket estimates (±12%)."
+    )
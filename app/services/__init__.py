@@ -1 +1,8 @@
 """Service subpackage for XSELLER.AI."""
+import sys
+from pathlib import Path
+
+# Services share storage helpers with the automation package at the repo root.
+_ROOT = str(Path(__file__).resolve().parents[2])
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
+
+from xseller_ai import queue as queue_io
+from xseller_ai import settings as settings_module
+from xseller_ai.history_log import open_log
+from xseller_ai.models import QueuePage, QueueQuery, QueueState, migrate_raw, record_from_dict, record_to_dict
+from xseller_ai.storage import file_lock
 
 APP_DIR = Path(__file__).resolve().parents[1]
 ROOT_DIR = APP_DIR.parent
@@ -13,57 +18,82 @@ QUEUE_FP = DATA_DIR / "ai_shorts_queue.json"
 DB_FP = DATA_DIR / "ai_shorts_db.json"
 
 
-def _ensure_files() -> None:
-    if not QUEUE_FP.exists():
-        QUEUE_FP.write_text(json.dumps({"items": []}, indent=2), encoding="utf-8")
-    if not DB_FP.exists():
-        DB_FP.write_text(json.dumps([], indent=2), encoding="utf-8")
-
-
-def _normalise_queue(data: Any) -> Dict[str, Any]:
-    if isinstance(data, dict):
-        items = data.get("items")
-        if items is None:
-            items = []
-            for short in data.get("shorts", []):
-                entry = dict(short)
-                entry.setdefault("type", "video")
-                items.append(entry)
-            for post in data.get("text_posts", []):
-                entry = dict(post)
-                entry.setdefault("type", "text_post")
-                items.append(entry)
-        return {"items": items}
-    if isinstance(data, list):
-        return {"items": data}
-    return {"items": []}
+def _store():
+    """Return the SQLite store when ``QUEUE_BACKEND=sqlite``, else None."""
+    if settings_module.settings.queue_backend != "sqlite":
+        return None
+    from xseller_ai.store import open_store
+
+    return open_store(DATA_DIR, queue_path=QUEUE_FP, db_path=DB_FP)
+
+
+def load_queue_state() -> QueueState:
+    """Return the typed queue, already partitioned into shorts and text posts."""
+    store = _store()
+    if store is not None:
+        return QueueState.from_dicts(store.load_queue())
+    return queue_io.load_queue_state(QUEUE_FP)
 
 
 def load_queue() -> Dict[str, Any]:
-    """Return queue as {'items': [...]} regardless of legacy format."""
-    _ensure_files()
-    try:
-        raw = json.loads(QUEUE_FP.read_text(encoding="utf-8"))
-    except Exception:  # pragma: no cover
-        return {"items": []}
-    return _normalise_queue(raw)
+    """Return queue as {'items': [...]} for callers that predate QueueState."""
+    return {"items": [record_to_dict(item) for item in load_queue_state().items]}
+
+
+def load_queue_index() -> queue_io.QueueIndex:
+    """Read the JSON queue into an index for :func:`query_queue`."""
+    return queue_io.load_index(QUEUE_FP)
+
+
+def query_queue(query: QueueQuery, index: queue_io.QueueIndex | None = None) -> QueuePage:
+    """One filtered, sorted page of queue records.
+
+    The SQLite backend answers in SQL; the JSON backend uses ``index`` (or
+    reads one), so callers that page repeatedly should keep it around.
+    """
+    store = _store()
+    if store is not None:
+        items, total = store.query_items(query)
+    else:
+        items, total = (index or load_queue_index()).query(query)
+    return QueuePage([record_from_dict(query.kind, item) for item in items], total)
+
+
+def queue_values(kind: str, column: str, index: queue_io.QueueIndex | None = None) -> List[str]:
+    """Distinct non-empty values of a view column, for filter choices."""
+    store = _store()
+    if store is not None:
+        return store.distinct(kind, column)
+    return (index or load_queue_index()).distinct(kind, column)
+
+
+def iter_db() -> Iterator[Dict[str, Any]]:
+    """Stream items DB records without materialising the whole history."""
+    store = _store()
+    if store is not None:
+        yield from store.iter_history()
+        return
+    yield from open_log(DB_FP).iter_records()
 
 
 def load_db() -> List[Dict[str, Any]]:
     """Returns the full items DB (list)."""
-    _ensure_files()
-    try:
-        return json.loads(DB_FP.read_text(encoding="utf-8"))
-    except Exception:  # pragma: no cover
-        return []
+    return list(iter_db())
 
 
-def save_queue(obj: Dict[str, Any]) -> None:
-    _ensure_files()
-    payload = _normalise_queue(obj)
-    QUEUE_FP.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+def save_queue(obj: QueueState | Dict[str, Any]) -> None:
+    data = obj.to_dicts() if isinstance(obj, QueueState) else migrate_raw(obj)
+    store = _store()
+    if store is not None:
+        store.write_queue(data)
+        return
+    with file_lock(QUEUE_FP):
+        queue_io.write_queue(QUEUE_FP, data)
 
 
 def save_db(items: List[Dict[str, Any]]) -> None:
-    _ensure_files()
-    DB_FP.write_text(json.dumps(items, indent=2), encoding="utf-8")
+    store = _store()
+    if store is not None:
+        store.write_history(items)
+        return
+    open_log(DB_FP).rewrite(items)
@@ -1,10 +1,11 @@
 """Utilities for analytics data access and transformations."""
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any, Dict
 
+from xseller_ai.storage import atomic_write_json, read_json
+
 APP_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = APP_ROOT / "data"
 ANALYTICS_PATH = DATA_DIR / "analytics_summary.json"
@@ -27,14 +28,8 @@ def load_summary(default: Dict[str, Any] | None = None) -> Dict[str, Any]:
         "hook_performance": [],
         "signals": [],
     }
-    if not ANALYTICS_PATH.exists():
-        return default
-    try:
-        return json.loads(ANALYTICS_PATH.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return default
+    return read_json(ANALYTICS_PATH, default)
 
 
 def save_summary(payload: Dict[str, Any]) -> None:
-    DATA_DIR.mkdir(exist_ok=True)
-    ANALYTICS_PATH.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    atomic_write_json(ANALYTICS_PATH, payload)
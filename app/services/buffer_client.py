@@ -2,16 +2,27 @@
 from __future__ import annotations
 
 import os
-from typing import List
+from typing import Dict, List
 
-import requests
+from .http_pool import session
+from .rate_limit import ProviderHTTPError, observe, retry_after_seconds
 
 BUFFER_TOKEN = os.getenv("BUFFER_ACCESS_TOKEN")
 BUFFER_PROFILE = os.getenv("BUFFER_PROFILE_ID")
 BASE = os.getenv("BUFFER_BASE_URL", "https://api.bufferapp.com/1")
 
 
-class BufferError(Exception):
+def _parse_profiles(raw: str) -> Dict[str, str]:
+    pairs = (item.split(":", 1) for item in raw.split(",") if ":" in item)
+    return {platform.strip(): profile.strip() for platform, profile in pairs}
+
+
+# Optional per-platform profiles, e.g. "instagram:5f1a...,tiktok:60b2...".
+# Platforms without an entry use BUFFER_PROFILE_ID.
+BUFFER_PROFILES = _parse_profiles(os.getenv("BUFFER_PROFILE_IDS", ""))
+
+
+class BufferError(ProviderHTTPError):
     """Raised when Buffer returns an error response."""
 
 
@@ -21,28 +32,48 @@ def _headers() -> dict:
     return {"Authorization": f"Bearer {BUFFER_TOKEN}"}
 
 
-def post_to_buffer(
+def profile_ids_for(platforms: List[str]) -> List[str]:
+    ids = [BUFFER_PROFILES.get(platform) or BUFFER_PROFILE for platform in platforms]
+    return list(dict.fromkeys(profile for profile in ids if profile))
+
+
+def create_updates(
     title: str,
     caption: str,
     media_urls: List[str],
-    platforms: List[str],
+    profile_ids: List[str],
 ) -> dict:
-    if not BUFFER_PROFILE:
+    """Create one update on each of ``profile_ids`` in a single request."""
+    if not profile_ids:
         raise BufferError("Missing BUFFER_PROFILE_ID")
     text = f"{title}\n\n{caption}".strip()
-    media_payload = {"photo": media_urls[0]} if media_urls else {}
     payload = {
-        "profile_ids": [BUFFER_PROFILE],
+        "profile_ids[]": profile_ids,
         "text": text,
-        "media": media_payload,
-        "now": True,
+        "now": "true",
     }
-    response = requests.post(
+    if media_urls:
+        payload["media[photo]"] = media_urls[0]
+    response = session("buffer").post(
         f"{BASE}/updates/create.json",
         headers=_headers(),
         data=payload,
         timeout=20,
     )
+    observe("buffer", response)
     if response.status_code >= 300:
-        raise BufferError(f"{response.status_code}: {response.text}")
+        raise BufferError(
+            f"{response.status_code}: {response.text}",
+            status_code=response.status_code,
+            retry_after=retry_after_seconds(response.headers),
+        )
     return response.json()
+
+
+def post_to_buffer(
+    title: str,
+    caption: str,
+    media_urls: List[str],
+    platforms: List[str],
+) -> dict:
+    return create_updates(title, caption, media_urls, profile_ids_for(platforms))
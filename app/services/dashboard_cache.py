@@ -0,0 +1,231 @@
+"""Cached data loaders for the dashboard pages.
+
+Streamlit reruns the whole page script on every widget interaction. The
+loaders here are wrapped in ``st.cache_data`` and take a stamp of their source
+files (path, mtime, size) as an argument. A rerun reuses the parsed data and
+derived DataFrames until the pipeline or a publish worker writes the file
+again, which changes the stamp and misses the cache.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from xseller_ai import settings as settings_module
+from xseller_ai.assets import open_catalog
+from xseller_ai.history_log import INDEX_NAME, log_dir
+from xseller_ai.hook_lab import CSV_FILENAME, open_hook_lab
+from xseller_ai.models import QueuePage, QueueQuery, QueueState
+from xseller_ai.queue import QueueIndex
+from xseller_ai.storage import read_json
+from xseller_ai.store import store_path
+
+from . import ai_news_service, analytics_service
+
+PUBLISH_QUEUE = ai_news_service.DATA_DIR / "publish_queue.json"
+HOOKS_PATH = ai_news_service.DATA_DIR / CSV_FILENAME
+
+Stamp = Tuple[Tuple[str, int, int], ...]
+
+
+def file_stamp(*paths: Path) -> Stamp:
+    """``(path, mtime_ns, size)`` per path; a missing file stamps as ``(path, 0, -1)``."""
+    stamps = []
+    for path in paths:
+        try:
+            stat = Path(path).stat()
+            stamps.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamps.append((str(path), 0, -1))
+    return tuple(stamps)
+
+
+def _sqlite_sources() -> List[Path] | None:
+    if settings_module.settings.queue_backend != "sqlite":
+        return None
+    db = store_path(ai_news_service.DATA_DIR)
+    # WAL commits touch the -wal file, not the database file.
+    return [db, db.with_name(f"{db.name}-wal")]
+
+
+def _queue_stamp() -> Stamp:
+    return file_stamp(*(_sqlite_sources() or [ai_news_service.QUEUE_FP]))
+
+
+def _history_stamp() -> Stamp:
+    # Appends and compaction both rewrite the index; the legacy JSON is imported once.
+    sources = _sqlite_sources() or [log_dir(ai_news_service.DB_FP) / INDEX_NAME, ai_news_service.DB_FP]
+    return file_stamp(*sources)
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _queue_state(stamp: Stamp) -> QueueState:
+    return ai_news_service.load_queue_state()
+
+
+def queue_state() -> QueueState:
+    return _queue_state(_queue_stamp())
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _queue_index(stamp: Stamp) -> QueueIndex | None:
+    # Shared read-only by every session; st.cache_data would copy it on each access.
+    if _sqlite_sources():
+        return None
+    return ai_news_service.load_queue_index()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _queue_page(stamp: Stamp, query: QueueQuery) -> QueuePage:
+    return ai_news_service.query_queue(query, _queue_index(stamp))
+
+
+def queue_page(query: QueueQuery) -> QueuePage:
+    """One filtered, sorted page of the queue; only its records are built."""
+    return _queue_page(_queue_stamp(), query)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _queue_values(stamp: Stamp, kind: str, column: str) -> List[str]:
+    return ai_news_service.queue_values(kind, column, _queue_index(stamp))
+
+
+def queue_values(kind: str, column: str) -> List[str]:
+    return _queue_values(_queue_stamp(), kind, column)
+
+
+def asset_count(kind: str) -> int:
+    """Catalogued output files of ``kind``; a single-row read, so not cached."""
+    return open_catalog(ai_news_service.DATA_DIR).count(kind)
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _shorts_frame(stamp: Stamp) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "Title": item.title,
+                "Summary": (item.summary[:140] + "…") if item.summary else "",
+                "Hooks": len(item.hooks),
+                "Has Audio": bool(item.audio_path),
+            }
+            for item in _queue_state(stamp).shorts
+        ]
+    )
+
+
+def shorts_frame() -> pd.DataFrame:
+    return _shorts_frame(_queue_stamp())
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _text_posts_frame(stamp: Stamp) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "Story": post.story_title,
+                "Platforms": ", ".join(post.platforms.keys()),
+            }
+            for post in _queue_state(stamp).text_posts
+        ]
+    )
+
+
+def text_posts_frame() -> pd.DataFrame:
+    return _text_posts_frame(_queue_stamp())
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _rendered_videos(stamp: Stamp) -> List[Dict[str, Any]]:
+    return [item for item in ai_news_service.iter_db() if item.get("render", {}).get("mp4_url")]
+
+
+def rendered_videos() -> List[Dict[str, Any]]:
+    """History records that have a rendered MP4."""
+    return _rendered_videos(_history_stamp())
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _publish_queue(stamp: Stamp) -> Dict[str, List[dict]]:
+    return read_json(PUBLISH_QUEUE, {"items": []})
+
+
+def publish_queue() -> Dict[str, List[dict]]:
+    return _publish_queue(file_stamp(PUBLISH_QUEUE))
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _analytics_summary(stamp: Stamp) -> Dict[str, Any]:
+    return analytics_service.load_summary()
+
+
+def analytics_summary() -> Dict[str, Any]:
+    return _analytics_summary(file_stamp(analytics_service.ANALYTICS_PATH))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _analytics_frame(stamp: Stamp, key: str) -> pd.DataFrame:
+    return pd.DataFrame(_analytics_summary(stamp).get(key) or [])
+
+
+def analytics_frame(key: str) -> pd.DataFrame:
+    """DataFrame of one list in ``analytics_summary.json`` (empty if missing)."""
+    return _analytics_frame(file_stamp(analytics_service.ANALYTICS_PATH), key)
+
+
+# The Hook Lab store only changes when rows are appended to the CSV, so its stamp keys every loader.
+@st.cache_data(show_spinner=False, max_entries=2)
+def _hook_lab_count(stamp: Stamp) -> int:
+    store = open_hook_lab(ai_news_service.DATA_DIR)
+    store.ingest_csv(HOOKS_PATH)
+    return store.count()
+
+
+def hook_lab_count() -> int:
+    """Experiments stored, after ingesting rows appended to ``hooks_lab.csv``."""
+    return _hook_lab_count(file_stamp(HOOKS_PATH))
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _hook_lab_page(stamp: Stamp, offset: int, limit: int) -> pd.DataFrame:
+    _hook_lab_count(stamp)
+    return pd.DataFrame(open_hook_lab(ai_news_service.DATA_DIR).page(offset, limit))
+
+
+def hook_lab_page(offset: int, limit: int) -> pd.DataFrame:
+    return _hook_lab_page(file_stamp(HOOKS_PATH), offset, limit)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _hook_lab_top(stamp: Stamp, k: int) -> List[Dict[str, Any]]:
+    _hook_lab_count(stamp)
+    return open_hook_lab(ai_news_service.DATA_DIR).top(k)
+
+
+def hook_lab_top(k: int = 5) -> List[Dict[str, Any]]:
+    return _hook_lab_top(file_stamp(HOOKS_PATH), k)
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _hook_lab_styles(stamp: Stamp) -> pd.DataFrame:
+    _hook_lab_count(stamp)
+    return pd.DataFrame(open_hook_lab(ai_news_service.DATA_DIR).style_stats())
+
+
+def hook_lab_styles() -> pd.DataFrame:
+    """Per-style means and keep/kill counts from the store's running aggregates."""
+    return _hook_lab_styles(file_stamp(HOOKS_PATH))
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _hook_performance(stamp: Stamp) -> List[Dict[str, Any]]:
+    _hook_lab_count(stamp)
+    return open_hook_lab(ai_news_service.DATA_DIR).hook_performance()
+
+
+def hook_performance() -> List[Dict[str, Any]]:
+    """Per-style CTR and retention relative to all Hook Lab experiments."""
+    return _hook_performance(file_stamp(HOOKS_PATH))
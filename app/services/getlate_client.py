@@ -4,13 +4,14 @@ from __future__ import annotations
 import os
 from typing import List
 
-import requests
+from .http_pool import session
+from .rate_limit import ProviderHTTPError, observe, retry_after_seconds
 
 GETLATE_KEY = os.getenv("GETLATE_API_KEY")
 BASE = os.getenv("GETLATE_BASE_URL", "https://api.getlate.dev/v1")
 
 
-class GetLateError(Exception):
+class GetLateError(ProviderHTTPError):
     """Raised when GetLate.dev returns an error response."""
 
 
@@ -25,7 +26,11 @@ def post_to_getlate(
     caption: str,
     media_urls: List[str],
     platforms: List[str],
+    idempotency_key: str | None = None,
 ) -> dict:
+    headers = _headers()
+    if idempotency_key:
+        headers["Idempotency-Key"] = idempotency_key
     payload = {
         "title": title,
         "text": caption,
@@ -33,12 +38,40 @@ def post_to_getlate(
         "platforms": platforms,
         "schedule": "now",
     }
-    response = requests.post(
+    response = session("getlate").post(
         f"{BASE}/posts",
-        headers=_headers(),
+        headers=headers,
         json=payload,
         timeout=20,
     )
+    observe("getlate", response)
     if response.status_code >= 300:
-        raise GetLateError(f"{response.status_code}: {response.text}")
+        raise GetLateError(
+            f"{response.status_code}: {response.text}",
+            status_code=response.status_code,
+            retry_after=retry_after_seconds(response.headers),
+        )
     return response.json()
+
+
+def upload_media(path: str) -> str:
+    """Upload a local file and return the hosted URL to reference in posts."""
+    headers = _headers()
+    headers.pop("Content-Type")
+    with open(path, "rb") as handle:
+        response = session("getlate").post(
+            f"{BASE}/media",
+            headers=headers,
+            files={"files": (os.path.basename(path), handle)},
+            timeout=300,
+        )
+    observe("getlate", response)
+    if response.status_code >= 300:
+        raise GetLateError(
+            f"{response.status_code}: {response.text}",
+            status_code=response.status_code,
+            retry_after=retry_after_seconds(response.headers),
+        )
+    data = response.json()
+    files = data.get("files") or [data]
+    return files[0].get("url") or files[0]["id"]
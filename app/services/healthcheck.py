@@ -1,37 +1,81 @@
-"""Service health checks for external integrations."""
+"""Service health checks for external integrations.
+
+Checks are registered with :func:`register` and run concurrently under one
+deadline (``HEALTHCHECK_DEADLINE_SECONDS``). A check that has not answered by
+then is reported as ``timeout``. Results are cached in ``logs/health_last.json``
+for ``HEALTHCHECK_TTL_SECONDS``. :func:`start_refresher` keeps the cache warm
+from a background thread, so pages read status instantly via
+:func:`cached_results`.
+"""
 from __future__ import annotations
 
 import json
+import logging
+import os
 import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Callable, Dict, List
 
+from xseller_ai import settings as settings_module
+from xseller_ai.rss import DEFAULT_FEEDS
+from xseller_ai.storage import atomic_write_json, read_json
+
 from . import buffer_client, getlate_client
+from .http_pool import session
 from .publer_client import ping as publer_ping
 
+logger = logging.getLogger(__name__)
+
 LOGS = Path("logs")
 LOGS.mkdir(parents=True, exist_ok=True)
 OUT = LOGS / "health_last.json"
 
+DEADLINE_SECONDS = float(os.getenv("HEALTHCHECK_DEADLINE_SECONDS", "5"))
+TTL_SECONDS = float(os.getenv("HEALTHCHECK_TTL_SECONDS", "60"))
+
+CheckResult = Dict[str, str | bool]
+CHECKS: Dict[str, Callable[[], CheckResult]] = {}
+
+_refresher: threading.Thread | None = None
+_refresher_lock = threading.Lock()
+
+
+def register(name: str) -> Callable[[Callable[[], CheckResult]], Callable[[], CheckResult]]:
+    """Add a check to the registry; it returns ``{"name", "ok", "detail"}``."""
 
-def check_getlate() -> Dict[str, str | bool]:
+    def decorator(check: Callable[[], CheckResult]) -> Callable[[], CheckResult]:
+        CHECKS[name] = check
+        return check
+
+    return decorator
+
+
+@register("getlate")
+def check_getlate() -> CheckResult:
     ok = bool(getlate_client.GETLATE_KEY)
     detail = "token_present" if ok else "missing_key"
     return {"name": "getlate", "ok": ok, "detail": detail}
 
 
-def check_buffer() -> Dict[str, str | bool]:
-    ok = bool(buffer_client.BUFFER_TOKEN and buffer_client.BUFFER_PROFILE)
+@register("buffer")
+def check_buffer() -> CheckResult:
+    ok = bool(buffer_client.BUFFER_TOKEN and (buffer_client.BUFFER_PROFILE or buffer_client.BUFFER_PROFILES))
     detail = "token_present" if ok else "missing_token_or_profile"
     return {"name": "buffer", "ok": ok, "detail": detail}
 
 
-def check_publer() -> Dict[str, str | bool]:
+@register("publer")
+def check_publer() -> CheckResult:
     ok = publer_ping()
     return {"name": "publer", "ok": ok, "detail": "pong" if ok else "fail"}
 
 
-def check_dns(host: str = "app.xseller.ai") -> Dict[str, str | bool]:
+@register("dns_app")
+def check_dns(host: str = "app.xseller.ai") -> CheckResult:
     try:
         ip = socket.gethostbyname(host)
         return {"name": "dns_app", "ok": True, "detail": ip}
@@ -39,22 +83,100 @@ def check_dns(host: str = "app.xseller.ai") -> Dict[str, str | bool]:
         return {"name": "dns_app", "ok": False, "detail": str(exc)}
 
 
-def run_all() -> Dict[str, bool | List[Dict[str, str | bool]]]:
-    checks: List[Callable[[], Dict[str, str | bool]]] = [
-        check_getlate,
-        check_buffer,
-        check_publer,
-        check_dns,
-    ]
-    results = {"ok": True, "checks": []}
-    for check in checks:
-        result = check()
+def _http_check(name: str, url: str, headers: dict | None = None) -> CheckResult:
+    try:
+        response = session("health").get(url, headers=headers or {}, timeout=DEADLINE_SECONDS)
+    except Exception as exc:  # noqa: BLE001
+        return {"name": name, "ok": False, "detail": str(exc)}
+    ok = response.status_code < 400
+    return {"name": name, "ok": ok, "detail": "reachable" if ok else f"http_{response.status_code}"}
+
+
+@register("openai")
+def check_openai() -> CheckResult:
+    key = settings_module.settings.openai_api_key
+    if not key:
+        return {"name": "openai", "ok": False, "detail": "missing_key"}
+    return _http_check("openai", "https://api.openai.com/v1/models", {"Authorization": f"Bearer {key}"})
+
+
+@register("elevenlabs")
+def check_elevenlabs() -> CheckResult:
+    key = settings_module.settings.elevenlabs_api_key
+    if not key:
+        return {"name": "elevenlabs", "ok": False, "detail": "missing_key"}
+    return _http_check("elevenlabs", "https://api.elevenlabs.io/v1/user", {"xi-api-key": key})
+
+
+@register("feeds")
+def check_feeds() -> CheckResult:
+    with ThreadPoolExecutor(max_workers=len(DEFAULT_FEEDS)) as pool:
+        results = list(pool.map(lambda url: _http_check("feed", url), DEFAULT_FEEDS))
+    reachable = sum(result["ok"] for result in results)
+    return {
+        "name": "feeds",
+        "ok": reachable == len(DEFAULT_FEEDS),
+        "detail": f"{reachable}/{len(DEFAULT_FEEDS)} reachable",
+    }
+
+
+def run_all(deadline: float = DEADLINE_SECONDS) -> Dict[str, bool | str | List[CheckResult]]:
+    """Run every registered check concurrently and cache the results."""
+    pool = ThreadPoolExecutor(max_workers=len(CHECKS), thread_name_prefix="health")
+    started = time.monotonic()
+    futures = {name: pool.submit(check) for name, check in CHECKS.items()}
+    wait(futures.values(), timeout=deadline)
+    # Do not wait for stragglers; they finish in the background and are dropped.
+    pool.shutdown(wait=False, cancel_futures=True)
+    results = {"ok": True, "checks": [], "checked_at": datetime.now(timezone.utc).isoformat()}
+    for name, future in futures.items():
+        if not future.done():
+            result = {"name": name, "ok": False, "detail": "timeout"}
+        elif future.exception() is not None:
+            result = {"name": name, "ok": False, "detail": str(future.exception())}
+        else:
+            result = future.result()
         results["checks"].append(result)
         if not result["ok"]:
             results["ok"] = False
-    OUT.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    results["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+    atomic_write_json(OUT, results)
     return results
 
 
+def cached_results(max_age: float = TTL_SECONDS) -> Dict[str, bool | str | List[CheckResult]] | None:
+    """Last results if younger than ``max_age`` seconds, else None."""
+    results = read_json(OUT, None)
+    if not results or "checked_at" not in results:
+        return None
+    age = (datetime.now(timezone.utc) - datetime.fromisoformat(results["checked_at"])).total_seconds()
+    return results if age <= max_age else None
+
+
+def get_status(max_age: float = TTL_SECONDS) -> Dict[str, bool | str | List[CheckResult]]:
+    return cached_results(max_age) or run_all()
+
+
+def start_refresher(interval: float = TTL_SECONDS) -> None:
+    """Refresh the cache every ``interval`` seconds from a daemon thread (once per process)."""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is not None and _refresher.is_alive():
+            return
+
+        def loop() -> None:
+            while True:
+                # A bad cache file or failed write must not end the thread for the process's lifetime.
+                try:
+                    if cached_results(interval) is None:
+                        run_all()
+                except Exception:  # noqa: BLE001
+                    logger.exception("Health refresh failed; retrying in %.0f s", interval / 2)
+                time.sleep(interval / 2)
+
+        _refresher = threading.Thread(target=loop, name="health-refresher", daemon=True)
+        _refresher.start()
+
+
 if __name__ == "__main__":
     print(json.dumps(run_all(), indent=2))
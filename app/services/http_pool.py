@@ -0,0 +1,30 @@
+"""Pooled HTTP sessions for the provider clients.
+
+One ``requests.Session`` per provider keeps TLS connections alive across
+posts, so concurrent publish workers reuse sockets instead of reconnecting
+for every request. The pool is sized to ``PUBLISH_WORKERS``.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def session(provider: str) -> requests.Session:
+    with _sessions_lock:
+        current = _sessions.get(provider)
+        if current is None:
+            pool_size = int(os.getenv("PUBLISH_WORKERS", "8"))
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+            current = requests.Session()
+            current.mount("https://", adapter)
+            current.mount("http://", adapter)
+            _sessions[provider] = current
+        return current
@@ -0,0 +1,90 @@
+"""Upload-once media staging for the publish providers.
+
+Posts reference media as URLs or local paths. A remote URL is passed through
+for the provider to fetch. A local file is uploaded to each provider once and
+the returned media id/URL is reused by later posts. Entries are keyed by
+provider and the file's SHA-256, so the same render posted to several
+platforms, or re-rendered to a new path with identical bytes, is not uploaded
+again. Entries expire after ``MEDIA_CACHE_TTL_HOURS`` (24) because hosted
+uploads are not kept forever.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from xseller_ai import metrics
+from xseller_ai.storage import content_hash, file_lock, locked_json, read_json
+
+from . import getlate_client, publer_client
+
+CACHE = Path(__file__).resolve().parents[1] / "data" / "media_cache.json"
+
+# Providers without an upload API (Buffer) take media URLs only.
+UPLOADERS: Dict[str, Callable[[str], str]] = {
+    "getlate": getlate_client.upload_media,
+    "publer": publer_client.upload_media,
+}
+
+_upload_locks = [threading.Lock() for _ in range(16)]
+
+
+def _ttl() -> timedelta:
+    return timedelta(hours=float(os.getenv("MEDIA_CACHE_TTL_HOURS", "24")))
+
+
+def _local_path(ref: str) -> Path | None:
+    if ref.startswith("file://"):
+        ref = ref[len("file://") :]
+    elif "://" in ref:
+        return None
+    path = Path(ref)
+    return path if path.is_file() else None
+
+
+def _cached(key: str, now: datetime) -> str | None:
+    entry = read_json(CACHE, {}).get(key)
+    if entry and datetime.fromisoformat(entry["expires_at"]) > now:
+        return entry["media"]
+    return None
+
+
+def stage(provider: str, ref: str) -> str:
+    """Return what ``provider`` should be given for ``ref``, uploading it if needed."""
+    uploader = UPLOADERS.get(provider)
+    path = _local_path(ref)
+    if uploader is None or path is None:
+        return ref
+    digest = content_hash(path)
+    key = f"{provider}:{digest}"
+    now = datetime.now(timezone.utc)
+    media = _cached(key, now)
+    if media is not None:
+        metrics.CACHE_REQUESTS.labels("media", "hit").inc()
+        return media
+    # One upload per key: other threads and processes wait on the same stripe.
+    stripe = int(digest[:4], 16) % len(_upload_locks)
+    with _upload_locks[stripe], file_lock(CACHE.with_name(f"{CACHE.name}.upload{stripe}")):
+        media = _cached(key, now)
+        if media is not None:
+            metrics.CACHE_REQUESTS.labels("media", "hit").inc()
+            return media
+        metrics.CACHE_REQUESTS.labels("media", "miss").inc()
+        media = uploader(str(path))
+        with locked_json(CACHE, {}) as cache:
+            for stale in [name for name, entry in cache.items() if datetime.fromisoformat(entry["expires_at"]) <= now]:
+                del cache[stale]
+            cache[key] = {
+                "media": media,
+                "source": str(path),
+                "uploaded_at": now.isoformat(),
+                "expires_at": (now + _ttl()).isoformat(),
+            }
+    return media
+
+
+def stage_all(provider: str, media: List[str]) -> List[str]:
+    return [stage(provider, ref) for ref in media]
@@ -6,16 +6,20 @@ import os
 from pathlib import Path
 from typing import List
 
-import requests
+from .http_pool import session
+from .rate_limit import ProviderHTTPError, observe, retry_after_seconds
 
 PUBLER_KEY = os.getenv("PUBLER_API_KEY")
 WORKSPACE_ID = os.getenv("PUBLER_WORKSPACE_ID")
 BASE = os.getenv("PUBLER_BASE_URL", "https://api.publer.io/v1")
+# Optional comma-separated platforms the workspace posts to, e.g. "tiktok,instagram".
+# When unset they are read from the workspace's connected accounts.
+PUBLER_PLATFORMS = {item.strip().lower() for item in os.getenv("PUBLER_PLATFORMS", "").split(",") if item.strip()}
 LOGS = Path("logs")
 LOGS.mkdir(exist_ok=True)
 
 
-class PublerError(Exception):
+class PublerError(ProviderHTTPError):
     """Raised when Publer.io returns an error or configuration is missing."""
 
 
@@ -28,7 +32,7 @@ def _headers() -> dict:
 def ping() -> bool:
     """Return True if the Publer API responds successfully."""
     try:
-        response = requests.get(f"{BASE}/me", headers=_headers(), timeout=10)
+        response = session("publer").get(f"{BASE}/me", headers=_headers(), timeout=10)
         return response.status_code == 200
     except Exception:  # noqa: BLE001
         return False
@@ -38,7 +42,7 @@ def list_platforms() -> dict:
     """List connected platform accounts for the configured workspace."""
     if not WORKSPACE_ID:
         raise PublerError("Missing PUBLER_WORKSPACE_ID")
-    response = requests.get(
+    response = session("publer").get(
         f"{BASE}/workspaces/{WORKSPACE_ID}/accounts",
         headers=_headers(),
         timeout=15,
@@ -47,15 +51,51 @@ def list_platforms() -> dict:
     return response.json()
 
 
+def connected_platforms() -> set:
+    """Platforms the workspace can post to: ``PUBLER_PLATFORMS`` or its connected accounts."""
+    if PUBLER_PLATFORMS:
+        return set(PUBLER_PLATFORMS)
+    data = list_platforms()
+    accounts = data.get("accounts", []) if isinstance(data, dict) else data
+    names = (account.get("provider") or account.get("platform") or account.get("type") for account in accounts)
+    return {str(name).lower() for name in names if name}
+
+
+def upload_media(path: str) -> str:
+    """Upload a local file to the Publer media library and return its media id."""
+    headers = _headers()
+    headers.pop("Content-Type")
+    with open(path, "rb") as handle:
+        response = session("publer").post(
+            f"{BASE}/media",
+            headers=headers,
+            files={"file": (os.path.basename(path), handle)},
+            timeout=300,
+        )
+    observe("publer", response)
+    if response.status_code >= 300:
+        raise PublerError(
+            f"{response.status_code}: {response.text}",
+            status_code=response.status_code,
+            retry_after=retry_after_seconds(response.headers),
+        )
+    data = response.json()
+    return data.get("id") or data["url"]
+
+
 def create_post(
     text: str,
     media_urls: List[str],
     platforms: List[str],
     schedule: str = "now",
+    idempotency_key: str | None = None,
 ) -> dict:
     """Create a post via Publer for the given workspace."""
     if not WORKSPACE_ID:
         raise PublerError("Missing PUBLER_WORKSPACE_ID")
+    headers = _headers()
+    if idempotency_key:
+        headers["Idempotency-Key"] = idempotency_key
     payload = {
         "workspace_id": WORKSPACE_ID,
         "text": text,
@@ -63,12 +103,17 @@ def create_post(
         "platforms": platforms,
         "schedule": schedule,
     }
-    response = requests.post(
-        f"{BASE}/posts", headers=_headers(), json=payload, timeout=30
+    response = session("publer").post(
+        f"{BASE}/posts", headers=headers, json=payload, timeout=30
     )
+    observe("publer", response)
     if response.status_code >= 300:
         LOGS.joinpath("publer_error.log").write_text(response.text)
-        raise PublerError(f"{response.status_code}: {response.text}")
+        raise PublerError(
+            f"{response.status_code}: {response.text}",
+            status_code=response.status_code,
+            retry_after=retry_after_seconds(response.headers),
+        )
     try:
         return response.json()
     except json.JSONDecodeError as exc:  # pragma: no cover
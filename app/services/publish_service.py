@@ -1,14 +1,30 @@
 """Unified publish pipeline supporting GetLate, Buffer, and Publer."""
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
 import os
-from datetime import datetime
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-from .buffer_client import post_to_buffer
+from xseller_ai import latency, metrics
+from xseller_ai.archive import archive_publish_queue
+from xseller_ai.history_log import HistoryLog
+from xseller_ai.storage import atomic_write_json, file_lock, locked_json, read_json
+
+from .buffer_client import create_updates, post_to_buffer, profile_ids_for
 from .getlate_client import post_to_getlate
+from .media_cache import stage_all
+from .rate_limit import backoff_delay, is_retryable, limiter
+from .router import ProviderRouter
+from .schedule import DueIndex, due_time
 
 try:
     from .publer_client import create_post
@@ -20,10 +36,16 @@ except Exception:  # pragma: no cover - optional dependency guard
         raise PublerMissing("Publer client not available")
 
 
+logger = logging.getLogger(__name__)
+
 DATA = Path(__file__).resolve().parents[1] / "data"
 DATA.mkdir(exist_ok=True)
 QUEUE = DATA / "publish_queue.json"
 CONFIG = DATA / "last_provider.json"
+# Append-only record of every accepted post, keyed by idempotency key.
+LEDGER = HistoryLog(DATA / "sent_ledger.log")
+WORKERS_FILE = DATA / "publish_workers.json"
+ROUTER = ProviderRouter(DATA / "provider_health.json")
 
 SUPPORTED_PLATFORMS = [
     "youtube",
@@ -38,25 +60,68 @@ SUPPORTED_PLATFORMS = [
 
 PROVIDERS = ["getlate", "buffer", "publer"]
 
+# Posts in flight at once, overall and per provider. Override per provider with
+# PUBLISH_CONCURRENCY_<PROVIDER>, e.g. PUBLISH_CONCURRENCY_BUFFER=1.
+PUBLISH_WORKERS = int(os.getenv("PUBLISH_WORKERS", "8"))
+PROVIDER_CONCURRENCY = {"getlate": 4, "buffer": 2, "publer": 2}
+
+# Retryable failures (429, 5xx, network) are re-queued with backoff until
+# this many attempts; a limiter wait longer than MAX_LIMITER_WAIT seconds
+# re-queues the post instead of holding a worker.
+MAX_ATTEMPTS = int(os.getenv("PUBLISH_MAX_ATTEMPTS", "5"))
+MAX_LIMITER_WAIT = 30.0
+
+# Providers with a bulk endpoint; see group_for_submission.
+BULK_PROVIDERS = {"buffer"}
+
+# A claimed entry belongs to one worker until its lease expires; a worker that
+# dies without finishing returns the entry to the pool after this long.
+LEASE_SECONDS = float(os.getenv("PUBLISH_LEASE_SECONDS", "180"))
+ARCHIVE_INTERVAL_SECONDS = 600.0
+
+_slots: Dict[str, threading.BoundedSemaphore] = {}
+_slots_lock = threading.Lock()
+# Striped locks serialise workers that share an idempotency key.
+_key_locks = [threading.Lock() for _ in range(64)]
+
+POSTS = metrics.counter(
+    "xseller_posts_total", "Publish attempts by provider and outcome.", ("provider", "outcome")
+)
+QUEUE_DEPTH = metrics.gauge("xseller_publish_queue_depth", "Publish queue entries by status.", ("status",))
+
 
 def _load_queue() -> Dict[str, List[dict]]:
-    if not QUEUE.exists():
-        QUEUE.write_text(json.dumps({"items": []}, indent=2), encoding="utf-8")
-    try:
-        return json.loads(QUEUE.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return {"items": []}
+    queue = read_json(QUEUE, {"items": []})
+    queue.setdefault("items", [])
+    return queue
+
+
+def _queue_depth() -> Dict[Tuple[str], int]:
+    depth = {(status,): 0 for status in ("queued", "posted", "error")}
+    for entry in _load_queue()["items"]:
+        key = (entry.get("status", "queued"),)
+        depth[key] = depth.get(key, 0) + 1
+    return depth
+
+
+# Read at scrape time only, so the hot path never counts the queue.
+QUEUE_DEPTH.set_function(_queue_depth)
+
+
+def _assign_ids(queue: Dict[str, List[dict]]) -> bool:
+    """Give legacy entries a stable id; returns True if any were missing."""
+    missing = [entry for entry in queue["items"] if not entry.get("id")]
+    for entry in missing:
+        entry["id"] = uuid.uuid4().hex
+    return bool(missing)
 
 
 def _save_queue(queue: Dict[str, List[dict]]) -> None:
-    QUEUE.write_text(json.dumps(queue, indent=2), encoding="utf-8")
+    atomic_write_json(QUEUE, queue)
 
 
 def _remember_provider(name: str) -> None:
-    CONFIG.write_text(
-        json.dumps({"provider": name, "ts": datetime.utcnow().isoformat()}, indent=2),
-        encoding="utf-8",
-    )
+    atomic_write_json(CONFIG, {"provider": name, "ts": datetime.utcnow().isoformat()})
 
 
 def _last_provider() -> str:
@@ -72,6 +137,16 @@ def _last_provider() -> str:
     return env_provider if env_provider in PROVIDERS else "getlate"
 
 
+def idempotency_key(item_id: str, caption: str, platforms: List[str], provider: str) -> str:
+    caption_hash = hashlib.sha256(caption.encode("utf-8")).hexdigest()
+    raw = "\x1f".join([item_id, caption_hash, ",".join(sorted(platforms)), provider])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _entry_key(entry: dict, provider: str) -> str:
+    return idempotency_key(entry.get("item_id") or entry["id"], entry["caption"], entry["platforms"], provider)
+
+
 def enqueue_post(
     item_id: str,
     title: str,
@@ -79,80 +154,467 @@ def enqueue_post(
     media: List[str],
     platforms: List[str],
     provider: str | None = None,
+    scheduled_at: datetime | None = None,
 ) -> bool:
-    queue = _load_queue()
-    queue["items"].append(
-        {
+    """Queue a post; returns False if the same post is already queued or sent.
+
+    ``scheduled_at`` (timezone-aware) holds the post back until that time.
+    """
+    if provider:
+        _remember_provider(provider)
+    provider = provider or _last_provider()
+    key = idempotency_key(item_id, caption, platforms, provider)
+    with file_lock(QUEUE):
+        queue = _load_queue()
+        duplicate = any(
+            entry.get("idempotency_key") == key and entry.get("status") != "error" for entry in queue["items"]
+        )
+        if duplicate or key in LEDGER:
+            return False
+        entry = {
+            "id": uuid.uuid4().hex,
             "item_id": item_id,
             "title": title,
             "caption": caption,
             "media": media,
             "platforms": platforms,
             "status": "queued",
-            "provider": provider or _last_provider(),
+            "provider": provider,
+            "idempotency_key": key,
+            "queued_at": datetime.now(timezone.utc).isoformat(),
         }
-    )
-    _save_queue(queue)
+        if scheduled_at is not None:
+            entry["scheduled_at"] = scheduled_at.astimezone(timezone.utc).isoformat()
+        queue["items"].append(entry)
+        _save_queue(queue)
     return True
 
 
-def _dispatch(
+def _send(
     provider: str,
     title: str,
     caption: str,
     media: List[str],
     platforms: List[str],
+    idempotency_key: str | None = None,
 ) -> dict:
+    # Local files are uploaded once per provider and referenced by the cached id.
+    media = stage_all(provider, media)
     if provider == "getlate":
-        try:
-            return {"provider": "getlate", "resp": post_to_getlate(title, caption, media, platforms)}
-        except Exception as exc:
-            return {"provider": "getlate", "error": str(exc)}
+        return post_to_getlate(title, caption, media, platforms, idempotency_key=idempotency_key)
     if provider == "buffer":
-        try:
-            return {"provider": "buffer", "resp": post_to_buffer(title, caption, media, platforms)}
-        except Exception as exc:
-            return {"provider": "buffer", "error": str(exc)}
+        # Buffer's API has no idempotency header; the sent-ledger covers it.
+        return post_to_buffer(title, caption, media, platforms)
     if provider == "publer":
-        try:
-            text = f"{title}\n\n{caption}".strip()
-            return {"provider": "publer", "resp": create_post(text=text, media_urls=media, platforms=platforms)}
-        except Exception as exc:
-            return {"provider": "publer", "error": str(exc)}
-    return {"provider": provider, "error": f"Unknown provider {provider}"}
+        text = f"{title}\n\n{caption}".strip()
+        return create_post(text=text, media_urls=media, platforms=platforms, idempotency_key=idempotency_key)
+    raise ValueError(f"Unknown provider {provider}")
+
+
+def _dispatch(
+    provider: str,
+    title: str,
+    caption: str,
+    media: List[str],
+    platforms: List[str],
+    idempotency_key: str | None = None,
+) -> dict:
+    try:
+        return {"provider": provider, "resp": _send(provider, title, caption, media, platforms, idempotency_key)}
+    except Exception as exc:
+        return _error_result(provider, exc)
+
+
+def _error_result(provider: str, exc: Exception) -> dict:
+    result = {"provider": provider, "error": str(exc), "retryable": is_retryable(exc)}
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        result["retry_after"] = retry_after
+    return result
+
+
+def _is_due(entry: dict, now: datetime) -> bool:
+    return entry.get("status") == "queued" and due_time(entry) <= now
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def claim_items(worker_id: str, limit: int | None = None, lease_seconds: float = LEASE_SECONDS) -> List[dict]:
+    """Lease up to ``limit`` due entries to ``worker_id`` and return copies of them.
+
+    Entries whose lease has expired are due again, so a crashed worker's
+    claims return to the pool.
+    """
+    now = datetime.now(timezone.utc)
+    lease_until = (now + timedelta(seconds=lease_seconds)).isoformat()
+    claimed: list[dict] = []
+    with file_lock(QUEUE):
+        queue = _load_queue()
+        changed = _assign_ids(queue)
+        for entry in queue["items"]:
+            if limit is not None and len(claimed) >= limit:
+                break
+            if _is_due(entry, now):
+                entry["lease_owner"] = worker_id
+                entry["lease_until"] = lease_until
+                claimed.append(dict(entry))
+        if claimed or changed:
+            _save_queue(queue)
+    return claimed
+
+
+def _schedule_retry(entry: dict, delay: float) -> None:
+    entry["status"] = "queued"
+    entry["retry_at"] = (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+
+
+def _mark_posted(entry: dict, response: object) -> None:
+    entry["status"] = "posted"
+    entry["response"] = response
+    entry.pop("error", None)
+    entry.pop("retry_at", None)
+    entry["finished_at"] = datetime.now(timezone.utc).isoformat()
 
 
 def publish_one(entry: dict) -> dict:
-    provider = entry.get("provider") or _last_provider()
-    result = _dispatch(provider, entry["title"], entry["caption"], entry["media"], entry["platforms"])
+    """Publish ``entry`` through its provider, failing over to a healthy one.
+
+    ``provider`` stays the provider that was asked for; ``handled_by`` records
+    the one that actually took the post.
+    """
+    requested = entry.get("provider") or _last_provider()
+    entry["provider"] = requested
+    # The requested provider's key is what enqueue_post dedupes on.
+    requested_key = entry["idempotency_key"] = _entry_key(entry, requested)
+    candidates = ROUTER.route(requested, entry["platforms"])
+    if not candidates:
+        delay = ROUTER.seconds_until_probe()
+        entry["error"] = "No healthy provider available"
+        _schedule_retry(entry, delay)
+        POSTS.labels(requested, "deferred").inc()
+        return {"provider": requested, "deferred": delay}
+    result: dict = {}
+    for index, provider in enumerate(candidates):
+        result = _attempt(entry, provider, requested_key)
+        # Fail over only on provider-side trouble, not on a rejected post.
+        if "deferred" in result or "error" not in result or not result.get("retryable"):
+            for unused in candidates[index + 1 :]:
+                ROUTER.release(unused)
+            break
+    return _finalize(entry, result)
+
+
+def _finalize(entry: dict, result: dict) -> dict:
+    """Apply a publish result to ``entry``: posted, retry later, or error."""
+    posts = POSTS.labels
+    provider = result.get("provider", entry.get("provider"))
+    if "deferred" in result:
+        _schedule_retry(entry, result["deferred"])
+        posts(provider, "deferred").inc()
+        return result
+    if result.get("deduplicated"):
+        # Already accepted by a provider, e.g. before a crash lost the queue write.
+        entry["deduplicated"] = True
+    else:
+        entry["attempts"] = entry.get("attempts", 0) + 1
     if "error" in result:
-        entry["status"] = "error"
         entry["error"] = result["error"]
-    else:
-        entry["status"] = "posted"
-        entry["response"] = result["resp"]
-    entry["provider"] = provider
+        if result.get("retryable") and entry["attempts"] < MAX_ATTEMPTS:
+            _schedule_retry(entry, max(backoff_delay(entry["attempts"]), result.get("retry_after") or 0.0))
+            posts(provider, "retry").inc()
+            return result
+        entry["status"] = "error"
+        entry.pop("retry_at", None)
+        entry["finished_at"] = datetime.now(timezone.utc).isoformat()
+        posts(provider, "error").inc()
+        return result
+    entry["handled_by"] = result["provider"]
+    _mark_posted(entry, result["resp"])
+    posts(provider, "deduplicated" if result.get("deduplicated") else "posted").inc()
     return result
 
 
-def process_queue(provider: str | None = None) -> Dict[str, List[dict]]:
-    queue = _load_queue()
-    selected_provider = provider or _last_provider()
-    changed = False
-    for item in queue["items"]:
-        if item.get("status") == "queued":
-            item["provider"] = selected_provider
-            publish_one(item)
-            changed = True
-    if changed:
+def _attempt(entry: dict, provider: str, requested_key: str) -> dict:
+    key = _entry_key(entry, provider)
+    with _key_locks[int(key[:8], 16) % len(_key_locks)]:
+        sent = LEDGER.get(key) or LEDGER.get(requested_key)
+        if sent is not None:
+            ROUTER.release(provider)
+            return {"provider": sent.get("provider", provider), "resp": sent.get("response"), "deduplicated": True}
+        bucket = limiter(provider)
+        wait = bucket.reserve()
+        if wait > MAX_LIMITER_WAIT:
+            bucket.cancel()
+            ROUTER.release(provider)
+            return {"provider": provider, "deferred": wait}
+        if wait:
+            time.sleep(wait)
+        with _provider_slot(provider):
+            started = time.monotonic()
+            result = _dispatch(provider, entry["title"], entry["caption"], entry["media"], entry["platforms"], key)
+        elapsed = time.monotonic() - started
+        latency.record(provider, elapsed, "error" not in result)
+        # Only provider-side failures count against its health; a rejected post does not.
+        ROUTER.record(provider, not result.get("retryable"), elapsed)
+        if "error" in result:
+            return result
+        # Record the send before the queue write so a crash in between cannot repost.
+        LEDGER.append(_ledger_records(entry, provider, key, requested_key, result["resp"]))
+        return result
+
+
+def _ledger_records(entry: dict, provider: str, key: str, requested_key: str, response: object) -> List[dict]:
+    record = {
+        "id": key,
+        "entry_id": entry["id"],
+        "item_id": entry.get("item_id"),
+        "provider": provider,
+        "platforms": entry["platforms"],
+        "response": response,
+        "sent_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if requested_key == key:
+        return [record]
+    return [record, {**record, "id": requested_key, "alias_of": key}]
+
+
+def group_for_submission(items: List[dict]) -> List[List[dict]]:
+    """Group entries that one bulk request can carry.
+
+    Buffer creates the same update on several profiles in one call, so
+    entries with the same provider and content share a group as long as their
+    profiles do not overlap. Everything else is submitted on its own.
+    """
+    groups: List[List[dict]] = []
+    open_groups: Dict[tuple, List[Tuple[List[dict], set]]] = {}
+    for item in items:
+        if item.get("provider") not in BULK_PROVIDERS:
+            groups.append([item])
+            continue
+        content = (item["provider"], item["title"], item["caption"], tuple(item["media"]))
+        targets = set(profile_ids_for(item["platforms"]))
+        for group, used in open_groups.get(content, []):
+            if targets and not used & targets:
+                group.append(item)
+                used |= targets
+                break
+        else:
+            group = [item]
+            groups.append(group)
+            open_groups.setdefault(content, []).append((group, targets))
+    return groups
+
+
+def publish_group(entries: List[dict]) -> None:
+    """Publish a group from :func:`group_for_submission`, in one request when possible."""
+    provider = entries[0]["provider"]
+    pending: list[dict] = []
+    for entry in entries:
+        key = entry["idempotency_key"] = _entry_key(entry, provider)
+        sent = LEDGER.get(key)
+        if sent is not None:
+            response = sent.get("response")
+            _finalize(entry, {"provider": sent.get("provider", provider), "resp": response, "deduplicated": True})
+        else:
+            pending.append(entry)
+    if len(pending) < 2 or not ROUTER.healthy(provider):
+        # Single posts, and anything needing a trial call or failover, go one by one.
+        for entry in pending:
+            publish_one(entry)
+        return
+
+    bucket = limiter(provider)
+    wait = bucket.reserve()
+    if wait > MAX_LIMITER_WAIT:
+        bucket.cancel()
+        for entry in pending:
+            _finalize(entry, {"provider": provider, "deferred": wait})
+        return
+    if wait:
+        time.sleep(wait)
+    first = pending[0]
+    profile_ids = [profile for entry in pending for profile in profile_ids_for(entry["platforms"])]
+    with _provider_slot(provider):
+        started = time.monotonic()
+        try:
+            media = stage_all(provider, first["media"])
+            result = {"provider": provider, "resp": create_updates(first["title"], first["caption"], media, profile_ids)}
+        except Exception as exc:
+            result = _error_result(provider, exc)
+    elapsed = time.monotonic() - started
+    latency.record(provider, elapsed, "error" not in result)
+    ROUTER.record(provider, not result.get("retryable"), elapsed)
+    if "error" in result:
+        for entry in pending:
+            if result.get("retryable"):
+                # Provider trouble: retry each post singly so it can fail over.
+                publish_one(entry)
+            else:
+                _finalize(entry, result)
+        return
+
+    updates = result["resp"].get("updates", []) if isinstance(result["resp"], dict) else []
+    per_entry = []
+    for entry in pending:
+        own = set(profile_ids_for(entry["platforms"]))
+        per_entry.append({**result["resp"], "updates": [update for update in updates if update.get("profile_id") in own]})
+    LEDGER.append(
+        [
+            record
+            for entry, response in zip(pending, per_entry)
+            for record in _ledger_records(entry, provider, entry["idempotency_key"], entry["idempotency_key"], response)
+        ]
+    )
+    for entry, response in zip(pending, per_entry):
+        _finalize(entry, {"provider": provider, "resp": response})
+
+
+def _provider_limit(provider: str) -> int:
+    override = os.getenv(f"PUBLISH_CONCURRENCY_{provider.upper()}")
+    if override:
+        return max(1, int(override))
+    return PROVIDER_CONCURRENCY.get(provider, 1)
+
+
+def _provider_slot(provider: str) -> threading.BoundedSemaphore:
+    """Shared per-provider semaphore, so concurrent queue runs respect one limit."""
+    with _slots_lock:
+        slot = _slots.get(provider)
+        if slot is None:
+            slot = _slots[provider] = threading.BoundedSemaphore(_provider_limit(provider))
+        return slot
+
+
+def _persist_results(items: List[dict]) -> None:
+    results = {}
+    for item in items:
+        owner = item.pop("lease_owner", None)
+        item.pop("lease_until", None)
+        results[item["id"]] = (item, owner)
+    with file_lock(QUEUE):
+        queue = _load_queue()
+        for index, entry in enumerate(queue["items"]):
+            if entry.get("id") not in results:
+                continue
+            item, owner = results[entry["id"]]
+            lease_lost = entry.get("status") != "queued" or entry.get("lease_owner") != owner
+            if item["status"] == "queued" and lease_lost:
+                # Our lease expired and another worker took over; leave it theirs.
+                continue
+            # Replace rather than update so cleared fields (retry_at, error) stay cleared.
+            queue["items"][index] = item
         _save_queue(queue)
+
+
+def _publish_and_persist(group: List[dict]) -> List[dict]:
+    with metrics.stage("publish"):
+        publish_group(group)
+    # Written as soon as the group finishes, so a crash mid-run keeps what went out.
+    _persist_results(group)
+    return group
+
+
+def process_queue(provider: str | None = None, max_workers: int | None = None) -> Dict[str, List[dict]]:
+    """Publish every due entry once, rerouted through ``provider``."""
+    selected_provider = provider or _last_provider()
+    # Lease under the lock, publish without it, then merge each result back by
+    # id so posts enqueued meanwhile are not overwritten and running workers
+    # skip the leased entries.
+    pending = claim_items(new_worker_id())
+    for item in pending:
+        item["provider"] = selected_provider
+    if pending:
+        workers = min(max_workers or PUBLISH_WORKERS, len(pending))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish") as pool:
+            futures = [pool.submit(_publish_and_persist, group) for group in group_for_submission(pending)]
+            for future in as_completed(futures):
+                future.result()
     _remember_provider(selected_provider)
-    return queue
+    archive_publish_queue(QUEUE)
+    return _load_queue()
+
+
+def _heartbeat(worker_id: str, inflight: int, stopping: bool = False) -> None:
+    now = datetime.now(timezone.utc)
+    with locked_json(WORKERS_FILE, {}) as workers:
+        for other, info in list(workers.items()):
+            if (now - datetime.fromisoformat(info["seen_at"])).total_seconds() > LEASE_SECONDS:
+                del workers[other]
+        if stopping:
+            workers.pop(worker_id, None)
+        else:
+            workers[worker_id] = {"seen_at": now.isoformat(), "inflight": inflight}
+
+
+def active_workers() -> Dict[str, dict]:
+    """Workers that reported in within the lease period."""
+    now = datetime.now(timezone.utc)
+    return {
+        worker_id: info
+        for worker_id, info in read_json(WORKERS_FILE, {}).items()
+        if (now - datetime.fromisoformat(info["seen_at"])).total_seconds() <= LEASE_SECONDS
+    }
+
+
+def run_worker(
+    worker_id: str | None = None,
+    *,
+    max_workers: int | None = None,
+    poll_interval: float = 5.0,
+    lease_seconds: float = LEASE_SECONDS,
+    stop: threading.Event | None = None,
+    once: bool = False,
+) -> None:
+    """Claim and publish due entries until ``stop`` is set.
+
+    Several workers, in one process or many, can drain the same queue: each
+    entry is leased to one worker at a time. With ``once`` the worker drains
+    what is due now and returns.
+    """
+    worker_id = worker_id or new_worker_id()
+    stop = stop or threading.Event()
+    capacity = max_workers or PUBLISH_WORKERS
+    due_index = DueIndex(QUEUE)
+    inflight: set[Future] = set()
+    last_archive = 0.0
+    logger.info("Publish worker %s started with %d slots", worker_id, capacity)
+    with ThreadPoolExecutor(max_workers=capacity, thread_name_prefix="publish") as pool:
+        while not stop.is_set():
+            _heartbeat(worker_id, len(inflight))
+            free = capacity - len(inflight)
+            due_index.refresh()
+            until_due = due_index.seconds_until_due()
+            claimed = claim_items(worker_id, free, lease_seconds) if free and until_due == 0 else []
+            inflight.update(pool.submit(_publish_and_persist, group) for group in group_for_submission(claimed))
+            if time.monotonic() - last_archive > ARCHIVE_INTERVAL_SECONDS:
+                archive_publish_queue(QUEUE)
+                last_archive = time.monotonic()
+            if once:
+                done, inflight = wait(inflight).done, set()
+            elif inflight:
+                done, inflight = wait(inflight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            else:
+                done = set()
+                # Wake when the next entry is due; poll meanwhile for new enqueues.
+                stop.wait(poll_interval if until_due is None else min(poll_interval, max(until_due, 0.05)))
+            for future in done:
+                if future.exception() is not None:
+                    logger.error("Publish task failed", exc_info=future.exception())
+            if once and not claimed:
+                break
+        wait(inflight)
+    _heartbeat(worker_id, 0, stopping=True)
+    logger.info("Publish worker %s stopped", worker_id)
 
 
 __all__ = [
     "enqueue_post",
     "process_queue",
+    "run_worker",
+    "claim_items",
+    "active_workers",
     "_last_provider",
     "SUPPORTED_PLATFORMS",
     "PROVIDERS",
@@ -0,0 +1,151 @@
+"""Per-provider token buckets and retry backoff for the publish queue.
+
+Each provider gets one :class:`TokenBucket` shared by every publish worker in
+the process. Buckets start from a configured rate (``PUBLISH_RATE_<PROVIDER>``,
+requests per minute) and tighten from ``Retry-After`` and
+``X-RateLimit-Remaining``/``X-RateLimit-Reset`` headers on each response.
+"""
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping
+
+# Requests per minute when a provider sends no rate-limit headers.
+DEFAULT_RATES = {"getlate": 60.0, "buffer": 30.0, "publer": 30.0}
+BACKOFF_BASE_SECONDS = 30.0
+BACKOFF_CAP_SECONDS = 3600.0
+
+
+class ProviderHTTPError(Exception):
+    """Error from a provider API, with the status code and any ``Retry-After``."""
+
+    def __init__(self, message: str, status_code: int | None = None, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is not None and (self.status_code == 429 or self.status_code >= 500)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, ProviderHTTPError):
+        return exc.retryable
+    # requests' connection and timeout errors are IOErrors.
+    return isinstance(exc, OSError)
+
+
+def retry_after_seconds(headers: Mapping[str, Any]) -> float | None:
+    """Parse ``Retry-After`` given as seconds or an HTTP date."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _reset_seconds(value: str) -> float | None:
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    # Some APIs send an epoch timestamp, others seconds until reset.
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve a token and wait if told to."""
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None) -> None:
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, rate_per_minute / 10.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, self.blocked_until - now)
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def cancel(self) -> None:
+        """Return a reserved token the caller decided not to use."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def block_for(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def observe(self, headers: Mapping[str, Any]) -> None:
+        """Tighten the bucket from a response's rate-limit headers."""
+        retry_after = retry_after_seconds(headers)
+        if retry_after is not None:
+            self.block_for(retry_after)
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        try:
+            remaining_count = float(remaining)
+        except ValueError:
+            return
+        with self._lock:
+            self.tokens = min(self.tokens, remaining_count)
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining_count <= 0 and reset:
+            seconds = _reset_seconds(str(reset))
+            if seconds is not None:
+                self.block_for(seconds)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def limiter(provider: str) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(provider)
+        if bucket is None:
+            rate = float(os.getenv(f"PUBLISH_RATE_{provider.upper()}", DEFAULT_RATES.get(provider, 30.0)))
+            bucket = _buckets[provider] = TokenBucket(rate)
+        return bucket
+
+
+def observe(provider: str, response: Any) -> None:
+    limiter(provider).observe(response.headers)
+
+
+def backoff_delay(
+    attempts: int,
+    base: float = BACKOFF_BASE_SECONDS,
+    cap: float = BACKOFF_CAP_SECONDS,
+) -> float:
+    """Exponential backoff with jitter: half fixed, half random."""
+    ceiling = min(cap, base * 2 ** max(0, attempts - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
@@ -0,0 +1,205 @@
+"""Health-aware provider routing for the publish queue.
+
+Every publish attempt is recorded per provider: outcome and latency over a
+rolling window. A provider whose recent calls mostly fail trips a circuit
+breaker. It is skipped for ``CIRCUIT_OPEN_SECONDS`` and then gets a single
+trial call (half-open). A success closes the circuit; a failure opens it
+again.
+
+:meth:`ProviderRouter.route` returns the providers to try, in order. The
+requested provider comes first when it is usable, followed by the other
+configured providers that support every requested platform, best first.
+What a provider supports comes from its configuration: Buffer's per-platform
+profiles, Publer's ``PUBLER_PLATFORMS`` or connected accounts. A provider
+whose platforms are unknown is never picked as a fallback.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import median
+from typing import Deque, Dict, Iterable, List, Tuple
+
+from xseller_ai.storage import atomic_write_json
+
+from . import buffer_client, getlate_client, publer_client
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("getlate", "buffer", "publer")
+# GetLate posts to every platform the app offers.
+GETLATE_PLATFORMS = {"youtube", "tiktok", "instagram", "facebook", "linkedin", "twitter", "pinterest"}
+# Publer's connected accounts are looked up at most this often.
+PLATFORMS_TTL_SECONDS = float(os.getenv("PROVIDER_PLATFORMS_TTL_SECONDS", "900"))
+
+WINDOW = 50
+MIN_SAMPLES = 5
+FAILURE_RATE_TO_OPEN = 0.5
+CONSECUTIVE_FAILURES_TO_OPEN = 5
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "60"))
+SNAPSHOT_INTERVAL_SECONDS = 10.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def configured(provider: str) -> bool:
+    if provider == "getlate":
+        return bool(getlate_client.GETLATE_KEY)
+    if provider == "buffer":
+        return bool(buffer_client.BUFFER_TOKEN and (buffer_client.BUFFER_PROFILE or buffer_client.BUFFER_PROFILES))
+    if provider == "publer":
+        return bool(publer_client.PUBLER_KEY and publer_client.WORKSPACE_ID)
+    return False
+
+
+_platform_cache: Dict[str, Tuple[float, set]] = {}
+
+
+def supported_platforms(provider: str) -> set:
+    """Platforms ``provider`` is configured to post to; empty when unknown."""
+    if provider == "getlate":
+        return GETLATE_PLATFORMS
+    if provider == "buffer":
+        # Unmapped platforms would land on the default profile, which is some other channel.
+        return set(buffer_client.BUFFER_PROFILES)
+    if provider != "publer":
+        return set()
+    cached = _platform_cache.get(provider)
+    if cached and time.monotonic() - cached[0] < PLATFORMS_TTL_SECONDS:
+        return cached[1]
+    try:
+        platforms = publer_client.connected_platforms()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not list Publer platforms: %s", exc)
+        platforms = set()
+    _platform_cache[provider] = (time.monotonic(), platforms)
+    return platforms
+
+
+@dataclass
+class ProviderHealth:
+    samples: Deque[Tuple[bool, float]] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    consecutive_failures: int = 0
+    state: str = CLOSED
+    opened_at: float = 0.0
+    trial_in_flight: bool = False
+
+    @property
+    def success_rate(self) -> float:
+        if not self.samples:
+            return 1.0
+        return sum(ok for ok, _ in self.samples) / len(self.samples)
+
+    @property
+    def p50_latency(self) -> float:
+        return median(latency for _, latency in self.samples) if self.samples else 0.0
+
+
+class ProviderRouter:
+    def __init__(self, snapshot_path: Path | None = None) -> None:
+        self.snapshot_path = snapshot_path
+        self._health: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        self._last_snapshot = 0.0
+
+    def _get(self, provider: str) -> ProviderHealth:
+        return self._health.setdefault(provider, ProviderHealth())
+
+    def _usable(self, provider: str, now: float) -> bool:
+        health = self._get(provider)
+        if health.state == OPEN and now - health.opened_at >= CIRCUIT_OPEN_SECONDS:
+            health.state = HALF_OPEN
+            health.trial_in_flight = False
+        if health.state == OPEN:
+            return False
+        if health.state == HALF_OPEN:
+            return not health.trial_in_flight
+        return True
+
+    def route(self, requested: str, platforms: Iterable[str]) -> List[str]:
+        """Providers to try for a post, best first; empty if every candidate is open."""
+        wanted = set(platforms)
+        # Looked up before taking the lock: Publer's may need an API call.
+        others = [
+            name
+            for name in PROVIDERS
+            if name != requested and configured(name) and wanted <= supported_platforms(name)
+        ]
+        now = time.monotonic()
+        with self._lock:
+            others.sort(key=lambda name: (-self._get(name).success_rate, self._get(name).p50_latency))
+            candidates = [requested] + others if configured(requested) or not others else others
+            chosen = [name for name in candidates if self._usable(name, now)]
+            for name in chosen:
+                # Only one trial call goes to a half-open provider at a time.
+                if self._get(name).state == HALF_OPEN:
+                    self._get(name).trial_in_flight = True
+            return chosen
+
+    def healthy(self, provider: str) -> bool:
+        """True if the provider is configured and its circuit is closed."""
+        with self._lock:
+            return configured(provider) and self._get(provider).state == CLOSED
+
+    def release(self, provider: str) -> None:
+        """Give back a half-open trial slot that was routed but not used."""
+        with self._lock:
+            health = self._get(provider)
+            if health.state == HALF_OPEN:
+                health.trial_in_flight = False
+
+    def record(self, provider: str, ok: bool, latency: float) -> None:
+        with self._lock:
+            health = self._get(provider)
+            previous = health.state
+            health.samples.append((ok, latency))
+            health.trial_in_flight = False
+            if ok:
+                health.consecutive_failures = 0
+                health.state = CLOSED
+            else:
+                health.consecutive_failures += 1
+                tripped = health.consecutive_failures >= CONSECUTIVE_FAILURES_TO_OPEN or (
+                    len(health.samples) >= MIN_SAMPLES and 1 - health.success_rate >= FAILURE_RATE_TO_OPEN
+                )
+                if health.state == HALF_OPEN or tripped:
+                    health.state = OPEN
+                    health.opened_at = time.monotonic()
+            changed = health.state != previous
+        self._maybe_snapshot(force=changed)
+
+    def seconds_until_probe(self) -> float:
+        """How long until some open circuit allows a trial call."""
+        now = time.monotonic()
+        with self._lock:
+            waits = [
+                CIRCUIT_OPEN_SECONDS - (now - health.opened_at)
+                for health in self._health.values()
+                if health.state == OPEN
+            ]
+        return max(1.0, min(waits, default=CIRCUIT_OPEN_SECONDS))
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "state": health.state,
+                    "success_rate": round(health.success_rate, 3),
+                    "p50_ms": round(health.p50_latency * 1000),
+                    "samples": len(health.samples),
+                }
+                for name, health in self._health.items()
+            }
+
+    def _maybe_snapshot(self, force: bool = False) -> None:
+        if self.snapshot_path is None:
+            return
+        if not force and time.monotonic() - self._last_snapshot < SNAPSHOT_INTERVAL_SECONDS:
+            return
+        self._last_snapshot = time.monotonic()
+        atomic_write_json(self.snapshot_path, self.snapshot())
@@ -0,0 +1,135 @@
+"""Post timing for the publish queue: a due-time index and slot spreading.
+
+:class:`DueIndex` keeps a min-heap of when each queued entry next becomes
+due (its ``scheduled_at``, ``retry_at`` or lease expiry). Workers sleep until
+the top of the heap instead of rescanning the queue. The heap is rebuilt only
+when ``publish_queue.json`` changes on disk.
+
+:func:`suggest_slot` picks the next optimal posting time for a set of
+platforms that keeps ``PUBLISH_MIN_GAP_MINUTES`` between posts on each one.
+Times come from the ``slots`` of each channel in ``config/channels.json``,
+falling back to :data:`DEFAULT_SLOTS`. They are read in ``PUBLISH_TIMEZONE``.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import os
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+from zoneinfo import ZoneInfo
+
+from xseller_ai.storage import read_json
+
+CHANNELS = Path(__file__).resolve().parents[1] / "config" / "channels.json"
+
+DEFAULT_SLOTS: Dict[str, List[str]] = {
+    "youtube": ["15:00", "18:00"],
+    "tiktok": ["12:00", "19:00", "21:00"],
+    "instagram": ["11:00", "14:00", "19:00"],
+    "facebook": ["09:00", "13:00", "16:00"],
+    "linkedin": ["08:00", "12:00", "17:00"],
+    "twitter": ["09:00", "12:00", "17:00"],
+    "snapchat": ["19:00", "22:00"],
+    "pinterest": ["20:00", "21:00"],
+}
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _parse(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def due_time(entry: dict) -> datetime:
+    """Earliest moment a queued entry may be claimed."""
+    times = [_parse(entry.get(key)) for key in ("scheduled_at", "retry_at", "lease_until")]
+    return max((moment for moment in times if moment), default=_EPOCH)
+
+
+class DueIndex:
+    """Min-heap of ``(due_time, id)`` over the queued entries of a queue file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._heap: List[Tuple[datetime, str]] = []
+        self._stamp: Tuple[int, int] | None = None
+
+    def refresh(self) -> bool:
+        """Rebuild from disk if the file changed since the last call; True if rebuilt."""
+        try:
+            stat = self.path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp is not None and stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        items = read_json(self.path, {"items": []}).get("items", [])
+        self._heap = [
+            (due_time(entry), entry.get("id", "")) for entry in items if entry.get("status") == "queued"
+        ]
+        heapq.heapify(self._heap)
+        return True
+
+    def next_due(self) -> datetime | None:
+        return self._heap[0][0] if self._heap else None
+
+    def seconds_until_due(self, now: datetime | None = None) -> float | None:
+        """Seconds until the earliest entry is due (0 if one is due now), None if empty."""
+        due = self.next_due()
+        if due is None:
+            return None
+        now = now or datetime.now(timezone.utc)
+        return max(0.0, (due - now).total_seconds())
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def _publish_tz() -> ZoneInfo:
+    return ZoneInfo(os.getenv("PUBLISH_TIMEZONE", "UTC"))
+
+
+def platform_slots() -> Dict[str, List[time]]:
+    slots = dict(DEFAULT_SLOTS)
+    if CHANNELS.exists():
+        for channel in json.loads(CHANNELS.read_text(encoding="utf-8")):
+            if channel.get("slots"):
+                slots[channel["id"]] = channel["slots"]
+    return {platform: sorted(time.fromisoformat(value) for value in values) for platform, values in slots.items()}
+
+
+def suggest_slot(
+    platforms: Iterable[str],
+    queue_items: Iterable[dict],
+    after: datetime | None = None,
+    days: int = 7,
+) -> datetime:
+    """Next optimal time for ``platforms`` that keeps the minimum gap on every platform."""
+    platforms = list(platforms)
+    after = after or datetime.now(timezone.utc)
+    min_gap = timedelta(minutes=float(os.getenv("PUBLISH_MIN_GAP_MINUTES", "90")))
+    taken: Dict[str, List[datetime]] = {platform: [] for platform in platforms}
+    for entry in queue_items:
+        scheduled = _parse(entry.get("scheduled_at"))
+        if not scheduled or entry.get("status") != "queued":
+            continue
+        for platform in entry.get("platforms", []):
+            if platform in taken:
+                taken[platform].append(scheduled)
+
+    slots = platform_slots()
+    times = sorted({slot for platform in platforms for slot in slots.get(platform, [])})
+    tz = _publish_tz()
+    start = after.astimezone(tz).date()
+    for offset in range(days + 1):
+        day = start + timedelta(days=offset)
+        for slot in times:
+            candidate = datetime.combine(day, slot, tzinfo=tz).astimezone(timezone.utc)
+            if candidate <= after:
+                continue
+            if all(abs(candidate - other) >= min_gap for platform in platforms for other in taken[platform]):
+                return candidate
+    return after + min_gap
@@ -0,0 +1,114 @@
+"""Small WebP previews of generated images and videos for the dashboard.
+
+Pages show a thumbnail (``THUMBNAIL_SIZE`` px, default 320) instead of the
+full 1080×1080 render, and a poster frame instead of streaming the video. The
+full asset loads only when the user asks for it. Derivatives are generated on
+first access and stored under ``app/data/thumbnails/`` by the source's
+SHA-256. A renamed or re-rendered file with the same bytes reuses them, and
+an edited file gets new ones. A render that fails leaves a ``.fail`` marker
+beside where the derivative would go, so those bytes are not retried on every
+rerun; delete the markers to retry.
+
+Pillow is needed for both kinds of preview, and ``ffmpeg`` on ``PATH`` is
+needed for poster frames. Without them the helpers return None and pages
+fall back to the full asset.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from io import BytesIO
+from pathlib import Path
+
+from xseller_ai.storage import atomic_write_bytes, content_hash
+
+logger = logging.getLogger(__name__)
+
+THUMBS = Path(__file__).resolve().parents[1] / "data" / "thumbnails"
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "320"))
+WEBP_QUALITY = 80
+POSTER_OFFSET_SECONDS = 1.0
+
+_locks = [threading.Lock() for _ in range(16)]
+
+
+def _target(digest: str, suffix: str) -> Path:
+    return THUMBS / digest[:2] / f"{digest}-{suffix}.webp"
+
+
+def _failed(target: Path) -> Path:
+    return target.with_suffix(".fail")
+
+
+def _encode_webp(source, size: int) -> bytes:
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        buffer = BytesIO()
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _derive(path: str | Path, suffix: str, render) -> Path | None:
+    source = Path(path)
+    if not source.is_file():
+        return None
+    digest = content_hash(source)
+    target = _target(digest, suffix)
+    if target.exists():
+        return target
+    if _failed(target).exists():
+        return None
+    # Sessions previewing the same asset wait for one render instead of racing.
+    with _locks[int(digest[:4], 16) % len(_locks)]:
+        if target.exists():
+            return target
+        if _failed(target).exists():
+            return None
+        try:
+            data = render(source)
+        except ImportError:
+            logger.warning("Pillow is not installed; previews use the full asset.")
+            return None
+        except Exception as exc:  # noqa: BLE001 - a broken preview must not break the page
+            logger.warning("Could not render %s preview of %s: %s", suffix, source, exc)
+            data = None
+        if data is None:
+            # The same bytes would fail the same way (or time out again), so remember it.
+            atomic_write_bytes(_failed(target), b"")
+            return None
+        atomic_write_bytes(target, data)
+    return target
+
+
+def thumbnail(path: str | Path, size: int = THUMBNAIL_SIZE) -> Path | None:
+    """WebP thumbnail of an image, at most ``size`` px on its longer side."""
+    return _derive(path, f"{size}", lambda source: _encode_webp(source, size))
+
+
+def poster(path: str | Path, size: int = THUMBNAIL_SIZE) -> Path | None:
+    """WebP poster frame of a video, taken ``POSTER_OFFSET_SECONDS`` in."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+
+    def render(source: Path) -> bytes | None:
+        frame = subprocess.run(
+            [
+                ffmpeg, "-loglevel", "error", "-ss", str(POSTER_OFFSET_SECONDS), "-i", str(source),
+                "-frames:v", "1", "-f", "image2pipe", "-vcodec", "png", "-",
+            ],
+            capture_output=True,
+            timeout=30,
+            check=True,
+        ).stdout
+        # Clips shorter than the offset produce no frame.
+        return _encode_webp(BytesIO(frame), size) if frame else None
+
+    return _derive(path, f"poster-{size}", render)
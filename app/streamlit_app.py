@@ -18,8 +18,7 @@ import altair as alt
 import pandas as pd
 import streamlit as st
 
-from services.ai_news_service import load_queue, load_db  # type: ignore
-from services.analytics_service import load_summary  # type: ignore
+from services import dashboard_cache  # type: ignore
 from services.publish_service import _last_provider  # type: ignore
 from services.theme_manager import THEMES, theme_toggle  # type: ignore
 from ui_utils import inject_global_styles
@@ -134,11 +133,10 @@ if nav_choice != "Dashboard":
             st.info("Use the sidebar navigation to open this section in the deployed app.")
     st.stop()
 
-analytics = load_summary()
-queue_state = load_queue()
-queue_items = queue_state.get("items", [])
-shorts = [item for item in queue_items if item.get("type") in {"video", "short", "short_video"}]
-text_posts = [item for item in queue_items if item.get("type") in {"text_post", "text", "caption"}]
+analytics = dashboard_cache.analytics_summary()
+queue_state = dashboard_cache.queue_state()
+shorts = queue_state.shorts
+text_posts = queue_state.text_posts
 metrics = analytics.get("metrics", {})
 
 
@@ -306,7 +304,8 @@ with row2[1]:
 st.divider()
 st.subheader("🎯 Hook Performance Table")
 
-hook_performance = analytics.get("hook_performance") or [
+# Hook Lab aggregates first; analytics rollups or samples only until experiments are logged.
+hook_performance = dashboard_cache.hook_performance() or analytics.get("hook_performance") or [
     {"hook_style": "Shock", "ctr_delta": 3.14, "retention_delta": 3.4, "views": 450},
     {"hook_style": "Impact", "ctr_delta": -0.2, "retention_delta": -1.5, "views": 380},
     {"hook_style": "Celebrity", "ctr_delta": 2.4, "retention_delta": 0.8, "views": 520},
@@ -316,11 +315,19 @@ perf_df = pd.DataFrame(hook_performance)
 if not perf_df.empty:
     styled = (
         perf_df.style
-        .format({
-            "ctr_delta": "{:+.2f} %",
-            "retention_delta": "{:+.2f} %",
-            "views": "{:,}"
-        })
+        .format(
+            {
+                column: fmt
+                for column, fmt in {
+                    "ctr_delta": "{:+.2f} %",
+                    "retention_delta": "{:+.2f} %",
+                    "views": "{:,}",
+                    "keep_rate": "{:.0%}",
+                }.items()
+                if column in perf_df.columns
+            },
+            na_rep="–",
+        )
         .applymap(lambda v: f"color: {PRIMARY}; font-weight:600" if isinstance(v, str) and v.startswith('+') else "", subset=["ctr_delta", "retention_delta"])
         .applymap(lambda v: f"color: {DANGER}; font-weight:600" if isinstance(v, str) and v.startswith('-') else "", subset=["ctr_delta", "retention_delta"])
     )
@@ -1,5 +1,12 @@
+import math
+from datetime import timedelta
+from typing import List, Tuple
+
 import streamlit as st
 
+from services.thumbnails import poster, thumbnail
+from xseller_ai.models import SORT_KEYS, QueueQuery
+
 def inject_global_styles() -> None:
     st.markdown(
         """
@@ -13,3 +20,60 @@ def inject_global_styles() -> None:
         """,
         unsafe_allow_html=True,
     )
+
+
+def queue_filters(kind: str, *, statuses: List[str], sources: List[str], audio: bool = False, key: str) -> QueueQuery:
+    """Filter and sort widgets for a queue view; paging is set by :func:`paginate`."""
+    cols = st.columns(5 if audio else 4)
+    dates = cols[0].date_input("Queued between", value=(), key=f"{key}_dates")
+    status = cols[1].selectbox("Status", ["All", *statuses], key=f"{key}_status")
+    source = cols[2].selectbox("Source", ["All", *sources], key=f"{key}_source")
+    has_audio = None
+    if audio:
+        choice = cols[3].selectbox("Audio", ["Any", "With audio", "Without audio"], key=f"{key}_audio")
+        has_audio = None if choice == "Any" else choice == "With audio"
+    sort = cols[-1].selectbox(
+        "Sort by", SORT_KEYS, format_func=lambda name: name.replace("_", " ").title(), key=f"{key}_sort"
+    )
+    descending = cols[-1].checkbox("Descending", value=True, key=f"{key}_desc")
+    return QueueQuery(
+        kind=kind,
+        since=dates[0].isoformat() if dates else None,
+        until=(dates[1] + timedelta(days=1)).isoformat() if len(dates) == 2 else None,
+        status=None if status == "All" else status,
+        source=None if source == "All" else source,
+        has_audio=has_audio,
+        sort=sort,
+        descending=descending,
+    )
+
+
+def paginate(total: int, *, key: str, page_sizes: Tuple[int, ...] = (25, 50, 100)) -> Tuple[int, int]:
+    """Page-size and page widgets; returns ``(offset, limit)``."""
+    cols = st.columns([1, 1, 3])
+    page_size = cols[0].selectbox("Per page", page_sizes, key=f"{key}_size")
+    pages = max(1, math.ceil(total / page_size))
+    # Filters can shrink the result below the page the user was on.
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = int(cols[1].number_input("Page", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page"))
+    cols[2].caption(f"{total} items · page {page} of {pages}")
+    return (page - 1) * page_size, page_size
+
+
+def image_preview(path: str, *, key: str) -> None:
+    """Show a thumbnail, with a toggle that loads the full-size image."""
+    thumb = thumbnail(path)
+    if thumb is None or st.checkbox("Full size", key=f"{key}_full"):
+        st.image(path)
+    else:
+        st.image(str(thumb))
+
+
+def video_preview(path: str, *, key: str) -> None:
+    """Show a poster frame; the video is only streamed once the user asks for it."""
+    cover = poster(path)
+    if cover is None or st.checkbox("Play video", key=f"{key}_play"):
+        st.video(path)
+    else:
+        st.image(str(cover))
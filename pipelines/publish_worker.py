@@ -0,0 +1,66 @@
+"""Standalone publish worker.
+
+Drains ``app/data/publish_queue.json`` outside the dashboard. Entries are
+claimed with time-limited leases, so any number of workers can run side by
+side; the dashboard only enqueues and observes::
+
+    python pipelines/publish_worker.py --workers 8 --metrics-port 9464
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "app"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("publish-worker")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Publish queued social posts.")
+    parser.add_argument("--workers", type=int, help="Concurrent posts (default PUBLISH_WORKERS)")
+    parser.add_argument("--poll", type=float, default=5.0, help="Seconds between queue checks when idle")
+    parser.add_argument("--lease", type=float, help="Lease length in seconds (default PUBLISH_LEASE_SECONDS)")
+    parser.add_argument("--worker-id", help="Stable id for this worker (default host:pid:random)")
+    parser.add_argument("--once", action="store_true", help="Drain what is due now, then exit")
+    parser.add_argument("--metrics-port", type=int, help="Serve /metrics on this port (default METRICS_PORT)")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    # Provider clients read credentials at import time.
+    load_dotenv(dotenv_path=ROOT / ".env", override=True)
+    from services.publish_service import LEASE_SECONDS, run_worker
+    from xseller_ai import metrics
+
+    port = metrics.serve(args.metrics_port)
+    if port:
+        logger.info("Serving metrics on :%d/metrics", port)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    try:
+        run_worker(
+            args.worker_id,
+            max_workers=args.workers,
+            poll_interval=args.poll,
+            lease_seconds=args.lease or LEASE_SECONDS,
+            stop=stop,
+            once=args.once,
+        )
+    finally:
+        # Covers --once runs from cron, which exit before any scrape.
+        metrics.write_textfile("xseller_publish_worker")
+
+
+if __name__ == "__main__":
+    main()
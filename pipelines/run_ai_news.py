@@ -2,34 +2,33 @@ from __future__ import annotations
 
 import json
 import logging
+import time
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
 import sys
 import re
 
-from dotenv import load_dotenv
-from PIL import Image, ImageDraw
-
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from xseller_ai import hooks, queue, ranking, rss, settings, social, summarizer, tts
+from xseller_ai.storage import atomic_write_bytes, atomic_write_text
+from xseller_ai import analytics, archive, assets, blobs, hooks, metrics, queue, ranking, rss, settings, social, summarizer, tts
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("ai-news-runner")
 
-FEEDS = [
-    "https://techcrunch.com/tag/ai/feed/",
-    "https://venturebeat.com/category/ai/feed/",
-    "https://www.technologyreview.com/tag/artificial-intelligence/feed/",
-    "https://openai.com/blog/rss.xml",
-    "https://arxiv.org/rss/cs.AI",
-]
+FEEDS = rss.DEFAULT_FEEDS
+
+LAST_SUCCESS = metrics.gauge("xseller_ai_news_last_success_timestamp_seconds", "When the last run completed.")
+SHORTS_QUEUE_DEPTH = metrics.gauge("xseller_shorts_queue_depth", "Items in the AI shorts queue after the run.")
 
 
 def create_image(path: Path, headline: str, prompt: str, size=(1080, 1080)) -> None:
+    from PIL import Image, ImageDraw
+
     path.parent.mkdir(parents=True, exist_ok=True)
     img = Image.new("RGB", size, color=(10, 14, 24))
     draw = ImageDraw.Draw(img)
@@ -37,7 +36,10 @@ def create_image(path: Path, headline: str, prompt: str, size=(1080, 1080)) -> N
     draw.multiline_text((40, 40), text, fill=(0, 245, 160), spacing=10)
     footer = prompt[:200]
     draw.multiline_text((40, size[1] - 160), footer, fill=(200, 200, 200), spacing=8)
-    img.save(path)
+    # Replace rather than overwrite: the old file may be a link into the blob store.
+    buffer = BytesIO()
+    img.save(buffer, "PNG")
+    atomic_write_bytes(path, buffer.getvalue())
 
 
 def write_social_text(path: Path, posts: list[social.SocialPost]) -> None:
@@ -45,7 +47,7 @@ def write_social_text(path: Path, posts: list[social.SocialPost]) -> None:
     for post in posts:
         for platform, platform_post in post.platforms.items():
             file = path / f"{post.id}_{platform.lower()}.txt"
-            file.write_text(platform_post.caption, encoding="utf-8")
+            atomic_write_text(file, platform_post.caption)
 
 
 def write_video_manifest(path: Path, scripts: list[summarizer.Script]) -> None:
@@ -61,7 +63,7 @@ def write_video_manifest(path: Path, scripts: list[summarizer.Script]) -> None:
         }
         for script in scripts
     ]
-    (path / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    atomic_write_text(path / "manifest.json", json.dumps(manifest, indent=2))
 
 
 def sanitize_filename(value: str) -> str:
@@ -70,6 +72,8 @@ def sanitize_filename(value: str) -> str:
 
 
 def main() -> None:
+    from dotenv import load_dotenv
+
     load_dotenv(dotenv_path=ROOT / ".env", override=True)
     settings.reload()
     today = datetime.utcnow().strftime("%Y-%m-%d")
@@ -79,59 +83,93 @@ def main() -> None:
     audio_dir = outputs_root / "audio"
 
     logger.info("Fetching AI news feeds...")
-    articles = rss.fetch_feeds(FEEDS, since_hours=24)
+    with metrics.stage("fetch"):
+        articles = rss.fetch_feeds(FEEDS, since_hours=24)
     if not articles:
         logger.warning("No articles found in the last 24 hours.")
         return
 
-    ranked = ranking.rank_articles(articles, top_n=5)
+    with metrics.stage("rank"):
+        ranked = ranking.rank_articles(articles, top_n=5)
     top_articles = [item.article for item in ranked]
 
     logger.info("Summarising top articles... (OpenAI key detected=%s)", bool(settings.settings.openai_api_key))
-    scripts = summarizer.summarize_articles(top_articles)
+    with metrics.stage("summarize"):
+        scripts = summarizer.summarize_articles(top_articles)
 
     logger.info("Generating hook variants...")
-    hook_sets = hooks.generate_hooks(scripts)
+    with metrics.stage("hooks"):
+        hook_sets = hooks.generate_hooks(scripts)
 
     logger.info("Preparing social posts...")
-    social_posts = social.build_social_posts(scripts)
+    with metrics.stage("social"):
+        social_posts = social.build_social_posts(scripts)
 
     logger.info("Rendering placeholder social images...")
-    for social_post in social_posts:
-        for platform, platform_post in social_post.platforms.items():
-            image_path = social_dir / f"{social_post.id}_{platform.lower()}.png"
-            create_image(image_path, social_post.story_title, platform_post.image_prompt or "")
-            platform_post.image_path = str(image_path)
+    with metrics.stage("images"):
+        for social_post in social_posts:
+            for platform, platform_post in social_post.platforms.items():
+                image_path = social_dir / f"{social_post.id}_{platform.lower()}.png"
+                create_image(image_path, social_post.story_title, platform_post.image_prompt or "")
+                platform_post.image_path = str(image_path)
 
     write_social_text(social_dir, social_posts)
     write_video_manifest(video_dir, scripts)
 
     audio_paths: dict[str, str] = {}
     logger.info("Generating ElevenLabs voiceovers (if configured)...")
-    for script in scripts:
-        audio_path = audio_dir / f"{sanitize_filename(script.id)}.mp3"
-        generated = tts.synthesize_speech(
-            script.summary,
-            audio_path,
-        )
-        if generated:
-            audio_paths[script.id] = str(generated)
+    with metrics.stage("tts"):
+        for script in scripts:
+            audio_path = audio_dir / f"{sanitize_filename(script.id)}.mp3"
+            generated = tts.synthesize_speech(
+                script.summary,
+                audio_path,
+            )
+            if generated:
+                audio_paths[script.id] = str(generated)
 
     logger.info("Updating dashboard queue...")
     data_dir = Path(settings.settings.data_dir)
     queue_path = data_dir / "ai_shorts_queue.json"
     db_path = data_dir / "ai_shorts_db.json"
-    queue.merge_into_queue(
-        queue_path,
-        scripts,
-        hook_sets,
-        social_posts,
-        db_path=db_path,
-        audio_paths=audio_paths,
-    )
+    with metrics.stage("queue"):
+        queue.merge_into_queue(
+            queue_path,
+            scripts,
+            hook_sets,
+            social_posts,
+            db_path=db_path,
+            audio_paths=audio_paths,
+        )
+        archived = archive.archive_shorts_queue(queue_path)
+    if archived:
+        logger.info("Archived %d aged queue items.", archived)
+    with metrics.stage("catalog"):
+        catalog = assets.open_catalog(data_dir)
+        entries = [(video_dir / "manifest.json", None, None)]
+        for social_post in social_posts:
+            for platform, platform_post in social_post.platforms.items():
+                entries.append((Path(platform_post.image_path), None, social_post.id))
+                entries.append((social_dir / f"{social_post.id}_{platform.lower()}.txt", None, social_post.id))
+        entries.extend((Path(path), None, script_id) for script_id, path in audio_paths.items())
+        recorded = catalog.record_many(entries)
+        # Picks up MP4s rendered outside the pipeline since the last run.
+        catalog.sync(outputs_root.parent)
+        blobs.open_blobs(outputs_root.parent).put_many(catalog, [Path(asset.path) for asset in recorded])
+    with metrics.stage("analytics"):
+        try:
+            analytics.refresh(data_dir)
+        except Exception:  # noqa: BLE001 - stale analytics must not fail the news run
+            logger.exception("Analytics refresh failed; keeping the previous summary.")
+    SHORTS_QUEUE_DEPTH.set(queue.queue_depth(queue_path))
+    LAST_SUCCESS.set(time.time())
 
     logger.info("Run completed. Outputs stored in %s", outputs_root)
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # Cron runs are too short to scrape; node_exporter picks this file up instead.
+        metrics.write_textfile("xseller_ai_news")
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The dashboard imports its services as a top-level package from app/.
+APP = Path(__file__).resolve().parents[1] / "app"
+if str(APP) not in sys.path:
+    sys.path.insert(0, str(APP))
@@ -0,0 +1,33 @@
+from xseller_ai.analytics import AnalyticsStore
+
+
+def _views(store):
+    rows = store._conn().execute("SELECT post_id, hook_style, views FROM events ORDER BY post_id")
+    return rows.fetchall()
+
+
+def test_csv_quoted_field_with_newline_is_one_record(tmp_path):
+    path = tmp_path / "youtube.csv"
+    path.write_text(
+        'post_id,platform,date,title,hook_style,views\n'
+        'a,youtube,2026-01-01,"Line one\nline two",question,100\n'
+        'b,youtube,2026-01-01,plain,stat,50\n'
+    )
+    store = AnalyticsStore(tmp_path / "analytics.sqlite3")
+
+    assert store.ingest_file(path) == 2
+    assert _views(store) == [("a", "question", 100), ("b", "stat", 50)]
+
+
+def test_csv_record_split_across_appends(tmp_path):
+    path = tmp_path / "youtube.csv"
+    path.write_text('post_id,platform,date,title,hook_style,views\na,youtube,2026-01-01,"Line one\n')
+    store = AnalyticsStore(tmp_path / "analytics.sqlite3")
+
+    # The open quote means the record is unfinished, so nothing is consumed yet.
+    assert store.ingest_file(path) == 0
+    with path.open("a") as handle:
+        handle.write('line two",question,100\n')
+
+    assert store.ingest_file(path) == 1
+    assert _views(store) == [("a", "question", 100)]
@@ -0,0 +1,23 @@
+from xseller_ai.history_log import HistoryLog
+
+
+def test_rewrite_then_read_sees_new_segment(tmp_path):
+    log = HistoryLog(tmp_path / "ai_shorts_db.log")
+    log.append([{"id": "a"}, {"id": "b"}])
+    assert log.get("a") == {"id": "a"}
+
+    # Same records, so the new index.tsv has the same length but names a new segment.
+    log.rewrite([{"id": "a"}, {"id": "b"}])
+
+    assert [record["id"] for record in log.iter_records()] == ["a", "b"]
+    assert log.get("a") == {"id": "a"}
+
+
+def test_compact_then_read(tmp_path):
+    log = HistoryLog(tmp_path / "ai_shorts_db.log")
+    log.append([{"id": "a", "v": 1}])
+    log.append([{"id": "a", "v": 2}])
+    assert log.get("a") == {"id": "a", "v": 2}
+
+    assert log.compact() == 1
+    assert log.get("a") == {"id": "a", "v": 2}
@@ -0,0 +1,27 @@
+from xseller_ai.hook_lab import HookLabStore
+
+HEADER = "date,story_title,hook_style,hook_text,retention_3s,ctr,keep_or_kill\n"
+
+
+def test_in_place_edit_updates_rows_and_stats(tmp_path):
+    path = tmp_path / "hooks_lab.csv"
+    path.write_text(HEADER + "2026-01-01,A,q,hello,0.5,,\n2026-01-02,B,q,world,0.4,0.1,keep\n")
+    lab = HookLabStore(tmp_path / "hook_lab.sqlite3")
+    assert lab.ingest_csv(path) == 2
+
+    # The first row grows when its results are filled in, and a new row is appended.
+    path.write_text(path.read_text().replace("0.5,,", "0.6,0.3,keep") + "2026-01-03,C,s,new,0.9,0.2,kill\n")
+    assert lab.ingest_csv(path) == 2
+
+    assert lab.count() == 3
+    stats = {row["hook_style"]: row for row in lab.style_stats()}
+    assert stats["q"]["keeps"] == 2
+    assert stats["q"]["retention_3s"] == 0.5
+
+
+def test_rows_without_date_or_hook_text_are_skipped(tmp_path):
+    path = tmp_path / "hooks_lab.csv"
+    path.write_text(HEADER + ",A,q,hello,0.5,,\n2026-01-01,B,q,,0.4,,\n")
+    lab = HookLabStore(tmp_path / "hook_lab.sqlite3")
+    assert lab.ingest_csv(path) == 0
+    assert lab.count() == 0
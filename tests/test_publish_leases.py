@@ -0,0 +1,78 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services import publish_service
+from xseller_ai.storage import atomic_write_json, read_json
+
+
+@pytest.fixture
+def queue_file(tmp_path, monkeypatch):
+    path = tmp_path / "publish_queue.json"
+    monkeypatch.setattr(publish_service, "QUEUE", path)
+    atomic_write_json(path, {"items": [{"id": "p1", "status": "queued", "caption": "c", "platforms": ["youtube"]}]})
+    return path
+
+
+def _entry(path):
+    return read_json(path, {})["items"][0]
+
+
+def _expire_lease(path):
+    queue = read_json(path, {})
+    queue["items"][0]["lease_until"] = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    atomic_write_json(path, queue)
+
+
+def test_only_one_worker_wins_a_lease(queue_file):
+    barrier = threading.Barrier(2)
+    claims = {}
+
+    def claim(worker_id):
+        barrier.wait()
+        claims[worker_id] = publish_service.claim_items(worker_id)
+
+    threads = [threading.Thread(target=claim, args=(worker_id,)) for worker_id in ("w1", "w2")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [worker_id for worker_id, items in claims.items() if items]
+    assert len(winners) == 1
+    assert _entry(queue_file)["lease_owner"] == winners[0]
+
+
+def test_expired_lease_returns_to_the_pool(queue_file):
+    assert publish_service.claim_items("w1")
+    assert publish_service.claim_items("w2") == []
+
+    _expire_lease(queue_file)
+
+    assert [item["id"] for item in publish_service.claim_items("w2")] == ["p1"]
+    assert _entry(queue_file)["lease_owner"] == "w2"
+
+
+def test_persist_keeps_the_new_owners_lease(queue_file):
+    [stale] = publish_service.claim_items("w1")
+    _expire_lease(queue_file)
+    publish_service.claim_items("w2")
+
+    # w1 finishes late with a retry; the entry now belongs to w2.
+    stale["retry_at"] = datetime.now(timezone.utc).isoformat()
+    publish_service._persist_results([stale])
+
+    entry = _entry(queue_file)
+    assert entry["lease_owner"] == "w2"
+    assert "retry_at" not in entry
+
+
+def test_persist_writes_back_while_the_lease_is_held(queue_file):
+    [item] = publish_service.claim_items("w1")
+    item["status"] = "posted"
+    publish_service._persist_results([item])
+
+    entry = _entry(queue_file)
+    assert entry["status"] == "posted"
+    assert "lease_owner" not in entry
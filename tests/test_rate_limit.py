@@ -0,0 +1,47 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from services.rate_limit import TokenBucket
+
+
+def test_retry_after_seconds_blocks_the_bucket():
+    bucket = TokenBucket(600)
+    bucket.observe({"Retry-After": "5"})
+    assert bucket.reserve() == pytest.approx(5, abs=0.5)
+
+
+def test_retry_after_http_date_blocks_the_bucket():
+    bucket = TokenBucket(600)
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    bucket.observe({"Retry-After": format_datetime(when, usegmt=True)})
+    assert bucket.reserve() == pytest.approx(30, abs=2)
+
+
+def test_remaining_caps_tokens():
+    bucket = TokenBucket(600)  # capacity 60
+    bucket.observe({"X-RateLimit-Remaining": "2"})
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # The third request has to wait for a refill at 10 per second.
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.05)
+
+
+def test_exhausted_quota_waits_for_reset_in_seconds():
+    bucket = TokenBucket(600)
+    bucket.observe({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "10"})
+    assert bucket.reserve() == pytest.approx(10, abs=0.5)
+
+
+def test_exhausted_quota_waits_for_reset_epoch():
+    bucket = TokenBucket(600)
+    bucket.observe({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 20)})
+    assert bucket.reserve() == pytest.approx(20, abs=1.5)
+
+
+def test_unparseable_headers_are_ignored():
+    bucket = TokenBucket(600)
+    bucket.observe({"Retry-After": "soon", "X-RateLimit-Remaining": "lots"})
+    assert bucket.reserve() == 0
@@ -0,0 +1,74 @@
+import pytest
+
+from services import buffer_client, getlate_client, publer_client, router
+from services.router import CLOSED, HALF_OPEN, OPEN, ProviderRouter
+
+
+@pytest.fixture
+def only_getlate(monkeypatch):
+    monkeypatch.setattr(getlate_client, "GETLATE_KEY", "key")
+    monkeypatch.setattr(buffer_client, "BUFFER_TOKEN", None)
+    monkeypatch.setattr(publer_client, "PUBLER_KEY", None)
+
+
+def _fail(provider_router, times):
+    for _ in range(times):
+        provider_router.record("getlate", False, 0.1)
+
+
+def test_breaker_opens_after_consecutive_failures(only_getlate):
+    provider_router = ProviderRouter()
+    _fail(provider_router, router.CONSECUTIVE_FAILURES_TO_OPEN - 1)
+    assert provider_router.route("getlate", ["youtube"]) == ["getlate"]
+
+    _fail(provider_router, 1)
+    assert provider_router.snapshot()["getlate"]["state"] == OPEN
+    assert provider_router.route("getlate", ["youtube"]) == []
+
+
+def test_half_open_allows_one_trial_then_closes(only_getlate, monkeypatch):
+    provider_router = ProviderRouter()
+    _fail(provider_router, router.CONSECUTIVE_FAILURES_TO_OPEN)
+    monkeypatch.setattr(router, "CIRCUIT_OPEN_SECONDS", 0.0)
+
+    assert provider_router.route("getlate", ["youtube"]) == ["getlate"]
+    assert provider_router.snapshot()["getlate"]["state"] == HALF_OPEN
+    # The trial call is still in flight, so nobody else gets routed there.
+    assert provider_router.route("getlate", ["youtube"]) == []
+
+    provider_router.record("getlate", True, 0.1)
+    assert provider_router.snapshot()["getlate"]["state"] == CLOSED
+    assert provider_router.healthy("getlate")
+
+
+def test_failed_trial_reopens(only_getlate, monkeypatch):
+    provider_router = ProviderRouter()
+    _fail(provider_router, router.CONSECUTIVE_FAILURES_TO_OPEN)
+    monkeypatch.setattr(router, "CIRCUIT_OPEN_SECONDS", 0.0)
+    assert provider_router.route("getlate", ["youtube"]) == ["getlate"]
+
+    provider_router.record("getlate", False, 0.1)
+    assert provider_router.snapshot()["getlate"]["state"] == OPEN
+
+
+def test_released_trial_slot_can_be_routed_again(only_getlate, monkeypatch):
+    provider_router = ProviderRouter()
+    _fail(provider_router, router.CONSECUTIVE_FAILURES_TO_OPEN)
+    monkeypatch.setattr(router, "CIRCUIT_OPEN_SECONDS", 0.0)
+    assert provider_router.route("getlate", ["youtube"]) == ["getlate"]
+
+    provider_router.release("getlate")
+    assert provider_router.route("getlate", ["youtube"]) == ["getlate"]
+
+
+def test_fallback_needs_every_platform(monkeypatch):
+    monkeypatch.setattr(getlate_client, "GETLATE_KEY", None)
+    monkeypatch.setattr(buffer_client, "BUFFER_TOKEN", "token")
+    monkeypatch.setattr(buffer_client, "BUFFER_PROFILES", {"tiktok": "profile"})
+    monkeypatch.setattr(publer_client, "PUBLER_KEY", None)
+    provider_router = ProviderRouter()
+
+    assert provider_router.route("getlate", ["tiktok"]) == ["buffer"]
+    # Buffer has no Instagram profile. With no fallback left, the request goes
+    # to the unconfigured provider and fails with its own error.
+    assert provider_router.route("getlate", ["tiktok", "instagram"]) == ["getlate"]
@@ -3,8 +3,15 @@ XSELLER.AI automation package.
 
 Modules here provide utilities for fetching AI news, ranking articles,
 summarising content, generating social copy, and preparing dashboard payloads.
+
+Submodules are imported on first attribute access, and heavy third-party
+dependencies (feedparser, requests, openai, elevenlabs, Pillow) are only
+imported inside the functions that need them. Check the startup budget with
+``python -m xseller_ai.importtime``.
 """
 
+import importlib
+
 __all__ = [
     "rss",
     "ranking",
@@ -15,3 +22,9 @@ __all__ = [
     "queue",
     "settings",
 ]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
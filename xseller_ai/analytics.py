@@ -0,0 +1,535 @@
+"""Incremental rollups of per-post metrics into ``analytics_summary.json``.
+
+Platform exports (CSV with a header row, or JSONL) are dropped into
+``<data_dir>/analytics_exports/``. Each row is one post's metrics for one day:
+views, retention, shares, CTR and follows, tagged with platform and hook style.
+Rows are keyed by ``(post_id, platform, day)``, so re-exporting a day replaces
+its numbers instead of counting them twice.
+
+Triggers keep a daily rollup per ``(day, platform, hook_style)`` in
+``<data_dir>/analytics.sqlite3`` up to date as rows are upserted. Each export
+file remembers how many bytes were already ingested, so a run only parses
+lines appended since the last one. The summary is built from the rollup rows
+in the last 60 days, so its cost does not grow with total history::
+
+    python -m xseller_ai.analytics refresh
+    python -m xseller_ai.analytics ingest exports/youtube.csv --no-emit
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import logging
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .storage import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+DB_FILENAME = "analytics.sqlite3"
+EXPORTS_DIRNAME = "analytics_exports"
+SUMMARY_FILENAME = "analytics_summary.json"
+EXPORT_SUFFIXES = (".csv", ".jsonl")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    post_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    day TEXT NOT NULL,
+    hook_style TEXT NOT NULL,
+    views INTEGER NOT NULL,
+    watched REAL NOT NULL,
+    shares INTEGER NOT NULL,
+    impressions INTEGER NOT NULL,
+    clicks REAL NOT NULL,
+    followers INTEGER NOT NULL,
+    PRIMARY KEY (post_id, platform, day)
+);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    hook_style TEXT NOT NULL,
+    views INTEGER NOT NULL DEFAULT 0,
+    watched REAL NOT NULL DEFAULT 0,
+    shares INTEGER NOT NULL DEFAULT 0,
+    impressions INTEGER NOT NULL DEFAULT 0,
+    clicks REAL NOT NULL DEFAULT 0,
+    followers INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, platform, hook_style)
+);
+CREATE TABLE IF NOT EXISTS posts (
+    post_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (post_id, platform)
+);
+CREATE INDEX IF NOT EXISTS posts_day ON posts (day);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    header TEXT
+);
+CREATE TRIGGER IF NOT EXISTS events_rollup_insert AFTER INSERT ON events BEGIN
+    INSERT INTO daily (day, platform, hook_style, views, watched, shares, impressions, clicks, followers)
+    VALUES (NEW.day, NEW.platform, NEW.hook_style, NEW.views, NEW.watched, NEW.shares,
+            NEW.impressions, NEW.clicks, NEW.followers)
+    ON CONFLICT(day, platform, hook_style) DO UPDATE SET
+        views = views + excluded.views, watched = watched + excluded.watched,
+        shares = shares + excluded.shares, impressions = impressions + excluded.impressions,
+        clicks = clicks + excluded.clicks, followers = followers + excluded.followers;
+    -- A post counts on the first day it has metrics.
+    INSERT INTO posts (post_id, platform, day) VALUES (NEW.post_id, NEW.platform, NEW.day)
+    ON CONFLICT(post_id, platform) DO UPDATE SET day = MIN(day, excluded.day);
+END;
+CREATE TRIGGER IF NOT EXISTS events_rollup_update AFTER UPDATE ON events BEGIN
+    UPDATE daily SET
+        views = views - OLD.views, watched = watched - OLD.watched, shares = shares - OLD.shares,
+        impressions = impressions - OLD.impressions, clicks = clicks - OLD.clicks,
+        followers = followers - OLD.followers
+    WHERE day = OLD.day AND platform = OLD.platform AND hook_style = OLD.hook_style;
+    INSERT INTO daily (day, platform, hook_style, views, watched, shares, impressions, clicks, followers)
+    VALUES (NEW.day, NEW.platform, NEW.hook_style, NEW.views, NEW.watched, NEW.shares,
+            NEW.impressions, NEW.clicks, NEW.followers)
+    ON CONFLICT(day, platform, hook_style) DO UPDATE SET
+        views = views + excluded.views, watched = watched + excluded.watched,
+        shares = shares + excluded.shares, impressions = impressions + excluded.impressions,
+        clicks = clicks + excluded.clicks, followers = followers + excluded.followers;
+END;
+"""
+
+# Column aliases seen in platform exports, first match wins.
+FIELD_ALIASES = {
+    "post_id": ("post_id", "id", "video_id"),
+    "platform": ("platform", "network"),
+    "day": ("date", "day", "timestamp", "published_at"),
+    "hook_style": ("hook_style", "hook", "style"),
+    "views": ("views", "plays"),
+    "retention": ("retention", "retention_75", "retention_3s"),
+    "shares": ("shares",),
+    "impressions": ("impressions",),
+    "clicks": ("clicks",),
+    "ctr": ("ctr",),
+    "followers": ("followers", "follows", "followers_gained"),
+}
+
+
+def _field(row: Dict[str, Any], name: str) -> Any:
+    for alias in FIELD_ALIASES[name]:
+        value = row.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _number(value: Any) -> float:
+    if value in (None, ""):
+        return 0.0
+    try:
+        return float(str(value).strip().rstrip("%").replace(",", ""))
+    except ValueError:
+        return 0.0
+
+
+def _ratio(value: Any) -> float:
+    """Fraction from ``0.42``, ``42`` or ``"42%"``."""
+    number = _number(value)
+    return number / 100 if number > 1 or str(value).strip().endswith("%") else number
+
+
+def normalize(row: Dict[str, Any]) -> Tuple | None:
+    """One export row as an ``events`` tuple; None if it lacks an id or date."""
+    if not isinstance(row, dict):
+        return None
+    post_id, raw_day = _field(row, "post_id"), _field(row, "day")
+    if not post_id or not raw_day:
+        return None
+    try:
+        day = datetime.fromisoformat(str(raw_day).strip().replace("Z", "+00:00")).date().isoformat()
+    except ValueError:
+        return None
+    views = int(_number(_field(row, "views")))
+    impressions = int(_number(_field(row, "impressions"))) or views
+    clicks = _field(row, "clicks")
+    clicks = _number(clicks) if clicks is not None else _ratio(_field(row, "ctr")) * impressions
+    return (
+        str(post_id),
+        str(_field(row, "platform") or "unknown"),
+        day,
+        str(_field(row, "hook_style") or "unknown"),
+        views,
+        _ratio(_field(row, "retention")) * views,
+        int(_number(_field(row, "shares"))),
+        impressions,
+        clicks,
+        int(_number(_field(row, "followers"))),
+    )
+
+
+def _jsonl_rows(text: str, path: Path) -> List[Dict[str, Any]]:
+    """Objects from JSONL ``text``; lines that are not JSON objects are logged and skipped."""
+    rows, skipped = [], 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        if isinstance(row, dict):
+            rows.append(row)
+        else:
+            skipped += 1
+    if skipped:
+        logger.warning("Skipped %d malformed lines in %s", skipped, path)
+    return rows
+
+
+def _csv_end(chunk: bytes) -> int:
+    """End of the last complete CSV record in ``chunk``.
+
+    A newline inside a quoted field does not end a record: only newlines
+    after an even number of quotes do (an escaped ``""`` counts twice).
+    """
+    end = start = quotes = 0
+    newline = chunk.find(b"\n")
+    while newline != -1:
+        quotes += chunk.count(b'"', start, newline)
+        start = newline + 1
+        if quotes % 2 == 0:
+            end = start
+        newline = chunk.find(b"\n", start)
+    return end
+
+
+def _csv_rows(header: str | None, text: str, path: Path) -> List[Dict[str, Any]]:
+    """Rows of ``text`` keyed by ``header``; records the csv module rejects are logged and skipped."""
+    if not header:
+        return []
+    reader = csv.DictReader(io.StringIO(text), fieldnames=next(csv.reader([header])))
+    rows, skipped = [], 0
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error:
+            skipped += 1
+            continue
+        # More values than columns means the record is not in this header's layout.
+        if reader.restkey in row:
+            skipped += 1
+            continue
+        rows.append(row)
+    if skipped:
+        logger.warning("Skipped %d malformed records in %s", skipped, path)
+    return rows
+
+
+class AnalyticsStore:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Add or replace events; the daily rollup follows through triggers."""
+        events = [event for event in map(normalize, rows) if event is not None]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._upsert(conn, events)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return len(events)
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, events: List[Tuple]) -> None:
+        conn.executemany(
+            "INSERT INTO events (post_id, platform, day, hook_style, views, watched, shares, impressions, "
+            "clicks, followers) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(post_id, platform, day) DO UPDATE SET hook_style = excluded.hook_style, "
+            "views = excluded.views, watched = excluded.watched, shares = excluded.shares, "
+            "impressions = excluded.impressions, clicks = excluded.clicks, followers = excluded.followers",
+            events,
+        )
+
+    def ingest_file(self, path: Path) -> int:
+        """Ingest lines appended to an export since the last call; returns rows read.
+
+        Only complete lines (for CSV, complete records, which may span lines)
+        are consumed, so a file still being written is picked up where it
+        stopped. A replaced or truncated file is re-read from the start, which
+        is safe because rows upsert by key.
+        """
+        path = Path(path).resolve()
+        info = path.stat()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT inode, offset, header FROM sources WHERE path = ?", (str(path),)).fetchone()
+            offset, header = 0, None
+            if row and row[0] == info.st_ino and row[1] <= info.st_size:
+                offset, header = row[1], row[2]
+            if offset == info.st_size:
+                conn.execute("COMMIT")
+                return 0
+            with path.open("rb") as handle:
+                handle.seek(offset)
+                chunk = handle.read(info.st_size - offset)
+            # A record still being written is left for the next call.
+            end = _csv_end(chunk) if path.suffix == ".csv" else chunk.rfind(b"\n") + 1
+            text = chunk[:end].decode("utf-8-sig" if offset == 0 else "utf-8", errors="replace")
+            if path.suffix == ".csv":
+                if header is None and text:
+                    header, _, text = text.partition("\n")
+                    header = header.rstrip("\r")
+                rows = _csv_rows(header, text, path)
+            else:
+                rows = _jsonl_rows(text, path)
+            events = [event for event in map(normalize, rows) if event is not None]
+            self._upsert(conn, events)
+            conn.execute(
+                "INSERT INTO sources (path, inode, offset, header) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET inode = excluded.inode, offset = excluded.offset, "
+                "header = excluded.header",
+                (str(path), info.st_ino, offset + end, header),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return len(rows)
+
+    def ingest_dir(self, directory: Path) -> int:
+        if not Path(directory).is_dir():
+            return 0
+        return sum(
+            self.ingest_file(path)
+            for path in sorted(Path(directory).iterdir())
+            if path.suffix in EXPORT_SUFFIXES and path.is_file()
+        )
+
+    def latest_day(self) -> date | None:
+        row = self._conn().execute("SELECT MAX(day) FROM daily").fetchone()
+        return date.fromisoformat(row[0]) if row and row[0] else None
+
+    def _totals(self, start: date, end: date, group: str | None = None) -> Dict[str, Dict[str, float]]:
+        """Sums over ``start..end`` (inclusive), overall (key ``""``) or per ``group`` column."""
+        column = group or "''"
+        rows = self._conn().execute(
+            f"SELECT {column}, SUM(views), SUM(watched), SUM(shares), SUM(impressions), SUM(clicks), "
+            f"SUM(followers) FROM daily WHERE day BETWEEN ? AND ? GROUP BY {column}",
+            (start.isoformat(), end.isoformat()),
+        )
+        names = ("views", "watched", "shares", "impressions", "clicks", "followers")
+        return {key: dict(zip(names, (value or 0 for value in values))) for key, *values in rows}
+
+    def summary(self, as_of: date | None = None) -> Dict[str, Any]:
+        """The ``analytics_summary.json`` payload for the windows ending ``as_of``.
+
+        ``as_of`` defaults to the latest day with data, so lagging exports
+        still fill the 7- and 30-day windows.
+        """
+        end = as_of or self.latest_day()
+        if end is None:
+            return {}
+        week, month = end - timedelta(days=6), end - timedelta(days=29)
+        current = self._totals(week, end).get("", {})
+        previous = self._totals(week - timedelta(days=7), week - timedelta(days=1)).get("", {})
+        rates_now, rates_before = _rates(current), _rates(previous)
+
+        posts = dict(
+            self._conn().execute(
+                "SELECT day, COUNT(*) FROM posts WHERE day BETWEEN ? AND ? GROUP BY day",
+                (month.isoformat(), end.isoformat()),
+            ).fetchall()
+        )
+        days_30 = [month + timedelta(days=offset) for offset in range(30)]
+        daily_posts_30 = [{"date": day.isoformat(), "posts": posts.get(day.isoformat(), 0)} for day in days_30]
+        daily_posts = [
+            {"date": row["date"], "day": day.strftime("%a"), "posts": row["posts"]}
+            for day, row in zip(days_30[-7:], daily_posts_30[-7:])
+        ]
+
+        platform_views = [
+            {"date": day, "platform": platform, "views": views}
+            for day, platform, views in self._conn().execute(
+                "SELECT day, platform, SUM(views) FROM daily WHERE day BETWEEN ? AND ? "
+                "GROUP BY day, platform ORDER BY day, platform",
+                (month.isoformat(), end.isoformat()),
+            )
+        ]
+
+        month_rates = _rates(self._totals(month, end).get("", {}))
+        by_hook = {style: _rates(totals) for style, totals in self._totals(month, end, "hook_style").items()}
+        hook_retention = [
+            {"hook_style": style, "retention_delta": round(rates["retention"] - month_rates["retention"], 2)}
+            for style, rates in sorted(by_hook.items())
+        ]
+        hook_performance = [
+            {
+                "hook_style": style,
+                "ctr_delta": round(rates["ctr"] - month_rates["ctr"], 2),
+                "retention_delta": round(rates["retention"] - month_rates["retention"], 2),
+                "views": int(rates["views"]),
+            }
+            for style, rates in sorted(by_hook.items(), key=lambda item: -item[1]["views"])
+        ]
+
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "as_of": end.isoformat(),
+            "metrics": {
+                "retention": round(rates_now["retention"], 2),
+                "retention_delta": round(rates_now["retention"] - rates_before["retention"], 2),
+                "shares": round(rates_now["shares"], 2),
+                "shares_delta": round(_change(rates_now["shares"], rates_before["shares"]), 2),
+                "follower_conversion": round(rates_now["follower_conversion"], 3),
+                "follower_conversion_delta": round(
+                    rates_now["follower_conversion"] - rates_before["follower_conversion"], 3
+                ),
+            },
+            "daily_posts": daily_posts,
+            "daily_posts_30": daily_posts_30,
+            "platform_views": platform_views,
+            "hook_retention": hook_retention,
+            "hook_performance": hook_performance,
+            "signals": self._signals(end, month, by_hook, month_rates),
+        }
+
+    def _signals(
+        self, end: date, month: date, by_hook: Dict[str, Dict[str, float]], month_rates: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        signals = []
+        today = _rates(self._totals(end, end).get("", {}))
+        yesterday = _rates(self._totals(end - timedelta(days=1), end - timedelta(days=1)).get("", {}))
+        signals.append(
+            {"label": "Top CTR 24 h", "value": f"{today['ctr']:.1f} %", "delta": round(today["ctr"] - yesterday["ctr"], 1)}
+        )
+        if by_hook:
+            best = max(by_hook, key=lambda style: by_hook[style]["retention"])
+            delta = by_hook[best]["retention"] - month_rates["retention"]
+            signals.append({"label": "Best Retention Hook", "value": best, "delta": round(delta, 1)})
+        shares_now = _shares(self._totals(month, end, "platform"))
+        shares_before = _shares(self._totals(month - timedelta(days=30), month - timedelta(days=1), "platform"))
+        if shares_now:
+            top = max(shares_now, key=shares_now.get)
+            signals.append(
+                {
+                    "label": "Top Platform",
+                    "value": f"{top} {shares_now[top]:.0f} %",
+                    "delta": round(shares_now[top] - shares_before.get(top, 0.0), 1),
+                }
+            )
+        return signals
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _rates(totals: Dict[str, float]) -> Dict[str, float]:
+    """Percent rates (retention, CTR, follows per view) and shares per 1K views."""
+    views = totals.get("views", 0) or 0
+    impressions = totals.get("impressions", 0) or 0
+    return {
+        "views": views,
+        "retention": 100 * totals.get("watched", 0) / views if views else 0.0,
+        "shares": 1000 * totals.get("shares", 0) / views if views else 0.0,
+        "follower_conversion": 100 * totals.get("followers", 0) / views if views else 0.0,
+        "ctr": 100 * totals.get("clicks", 0) / impressions if impressions else 0.0,
+    }
+
+
+def _change(now: float, before: float) -> float:
+    return 100 * (now - before) / before if before else 0.0
+
+
+def _shares(by_platform: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    total = sum(totals["views"] for totals in by_platform.values())
+    return {platform: 100 * totals["views"] / total for platform, totals in by_platform.items()} if total else {}
+
+
+_STORES: Dict[Path, AnalyticsStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def store_path(data_dir: Path) -> Path:
+    return Path(data_dir) / DB_FILENAME
+
+
+def open_analytics(data_dir: Path) -> AnalyticsStore:
+    """Return the shared analytics store for ``data_dir``."""
+    path = store_path(data_dir).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = AnalyticsStore(path)
+    return store
+
+
+def emit_summary(store: AnalyticsStore, path: Path, as_of: date | None = None) -> Dict[str, Any]:
+    """Write the summary, keeping hand-maintained keys (e.g. ``feedback``) already in the file."""
+    summary = store.summary(as_of)
+    if not summary:
+        return {}
+    payload = read_json(path, {})
+    payload.update(summary)
+    atomic_write_json(path, payload)
+    return payload
+
+
+def refresh(data_dir: Path, exports: Path | None = None) -> int:
+    """Ingest new export lines and rewrite ``analytics_summary.json``; returns rows read."""
+    store = open_analytics(data_dir)
+    ingested = store.ingest_dir(exports or Path(data_dir) / EXPORTS_DIRNAME)
+    emit_summary(store, Path(data_dir) / SUMMARY_FILENAME)
+    return ingested
+
+
+def main(argv: list[str] | None = None) -> None:
+    from . import settings as settings_module
+
+    parser = argparse.ArgumentParser(description="Roll up per-post analytics exports.")
+    parser.add_argument("command", choices=["refresh", "ingest", "emit"])
+    parser.add_argument("files", nargs="*", type=Path, help="Export files for `ingest`.")
+    parser.add_argument("--data-dir", default=settings_module.settings.data_dir)
+    parser.add_argument("--exports", type=Path, help=f"Defaults to <data-dir>/{EXPORTS_DIRNAME}.")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="Last day of the windows (default: latest data).")
+    parser.add_argument("--no-emit", action="store_true", help="Ingest without rewriting the summary.")
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    store = open_analytics(data_dir)
+    ingested = 0
+    if args.command == "refresh":
+        ingested = store.ingest_dir(args.exports or data_dir / EXPORTS_DIRNAME)
+    elif args.command == "ingest":
+        ingested = sum(store.ingest_file(path) for path in args.files)
+    summary = {} if args.no_emit else emit_summary(store, data_dir / SUMMARY_FILENAME, args.as_of)
+    print(json.dumps({"rows": ingested, "as_of": summary.get("as_of")}))
+
+
+if __name__ == "__main__":
+    main()
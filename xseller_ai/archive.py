@@ -0,0 +1,300 @@
+"""Hot/cold partitioning for the dashboard and publish queues.
+
+Finished or aged entries move out of the working queue files into dated,
+compressed JSONL partitions under ``<data_dir>/archive/<queue>/``. This keeps
+``ai_shorts_queue.json`` and ``publish_queue.json`` small no matter how long
+the system runs. Partitions are gzip by default, or zstd with
+``ARCHIVE_CODEC=zstd`` when ``zstandard`` is installed. Both formats support
+appending a new compressed frame, so archiving never rewrites old data::
+
+    python -m xseller_ai.archive run
+    python -m xseller_ai.archive query publish_queue --since 2026-01-01 --where status=posted
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from . import settings as settings_module
+from .storage import atomic_write_json, file_lock, read_json
+
+ARCHIVE_DIRNAME = "archive"
+CODECS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+@dataclass
+class RetentionPolicy:
+    """When an entry leaves the hot working set."""
+
+    finished_statuses: Tuple[str, ...] = ("posted",)
+    finished_after: timedelta = timedelta(hours=24)
+    errored_after: timedelta = timedelta(days=7)
+    max_age: timedelta = timedelta(days=14)
+
+    @classmethod
+    def from_settings(cls) -> "RetentionPolicy":
+        current = settings_module.settings
+        return cls(
+            finished_after=timedelta(hours=current.archive_posted_after_hours),
+            errored_after=timedelta(days=current.archive_errored_after_days),
+            max_age=timedelta(days=current.archive_max_age_days),
+        )
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _reference_time(entry: dict) -> datetime | None:
+    # A post scheduled ahead ages from its slot, not from when it was queued.
+    return (
+        _parse_ts(entry.get("finished_at"))
+        or _parse_ts(entry.get("scheduled_at"))
+        or _parse_ts(entry.get("queued_at"))
+    )
+
+
+def stamp_missing(items: Iterable[dict], now: datetime | None = None) -> bool:
+    """Give legacy entries a ``queued_at`` so they can age out; True if any changed."""
+    stamp = (now or datetime.now(timezone.utc)).isoformat()
+    changed = False
+    for item in items:
+        if _reference_time(item) is None:
+            item["queued_at"] = stamp
+            changed = True
+    return changed
+
+
+def is_cold(entry: dict, policy: RetentionPolicy, now: datetime) -> bool:
+    reference = _reference_time(entry)
+    if reference is None:
+        return False
+    status = entry.get("status")
+    if status in policy.finished_statuses:
+        return now - reference >= policy.finished_after
+    if status == "error":
+        return now - reference >= policy.errored_after
+    return now - reference >= policy.max_age
+
+
+def split_hot_cold(
+    items: Iterable[dict],
+    policy: RetentionPolicy,
+    now: datetime | None = None,
+) -> Tuple[List[dict], List[dict]]:
+    now = now or datetime.now(timezone.utc)
+    hot: list[dict] = []
+    cold: list[dict] = []
+    for item in items:
+        (cold if is_cold(item, policy, now) else hot).append(item)
+    return hot, cold
+
+
+# -- partitions --------------------------------------------------------------
+
+
+def archive_root(data_dir: Path | None = None) -> Path:
+    return Path(data_dir or settings_module.settings.data_dir) / ARCHIVE_DIRNAME
+
+
+def _codec() -> str:
+    codec = os.getenv("ARCHIVE_CODEC", "gzip").lower()
+    if codec == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return "gzip"
+    return codec if codec in CODECS else "gzip"
+
+
+def _encode(lines: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().compress(lines)
+    return gzip.compress(lines)
+
+
+def _open_partition(path: Path) -> io.BufferedIOBase:
+    if path.name.endswith(CODECS["zstd"]):
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(path.open("rb"), read_across_frames=True)
+    return gzip.open(path, "rb")
+
+
+def append_partition(root: Path, name: str, day: date, items: List[dict]) -> Path:
+    """Append ``items`` to the ``day`` partition of queue ``name`` as one new frame."""
+    codec = _codec()
+    path = root / name / f"{day.isoformat()}{CODECS[codec]}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(json.dumps(item, separators=(",", ":")) + "\n" for item in items).encode("utf-8")
+    with file_lock(path.parent), path.open("ab") as handle:
+        handle.write(_encode(payload, codec))
+        handle.flush()
+        os.fsync(handle.fileno())
+    return path
+
+
+def partitions(root: Path, name: str, since: date | None = None, until: date | None = None) -> List[Path]:
+    directory = root / name
+    if not directory.exists():
+        return []
+    selected: list[Path] = []
+    for path in sorted(directory.iterdir()):
+        suffix = next((s for s in CODECS.values() if path.name.endswith(s)), None)
+        if suffix is None:
+            continue
+        try:
+            day = date.fromisoformat(path.name[: -len(suffix)])
+        except ValueError:
+            continue
+        if (since and day < since) or (until and day > until):
+            continue
+        selected.append(path)
+    return selected
+
+
+def query_archive(
+    name: str,
+    *,
+    since: date | None = None,
+    until: date | None = None,
+    where: Dict[str, object] | Callable[[dict], bool] | None = None,
+    limit: int | None = None,
+    root: Path | None = None,
+) -> Iterator[dict]:
+    """Stream archived entries of queue ``name``, filtered by partition day and ``where``.
+
+    ``where`` is either a field -> value mapping or a predicate.
+    """
+    root = root or archive_root()
+    if isinstance(where, dict):
+        expected = where
+        where = lambda item: all(item.get(key) == value for key, value in expected.items())  # noqa: E731
+    yielded = 0
+    for path in partitions(root, name, since, until):
+        with _open_partition(path) as handle:
+            for raw in handle:
+                item = json.loads(raw)
+                if where and not where(item):
+                    continue
+                yield item
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+
+
+def archive_items(root: Path, name: str, items: Iterable[dict]) -> int:
+    """Write ``items`` into partitions keyed by their finish/queue day."""
+    by_day: Dict[date, List[dict]] = {}
+    today = datetime.now(timezone.utc).date()
+    for item in items:
+        reference = _reference_time(item)
+        by_day.setdefault(reference.date() if reference else today, []).append(item)
+    for day, batch in by_day.items():
+        append_partition(root, name, day, batch)
+    return sum(len(batch) for batch in by_day.values())
+
+
+# -- queue files -------------------------------------------------------------
+
+
+def archive_publish_queue(queue_path: Path, policy: RetentionPolicy | None = None) -> int:
+    """Move finished/aged publish entries out of ``publish_queue.json``."""
+    policy = policy or RetentionPolicy.from_settings()
+    root = archive_root(queue_path.parent)
+    with file_lock(queue_path):
+        queue = read_json(queue_path, {"items": []})
+        stamped = stamp_missing(queue.get("items", []))
+        hot, cold = split_hot_cold(queue.get("items", []), policy)
+        if cold:
+            archive_items(root, "publish_queue", cold)
+            queue["items"] = hot
+        if cold or stamped:
+            atomic_write_json(queue_path, queue)
+    return len(cold)
+
+
+def archive_shorts_queue(queue_path: Path, policy: RetentionPolicy | None = None) -> int:
+    """Move aged shorts and text posts out of the dashboard queue."""
+    from .queue import load_queue, write_queue
+
+    policy = policy or RetentionPolicy.from_settings()
+    root = archive_root(queue_path.parent)
+    moved = 0
+    if settings_module.settings.queue_backend == "sqlite":
+        from .store import open_store
+
+        store = open_store(queue_path.parent, queue_path=queue_path)
+        with store.transaction():
+            queue_data = store.load_queue()
+            for kind, items in queue_data.items():
+                if stamp_missing(items):
+                    store.upsert_items(kind, [item for item in items if "queued_at" in item])
+                _, cold = split_hot_cold(items, policy)
+                if cold:
+                    moved += archive_items(root, kind, cold)
+                    store.delete_items(kind, [item["id"] for item in cold])
+        return moved
+
+    with file_lock(queue_path):
+        queue_data = load_queue(queue_path)
+        changed = False
+        for kind, items in queue_data.items():
+            changed = stamp_missing(items) or changed
+            hot, cold = split_hot_cold(items, policy)
+            if cold:
+                moved += archive_items(root, kind, cold)
+                queue_data[kind] = hot
+        if moved or changed:
+            write_queue(queue_path, queue_data)
+    return moved
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Archive finished queue entries and query the archive.")
+    parser.add_argument("--data-dir", default=settings_module.settings.data_dir)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("run", help="Apply retention policies to the queue files")
+    query = sub.add_parser("query", help="Print archived entries as JSON lines")
+    query.add_argument("name", help="publish_queue, shorts or text_posts")
+    query.add_argument("--since", type=date.fromisoformat)
+    query.add_argument("--until", type=date.fromisoformat)
+    query.add_argument("--where", action="append", default=[], metavar="FIELD=VALUE")
+    query.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    if args.command == "run":
+        moved_posts = archive_publish_queue(data_dir / "publish_queue.json")
+        moved_items = archive_shorts_queue(data_dir / "ai_shorts_queue.json")
+        print(json.dumps({"publish_queue": moved_posts, "ai_shorts_queue": moved_items}))
+        return
+    where = dict(item.split("=", 1) for item in args.where) or None
+    for item in query_archive(
+        args.name,
+        since=args.since,
+        until=args.until,
+        where=where,
+        limit=args.limit,
+        root=archive_root(data_dir),
+    ):
+        print(json.dumps(item))
+
+
+if __name__ == "__main__":
+    main()
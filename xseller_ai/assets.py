@@ -0,0 +1,325 @@
+"""Catalogue of generated output files.
+
+Every file the pipeline writes under ``outputs/<YYYY-MM-DD>/`` is recorded in
+``<data_dir>/assets.sqlite3`` with its kind, item id, day, size and SHA-256.
+The dashboard and publishers query the catalogue instead of globbing the
+output tree. Per-kind totals are kept in a counter table maintained by
+triggers, so "how many videos" is a single-row read however many days
+accumulate.
+
+Files produced outside the pipeline (e.g. rendered MP4s) are picked up by
+``sync``. It only lists directories whose mtime changed since the last
+sync::
+
+    python -m xseller_ai.assets sync --outputs outputs --data-dir app/data
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .storage import content_hash
+
+CATALOG_FILENAME = "assets.sqlite3"
+DAY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+KINDS_BY_SUFFIX = {
+    ".mp4": "video",
+    ".mov": "video",
+    ".webm": "video",
+    ".mp3": "audio",
+    ".wav": "audio",
+    ".png": "image",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".webp": "image",
+    ".txt": "text",
+    ".json": "manifest",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    item_id TEXT,
+    day TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_kind_day ON assets (kind, day);
+CREATE INDEX IF NOT EXISTS assets_item ON assets (item_id);
+CREATE INDEX IF NOT EXISTS assets_sha ON assets (sha256);
+CREATE TABLE IF NOT EXISTS asset_counts (
+    kind TEXT PRIMARY KEY,
+    files INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TRIGGER IF NOT EXISTS assets_count_insert AFTER INSERT ON assets BEGIN
+    INSERT INTO asset_counts (kind, files, bytes) VALUES (NEW.kind, 1, NEW.size)
+    ON CONFLICT(kind) DO UPDATE SET files = files + 1, bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS assets_count_delete AFTER DELETE ON assets BEGIN
+    UPDATE asset_counts SET files = files - 1, bytes = bytes - OLD.size WHERE kind = OLD.kind;
+END;
+CREATE TRIGGER IF NOT EXISTS assets_count_update AFTER UPDATE OF kind, size ON assets BEGIN
+    UPDATE asset_counts SET files = files - 1, bytes = bytes - OLD.size WHERE kind = OLD.kind;
+    INSERT INTO asset_counts (kind, files, bytes) VALUES (NEW.kind, 1, NEW.size)
+    ON CONFLICT(kind) DO UPDATE SET files = files + 1, bytes = bytes + NEW.size;
+END;
+CREATE TABLE IF NOT EXISTS scanned_dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    parent TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class Asset:
+    path: str
+    kind: str
+    item_id: str | None
+    day: str
+    size: int
+    sha256: str
+
+
+def kind_for(path: Path) -> str | None:
+    return KINDS_BY_SUFFIX.get(path.suffix.lower())
+
+
+def day_for(path: Path) -> str:
+    """The ``YYYY-MM-DD`` output directory a file lives under, else its mtime's date."""
+    for parent in path.parents:
+        if DAY_PATTERN.match(parent.name):
+            return parent.name
+    return datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).strftime("%Y-%m-%d")
+
+
+class AssetCatalog:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, path: Path, kind: str | None = None, item_id: str | None = None) -> Asset | None:
+        """Add or refresh one file; returns None for files of an unknown kind."""
+        return next(iter(self.record_many([(path, kind, item_id)])), None)
+
+    def record_many(self, entries: Iterable[Tuple[Path, str | None, str | None]]) -> List[Asset]:
+        """Record ``(path, kind, item_id)`` entries in one transaction.
+
+        Files whose size and mtime match their row are not re-hashed.
+        """
+        conn = self._conn()
+        recorded: List[Asset] = []
+        now = datetime.now(timezone.utc).isoformat()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for path, kind, item_id in entries:
+                path = Path(path).resolve()
+                kind = kind or kind_for(path)
+                if kind is None or not path.is_file():
+                    continue
+                stat = path.stat()
+                row = conn.execute(
+                    "SELECT size, mtime_ns, sha256, item_id FROM assets WHERE path = ?", (str(path),)
+                ).fetchone()
+                if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+                    digest = row[2]
+                else:
+                    digest = content_hash(path)
+                item_id = item_id or (row[3] if row else None)
+                asset = Asset(str(path), kind, item_id, day_for(path), stat.st_size, digest)
+                conn.execute(
+                    "INSERT INTO assets (path, kind, item_id, day, size, mtime_ns, sha256, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET kind = excluded.kind, item_id = excluded.item_id, "
+                    "day = excluded.day, size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                    "sha256 = excluded.sha256, recorded_at = excluded.recorded_at",
+                    (asset.path, kind, item_id, asset.day, asset.size, stat.st_mtime_ns, digest, now),
+                )
+                recorded.append(asset)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return recorded
+
+    def forget(self, paths: Iterable[str | Path]) -> int:
+        # rowcount, unlike total_changes, leaves out the counter triggers' updates.
+        rows = [(str(Path(path).resolve()),) for path in paths]
+        if not rows:
+            return 0
+        return self._conn().executemany("DELETE FROM assets WHERE path = ?", rows).rowcount
+
+    def count(self, kind: str) -> int:
+        row = self._conn().execute("SELECT files FROM asset_counts WHERE kind = ?", (kind,)).fetchone()
+        return row[0] if row else 0
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        rows = self._conn().execute("SELECT kind, files, bytes FROM asset_counts WHERE files > 0 ORDER BY kind")
+        return {kind: {"files": files, "bytes": size} for kind, files, size in rows}
+
+    def get(self, path: str | Path) -> Asset | None:
+        row = self._conn().execute(
+            "SELECT path, kind, item_id, day, size, sha256 FROM assets WHERE path = ?", (str(Path(path).resolve()),)
+        ).fetchone()
+        return Asset(*row) if row else None
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, (str, Path)) and self.get(path) is not None
+
+    def for_item(self, item_id: str) -> List[Asset]:
+        rows = self._conn().execute(
+            "SELECT path, kind, item_id, day, size, sha256 FROM assets WHERE item_id = ? ORDER BY path", (item_id,)
+        )
+        return [Asset(*row) for row in rows]
+
+    def for_digest(self, sha256: str) -> List[Asset]:
+        rows = self._conn().execute(
+            "SELECT path, kind, item_id, day, size, sha256 FROM assets WHERE sha256 = ? ORDER BY path", (sha256,)
+        )
+        return [Asset(*row) for row in rows]
+
+    def iter_assets(self, kind: str | None = None, day: str | None = None) -> Iterator[Asset]:
+        clauses, params = [], []
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if day:
+            clauses.append("day = ?")
+            params.append(day)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT path, kind, item_id, day, size, sha256 FROM assets {where} ORDER BY day, path", params
+        )
+        for row in rows:
+            yield Asset(*row)
+
+    def sync(self, outputs_root: Path) -> Tuple[int, int]:
+        """Reconcile directories under ``outputs_root`` that changed since the last sync.
+
+        Adding or removing an entry bumps its directory's mtime, so an
+        unchanged directory costs one ``stat``: its subdirectories come from
+        the previous sync and its files are not listed. Returns
+        ``(recorded, forgotten)``.
+        """
+        conn = self._conn()
+        seen: Dict[str, int] = {}
+        children: Dict[str, List[str]] = {}
+        for path, mtime, parent in conn.execute("SELECT path, mtime_ns, parent FROM scanned_dirs"):
+            seen[path] = mtime
+            children.setdefault(parent, []).append(path)
+        recorded = forgotten = 0
+        stack = [Path(outputs_root).resolve()]
+        while stack:
+            directory = stack.pop()
+            key = str(directory)
+            try:
+                mtime = directory.stat().st_mtime_ns
+            except FileNotFoundError:
+                forgotten += self._forget_tree(key)
+                continue
+            if seen.get(key) == mtime:
+                stack.extend(Path(child) for child in children.get(key, ()))
+                continue
+            entries = list(directory.iterdir())
+            # Dot directories (the blob store, temp dirs) are not outputs.
+            subdirs = [entry for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
+            files = [entry for entry in entries if entry.is_file() and kind_for(entry)]
+            recorded += len(self.record_many((path, None, None) for path in files))
+            present = {str(path) for path in files}
+            stale = [
+                path
+                for (path,) in conn.execute(
+                    "SELECT path FROM assets WHERE path LIKE ? ESCAPE '\\'", (_like_prefix(key) + "%",)
+                )
+                if str(Path(path).parent) == key and path not in present
+            ]
+            forgotten += self.forget(stale)
+            for removed in set(children.get(key, ())) - {str(path) for path in subdirs}:
+                forgotten += self._forget_tree(removed)
+            conn.execute(
+                "INSERT INTO scanned_dirs (path, mtime_ns, parent) VALUES (?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns, parent = excluded.parent",
+                (key, mtime, str(directory.parent)),
+            )
+            stack.extend(subdirs)
+        return recorded, forgotten
+
+    def _forget_tree(self, directory: str) -> int:
+        """Drop a deleted directory's assets and scan state."""
+        conn = self._conn()
+        prefix = _like_prefix(directory) + "%"
+        forgotten = conn.execute("DELETE FROM assets WHERE path LIKE ? ESCAPE '\\'", (prefix,)).rowcount
+        conn.execute("DELETE FROM scanned_dirs WHERE path = ? OR path LIKE ? ESCAPE '\\'", (directory, prefix))
+        return forgotten
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _like_prefix(directory: str) -> str:
+    escaped = directory.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.rstrip("/") + "/"
+
+
+_CATALOGS: Dict[Path, AssetCatalog] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def catalog_path(data_dir: Path) -> Path:
+    return Path(data_dir) / CATALOG_FILENAME
+
+
+def open_catalog(data_dir: Path) -> AssetCatalog:
+    """Return the shared catalogue for ``data_dir``."""
+    path = catalog_path(data_dir).resolve()
+    with _CATALOGS_LOCK:
+        catalog = _CATALOGS.get(path)
+        if catalog is None:
+            catalog = _CATALOGS[path] = AssetCatalog(path)
+    return catalog
+
+
+def main(argv: list[str] | None = None) -> None:
+    from . import settings as settings_module
+
+    parser = argparse.ArgumentParser(description="Manage the output asset catalogue.")
+    parser.add_argument("command", choices=["sync", "stats"])
+    parser.add_argument("--outputs", default=settings_module.settings.outputs_dir)
+    parser.add_argument("--data-dir", default=settings_module.settings.data_dir)
+    args = parser.parse_args(argv)
+
+    catalog = open_catalog(Path(args.data_dir))
+    if args.command == "sync":
+        recorded, forgotten = catalog.sync(Path(args.outputs))
+        print(f"Recorded {recorded} files, forgot {forgotten}.")
+    print(json.dumps(catalog.totals()))
+
+
+if __name__ == "__main__":
+    main()
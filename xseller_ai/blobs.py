@@ -0,0 +1,253 @@
+"""Content-addressed storage for generated output files.
+
+Each file under ``outputs/<YYYY-MM-DD>/`` is stored once as
+``outputs/.blobs/<aa>/<sha256>``, and the dated path becomes a hard link to
+that blob. When a later run produces the same bytes, its dated file links to
+the existing blob and takes no extra disk. The dated directories still look
+and read exactly as before.
+
+Blobs are read-only, so a view cannot be edited in place and change every
+day that shares it. The pipeline replaces files atomically instead.
+
+``gc`` deletes blobs that nothing needs any more, together with their dated
+views and catalogue rows. A blob is kept while any of these holds:
+
+- a queue entry, history record or publish queue entry names one of its paths;
+- a file it backs belongs to a story that is still queued;
+- its newest dated view is within ``BLOB_RETENTION_DAYS`` (default 30).
+
+Usage::
+
+    python -m xseller_ai.blobs ingest      # convert existing outputs to links
+    python -m xseller_ai.blobs gc --dry-run
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import stat
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Set
+
+from . import settings as settings_module
+from .assets import KINDS_BY_SUFFIX, AssetCatalog, open_catalog
+from .storage import content_hash, read_json
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIRNAME = ".blobs"
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+
+@dataclass
+class References:
+    """Output paths and queued story ids that keep blobs alive."""
+
+    paths: Set[str] = field(default_factory=set)
+    item_ids: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class GcResult:
+    blobs: int = 0
+    views: int = 0
+    bytes: int = 0
+    kept: int = 0
+
+
+class BlobStore:
+    def __init__(self, outputs_root: Path) -> None:
+        # Blobs live inside the outputs tree so views can hard-link to them.
+        self.outputs_root = Path(outputs_root).resolve()
+        self.root = self.outputs_root / BLOB_DIRNAME
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def iter_blobs(self) -> Iterator[Path]:
+        if not self.root.exists():
+            return
+        for shard in self.root.iterdir():
+            if shard.is_dir():
+                yield from (path for path in shard.iterdir() if not path.name.startswith("."))
+
+    def put(self, path: Path, digest: str | None = None) -> str | None:
+        """Make ``path`` a link to its blob, storing the blob if it is new.
+
+        Returns the digest, or None when the filesystem cannot hard-link (the
+        file is left as an ordinary copy).
+        """
+        path = Path(path)
+        digest = digest or content_hash(path)
+        blob = self.blob_path(digest)
+        try:
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(path, blob)
+                    os.chmod(blob, READ_ONLY)
+                    return digest
+                except FileExistsError:
+                    # Another run stored the same bytes first; link to theirs.
+                    pass
+            if os.path.samefile(path, blob):
+                return digest
+            temp = path.with_name(f".{path.name}.{os.getpid()}.link")
+            temp.unlink(missing_ok=True)
+            os.link(blob, temp)
+            os.replace(temp, path)
+        except OSError as exc:
+            logger.warning("Could not link %s into the blob store: %s", path, exc)
+            return None
+        return digest
+
+    def put_many(self, catalog: AssetCatalog, paths: Iterable[Path] | None = None) -> int:
+        """Link catalogued files (all of them by default) to blobs; returns how many."""
+        if paths is None:
+            assets = list(catalog.iter_assets())
+        else:
+            assets = [asset for asset in (catalog.get(path) for path in paths) if asset is not None]
+        linked = 0
+        for asset in assets:
+            if Path(asset.path).is_file() and self.put(Path(asset.path), asset.sha256):
+                linked += 1
+        return linked
+
+    def gc(
+        self,
+        catalog: AssetCatalog,
+        references: References,
+        retention: timedelta,
+        *,
+        dry_run: bool = False,
+    ) -> GcResult:
+        """Delete unreferenced blobs whose newest view is older than ``retention``."""
+        catalog.sync(self.outputs_root)
+        cutoff = datetime.now(timezone.utc) - retention
+        cutoff_day = cutoff.strftime("%Y-%m-%d")
+        live: Set[str] = set()
+        tracked: Set[str] = set()
+        for asset in catalog.iter_assets():
+            tracked.add(asset.sha256)
+            if asset.day >= cutoff_day or asset.path in references.paths or asset.item_id in references.item_ids:
+                live.add(asset.sha256)
+
+        result = GcResult()
+        emptied: Set[Path] = set()
+        for blob in self.iter_blobs():
+            digest = blob.name
+            if digest in live:
+                result.kept += 1
+                continue
+            info = blob.stat()
+            # A blob no view points at ages from when it was written.
+            if digest not in tracked and info.st_mtime >= cutoff.timestamp():
+                result.kept += 1
+                continue
+            views = catalog.for_digest(digest)
+            result.blobs += 1
+            result.views += len(views)
+            result.bytes += info.st_size
+            if dry_run:
+                continue
+            for view in views:
+                Path(view.path).unlink(missing_ok=True)
+                emptied.add(Path(view.path).parent)
+            catalog.forget(view.path for view in views)
+            blob.unlink(missing_ok=True)
+        if not dry_run:
+            self._prune(emptied)
+        return result
+
+    def _prune(self, directories: Iterable[Path]) -> None:
+        """Remove directories GC left empty, up to (not including) the outputs root."""
+        for directory in sorted(directories, key=lambda path: len(path.parts), reverse=True):
+            while directory != self.outputs_root and self.outputs_root in directory.parents:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break
+                directory = directory.parent
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _add_paths(references: References, records: Iterable[Any], outputs_root: Path) -> None:
+    prefix = f"{outputs_root}{os.sep}"
+    suffixes = tuple(KINDS_BY_SUFFIX)
+    for record in records:
+        for value in _strings(record):
+            if not value.lower().endswith(suffixes) or "://" in value:
+                continue
+            # Stored paths are relative to the pipeline's working directory, like the catalogue's.
+            resolved = str(Path(value).resolve())
+            if resolved.startswith(prefix):
+                references.paths.add(resolved)
+
+
+def collect_references(data_dir: Path, outputs_root: Path) -> References:
+    """Everything the dashboard queue, history and publish queue still point at."""
+    from .history_log import open_log
+    from .queue import load_queue
+
+    data_dir = Path(data_dir)
+    outputs_root = Path(outputs_root).resolve()
+    references = References()
+    if settings_module.settings.queue_backend == "sqlite":
+        from .store import open_store
+
+        store = open_store(data_dir)
+        queue_data = store.load_queue()
+        history: Iterable[dict] = store.iter_history()
+    else:
+        queue_data = load_queue(data_dir / "ai_shorts_queue.json")
+        history = open_log(data_dir / "ai_shorts_db.json").iter_records()
+    for items in queue_data.values():
+        references.item_ids.update(item["id"] for item in items if item.get("id"))
+        _add_paths(references, items, outputs_root)
+    _add_paths(references, history, outputs_root)
+    _add_paths(references, read_json(data_dir / "publish_queue.json", {"items": []}).get("items", []), outputs_root)
+    return references
+
+
+def open_blobs(outputs_root: Path | None = None) -> BlobStore:
+    return BlobStore(Path(outputs_root or settings_module.settings.outputs_dir))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the content-addressed output store.")
+    parser.add_argument("command", choices=["ingest", "gc"])
+    parser.add_argument("--outputs", default=settings_module.settings.outputs_dir)
+    parser.add_argument("--data-dir", default=settings_module.settings.data_dir)
+    parser.add_argument("--retention-days", type=float, default=settings_module.settings.blob_retention_days)
+    parser.add_argument("--dry-run", action="store_true", help="Report what gc would delete.")
+    args = parser.parse_args(argv)
+
+    store = open_blobs(Path(args.outputs))
+    catalog = open_catalog(Path(args.data_dir))
+    started = time.perf_counter()
+    if args.command == "ingest":
+        catalog.sync(store.outputs_root)
+        print(json.dumps({"linked": store.put_many(catalog)}))
+        return
+    references = collect_references(Path(args.data_dir), store.outputs_root)
+    result = store.gc(catalog, references, timedelta(days=args.retention_days), dry_run=args.dry_run)
+    print(json.dumps({**asdict(result), "dry_run": args.dry_run, "seconds": round(time.perf_counter() - started, 3)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Append-only JSONL log for the item history.
+
+History lives in ``<db>.log/`` next to the legacy ``ai_shorts_db.json``. New
+records are appended to numbered ``*.jsonl`` segments, so a pipeline run costs
+O(new items) instead of rewriting the whole file. A sidecar ``index.tsv``
+(``id``, segment, offset, length) is appended alongside. Readers load the index
+(ids only) and stream records, and the latest record for an id wins.
+:meth:`HistoryLog.compact` merges segments and drops superseded records::
+
+    python -m xseller_ai.history_log compact --data-dir app/data
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from . import metrics
+from .storage import atomic_write_text, file_lock
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_BYTES = 4 * 1024 * 1024
+MAX_SEGMENTS = 8
+INDEX_NAME = "index.tsv"
+
+Location = Tuple[str, int, int]
+
+# Keyed on (inode, mtime, size): a rewrite replaces index.tsv with a file of
+# often the same length that points at a new segment.
+_INDEX_CACHE: Dict[Path, Tuple[Tuple[int, int, int], Dict[str, Location]]] = {}
+_INDEX_CACHE_LOCK = threading.Lock()
+
+
+def log_dir(db_path: Path) -> Path:
+    return Path(db_path).with_suffix(".log")
+
+
+class HistoryLog:
+    def __init__(self, root: Path, segment_bytes: int = SEGMENT_BYTES, max_segments: int = MAX_SEGMENTS) -> None:
+        self.root = Path(root)
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.index_path = self.root / INDEX_NAME
+
+    # -- index -----------------------------------------------------------
+
+    def segments(self) -> List[Path]:
+        if not self.root.exists():
+            return []
+        return sorted(self.root.glob("*.jsonl"))
+
+    def index(self) -> Dict[str, Location]:
+        """Return ``{id: (segment, offset, length)}``; cached until index.tsv changes."""
+        try:
+            info = self.index_path.stat()
+        except FileNotFoundError:
+            return {}
+        stamp = (info.st_ino, info.st_mtime_ns, info.st_size)
+        key = self.index_path.resolve()
+        with _INDEX_CACHE_LOCK:
+            cached = _INDEX_CACHE.get(key)
+            if cached and cached[0] == stamp:
+                metrics.CACHE_REQUESTS.labels("history_index", "hit").inc()
+                return cached[1]
+        metrics.CACHE_REQUESTS.labels("history_index", "miss").inc()
+        index: Dict[str, Location] = {}
+        with self.index_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                parts = line.rstrip("\n").split("\t")
+                if not line.endswith("\n") or len(parts) != 4:
+                    continue  # torn write; repaired on the next append
+                index[parts[0]] = (parts[1], int(parts[2]), int(parts[3]))
+        with _INDEX_CACHE_LOCK:
+            _INDEX_CACHE[key] = (stamp, index)
+        return index
+
+    def ids(self) -> Iterable[str]:
+        return self.index().keys()
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self.index()
+
+    def __len__(self) -> int:
+        return len(self.index())
+
+    def _repair(self, index: Dict[str, Location]) -> None:
+        """Re-index records written after the last index line (e.g. after a crash)."""
+        if self.index_path.exists():
+            with self.index_path.open("r+b") as handle:
+                end = handle.seek(0, os.SEEK_END)
+                if end:
+                    handle.seek(end - 1)
+                    if handle.read(1) != b"\n":
+                        handle.seek(0)
+                        data = handle.read()
+                        handle.truncate(data.rfind(b"\n") + 1)
+        indexed_end: Dict[str, int] = {}
+        for segment, offset, length in index.values():
+            indexed_end[segment] = max(indexed_end.get(segment, 0), offset + length)
+        # Only segments at or after the newest indexed one can hold unindexed
+        # appends; older files are leftovers from an interrupted compaction.
+        newest = max(indexed_end, default="")
+        missing: list[str] = []
+        for segment in self.segments():
+            if segment.name < newest:
+                continue
+            size = segment.stat().st_size
+            start = indexed_end.get(segment.name, 0)
+            if start >= size:
+                continue
+            with segment.open("r+b") as handle:
+                handle.seek(start)
+                offset = start
+                for raw in handle:
+                    if not raw.endswith(b"\n"):
+                        handle.truncate(offset)  # torn final line
+                        break
+                    try:
+                        record = json.loads(raw)
+                    except json.JSONDecodeError:
+                        offset += len(raw)
+                        continue
+                    missing.append(f"{record.get('id')}\t{segment.name}\t{offset}\t{len(raw)}\n")
+                    offset += len(raw)
+        if missing:
+            logger.warning("Re-indexed %d history records in %s", len(missing), self.root)
+            with self.index_path.open("a", encoding="utf-8") as handle:
+                handle.writelines(missing)
+
+    # -- writes ----------------------------------------------------------
+
+    def _active_segment(self) -> Path:
+        segments = self.segments()
+        if segments and segments[-1].stat().st_size < self.segment_bytes:
+            return segments[-1]
+        number = int(segments[-1].stem) + 1 if segments else 1
+        return self.root / f"{number:08d}.jsonl"
+
+    def append(self, records: Iterable[dict]) -> int:
+        """Append records (new versions supersede older ones); returns the count."""
+        with file_lock(self.root):
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._repair(self.index())
+            written = self._append_locked(records)
+            if written and len(self.segments()) > self.max_segments:
+                self.compact()
+        return written
+
+    def append_new(self, records: Iterable[dict]) -> int:
+        """Append only records whose id is not in the log yet."""
+        with file_lock(self.root):
+            known = self.index()
+            fresh: dict[str, dict] = {}
+            for record in records:
+                if record.get("id") and record["id"] not in known:
+                    fresh.setdefault(record["id"], record)
+            return self.append(fresh.values()) if fresh else 0
+
+    def _append_locked(self, records: Iterable[dict]) -> int:
+        segment = self._active_segment()
+        offset = segment.stat().st_size if segment.exists() else 0
+        lines: list[bytes] = []
+        index_lines: list[str] = []
+        for record in records:
+            if not record.get("id"):
+                continue
+            raw = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+            lines.append(raw)
+            index_lines.append(f"{record['id']}\t{segment.name}\t{offset}\t{len(raw)}\n")
+            offset += len(raw)
+        if not lines:
+            return 0
+        with segment.open("ab") as handle:
+            handle.writelines(lines)
+            handle.flush()
+            os.fsync(handle.fileno())
+        with self.index_path.open("a", encoding="utf-8") as handle:
+            handle.writelines(index_lines)
+            handle.flush()
+            os.fsync(handle.fileno())
+        return len(lines)
+
+    def rewrite(self, records: Iterable[dict]) -> None:
+        """Replace the whole log with ``records`` (used by ``write_history``)."""
+        with file_lock(self.root):
+            self._replace(list(records))
+
+    def compact(self) -> int:
+        """Merge all segments into one, keeping the latest record per id."""
+        with file_lock(self.root):
+            latest: dict[str, dict] = {}
+            for record in self._scan():
+                latest[record["id"]] = record
+            self._replace(list(latest.values()))
+            return len(latest)
+
+    def _replace(self, records: List[dict]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        old = self.segments()
+        number = int(old[-1].stem) + 1 if old else 1
+        target = self.root / f"{number:08d}.jsonl"
+        body: list[str] = []
+        index_lines: list[str] = []
+        offset = 0
+        for record in records:
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            length = len(line.encode("utf-8"))
+            body.append(line)
+            index_lines.append(f"{record['id']}\t{target.name}\t{offset}\t{length}\n")
+            offset += length
+        atomic_write_text(target, "".join(body))
+        atomic_write_text(self.index_path, "".join(index_lines))
+        with _INDEX_CACHE_LOCK:
+            _INDEX_CACHE.pop(self.index_path.resolve(), None)
+        for segment in old:
+            segment.unlink(missing_ok=True)
+
+    # -- reads -----------------------------------------------------------
+
+    def _scan(self) -> Iterator[dict]:
+        for segment in self.segments():
+            try:
+                handle = segment.open("rb")
+            except FileNotFoundError:
+                continue  # compacted away while streaming
+            with handle:
+                for raw in handle:
+                    try:
+                        record = json.loads(raw)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("id"):
+                        yield record
+
+    def iter_records(self) -> Iterator[dict]:
+        """Stream the latest version of every record in append order."""
+        index = self.index()
+        for segment in self.segments():
+            try:
+                handle = segment.open("rb")
+            except FileNotFoundError:
+                continue
+            with handle:
+                offset = 0
+                for raw in handle:
+                    try:
+                        record = json.loads(raw)
+                    except json.JSONDecodeError:
+                        record = {}
+                    location = index.get(record.get("id"))
+                    if location and location[0] == segment.name and location[1] == offset:
+                        yield record
+                    offset += len(raw)
+
+    def get(self, item_id: str) -> dict | None:
+        location = self.index().get(item_id)
+        if not location:
+            return None
+        segment, offset, length = location
+        with (self.root / segment).open("rb") as handle:
+            handle.seek(offset)
+            return json.loads(handle.read(length))
+
+    # -- migration -------------------------------------------------------
+
+    def migrate_from_json(self, db_path: Path) -> bool:
+        """Import a legacy ``ai_shorts_db.json`` once, then move it aside."""
+        db_path = Path(db_path)
+        if not db_path.exists():
+            return False
+        from .storage import read_json
+
+        with file_lock(self.root):
+            if not db_path.exists():
+                return False
+            records = read_json(db_path, [])
+            if isinstance(records, list):
+                self.append_new(records)
+            os.replace(db_path, db_path.with_name(f"{db_path.name}.migrated"))
+        logger.info("Migrated %s into %s", db_path, self.root)
+        return True
+
+
+def open_log(db_path: Path) -> HistoryLog:
+    """Return the log that replaces ``db_path``, importing the JSON file if present."""
+    log = HistoryLog(log_dir(db_path))
+    log.migrate_from_json(db_path)
+    return log
+
+
+def main(argv: list[str] | None = None) -> None:
+    from . import settings as settings_module
+
+    parser = argparse.ArgumentParser(description="Maintain the append-only history log.")
+    parser.add_argument("command", choices=["compact", "stats"])
+    parser.add_argument("--data-dir", default=settings_module.settings.data_dir)
+    args = parser.parse_args(argv)
+
+    log = open_log(Path(args.data_dir) / "ai_shorts_db.json")
+    if args.command == "compact":
+        before = len(log.segments())
+        kept = log.compact()
+        print(f"Compacted {before} segment(s) into 1 with {kept} record(s).")
+    else:
+        print(json.dumps({"records": len(log), "segments": len(log.segments())}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""Typed, append-only store for Hook Lab experiments.
+
+``hooks_lab.csv`` grows with each week's experiments. Its rows are loaded into
+``<data_dir>/hook_lab.sqlite3`` and keyed by date, story, style and hook text.
+The file's ingested byte offset is remembered, along with a hash of the last
+line before it. A refresh parses only the rows appended since the last one.
+When that last line no longer matches, an earlier row was edited in place
+(e.g. ``retention_3s`` or ``keep_or_kill`` filled in later). In that case the
+file is re-read from the start: edited rows are updated, and rows no longer in
+the file are removed. The CSV is the source of record.
+
+Triggers maintain per-style counts and sums: experiments, retention and CTR
+totals, keep/kill tallies. Style means are a read of a few rows, and the top
+hooks by retention come from an index, so the dashboard never reads or sorts
+the whole file::
+
+    python -m xseller_ai.hook_lab ingest --csv app/data/hooks_lab.csv
+    python -m xseller_ai.hook_lab stats
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+DB_FILENAME = "hook_lab.sqlite3"
+CSV_FILENAME = "hooks_lab.csv"
+COLUMNS = ("date", "story_title", "hook_style", "hook_text", "retention_3s", "ctr", "keep_or_kill")
+KEY_COLUMNS = COLUMNS[:4]
+# How far back from the offset to look for the start of the last ingested line.
+TAIL_WINDOW = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    story_title TEXT NOT NULL,
+    hook_style TEXT NOT NULL,
+    hook_text TEXT NOT NULL,
+    retention_3s REAL,
+    ctr REAL,
+    keep_or_kill TEXT NOT NULL,
+    UNIQUE (date, story_title, hook_style, hook_text)
+);
+CREATE INDEX IF NOT EXISTS experiments_retention ON experiments (retention_3s DESC);
+CREATE TABLE IF NOT EXISTS style_stats (
+    hook_style TEXT PRIMARY KEY,
+    experiments INTEGER NOT NULL DEFAULT 0,
+    retention_n INTEGER NOT NULL DEFAULT 0,
+    retention_sum REAL NOT NULL DEFAULT 0,
+    ctr_n INTEGER NOT NULL DEFAULT 0,
+    ctr_sum REAL NOT NULL DEFAULT 0,
+    keeps INTEGER NOT NULL DEFAULT 0,
+    kills INTEGER NOT NULL DEFAULT 0
+);
+CREATE TRIGGER IF NOT EXISTS experiments_stats_insert AFTER INSERT ON experiments BEGIN
+    INSERT INTO style_stats (hook_style, experiments, retention_n, retention_sum, ctr_n, ctr_sum, keeps, kills)
+    VALUES (
+        NEW.hook_style, 1,
+        NEW.retention_3s IS NOT NULL, COALESCE(NEW.retention_3s, 0),
+        NEW.ctr IS NOT NULL, COALESCE(NEW.ctr, 0),
+        NEW.keep_or_kill = 'keep', NEW.keep_or_kill = 'kill'
+    )
+    ON CONFLICT(hook_style) DO UPDATE SET
+        experiments = experiments + 1,
+        retention_n = retention_n + excluded.retention_n, retention_sum = retention_sum + excluded.retention_sum,
+        ctr_n = ctr_n + excluded.ctr_n, ctr_sum = ctr_sum + excluded.ctr_sum,
+        keeps = keeps + excluded.keeps, kills = kills + excluded.kills;
+END;
+CREATE TRIGGER IF NOT EXISTS experiments_stats_delete AFTER DELETE ON experiments BEGIN
+    UPDATE style_stats SET
+        experiments = experiments - 1,
+        retention_n = retention_n - (OLD.retention_3s IS NOT NULL),
+        retention_sum = retention_sum - COALESCE(OLD.retention_3s, 0),
+        ctr_n = ctr_n - (OLD.ctr IS NOT NULL), ctr_sum = ctr_sum - COALESCE(OLD.ctr, 0),
+        keeps = keeps - (OLD.keep_or_kill = 'keep'), kills = kills - (OLD.keep_or_kill = 'kill')
+    WHERE hook_style = OLD.hook_style;
+END;
+CREATE TRIGGER IF NOT EXISTS experiments_stats_update AFTER UPDATE ON experiments BEGIN
+    UPDATE style_stats SET
+        retention_n = retention_n - (OLD.retention_3s IS NOT NULL) + (NEW.retention_3s IS NOT NULL),
+        retention_sum = retention_sum - COALESCE(OLD.retention_3s, 0) + COALESCE(NEW.retention_3s, 0),
+        ctr_n = ctr_n - (OLD.ctr IS NOT NULL) + (NEW.ctr IS NOT NULL),
+        ctr_sum = ctr_sum - COALESCE(OLD.ctr, 0) + COALESCE(NEW.ctr, 0),
+        keeps = keeps - (OLD.keep_or_kill = 'keep') + (NEW.keep_or_kill = 'keep'),
+        kills = kills - (OLD.keep_or_kill = 'kill') + (NEW.keep_or_kill = 'kill')
+    WHERE hook_style = NEW.hook_style;
+END;
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    header TEXT,
+    mtime_ns INTEGER NOT NULL DEFAULT 0,
+    tail TEXT
+);
+"""
+# Added after the first release; older databases get them in _add_source_columns.
+SOURCE_COLUMNS = {"mtime_ns": "INTEGER NOT NULL DEFAULT 0", "tail": "TEXT"}
+
+
+def _float(value: Any) -> float | None:
+    if value in (None, ""):
+        return None
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+def normalize(row: Dict[str, Any]) -> Tuple | None:
+    """One CSV row as an ``experiments`` tuple in :data:`COLUMNS` order; None without a date or hook text."""
+    if not isinstance(row, dict):
+        return None
+    day = str(row.get("date") or "").strip()
+    hook_text = str(row.get("hook_text") or "").strip()
+    if not day or not hook_text:
+        return None
+    return (
+        day,
+        str(row.get("story_title") or "").strip(),
+        str(row.get("hook_style") or "unknown").strip() or "unknown",
+        hook_text,
+        _float(row.get("retention_3s")),
+        _float(row.get("ctr")),
+        str(row.get("keep_or_kill") or "").strip().lower(),
+    )
+
+
+def _fingerprint(line: bytes) -> str:
+    return hashlib.sha256(line).hexdigest()
+
+
+def _last_line(handle, offset: int) -> bytes:
+    """The complete line that ends at ``offset`` (including its newline)."""
+    start = max(0, offset - TAIL_WINDOW)
+    handle.seek(start)
+    data = handle.read(offset - start)
+    return data[data.rfind(b"\n", 0, len(data) - 1) + 1 :]
+
+
+def _points(value: float | None, mean: float | None) -> float | None:
+    if value is None or mean is None:
+        return None
+    # Sheets log rates either as fractions (0.62) or as percents (62).
+    scale = 100 if abs(mean) <= 1 else 1
+    return round((value - mean) * scale, 2)
+
+
+class HookLabStore:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+        self._add_source_columns()
+
+    def _add_source_columns(self) -> None:
+        conn = self._conn()
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(sources)")}
+        for name, definition in SOURCE_COLUMNS.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE sources ADD COLUMN {name} {definition}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, rows: List[Tuple]) -> int:
+        # rowcount covers new and changed rows; unchanged ones and trigger writes are left out.
+        cursor = conn.executemany(
+            f"INSERT INTO experiments ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+            f"ON CONFLICT({', '.join(KEY_COLUMNS)}) DO UPDATE SET retention_3s = excluded.retention_3s, "
+            "ctr = excluded.ctr, keep_or_kill = excluded.keep_or_kill "
+            "WHERE retention_3s IS NOT excluded.retention_3s OR ctr IS NOT excluded.ctr "
+            "OR keep_or_kill IS NOT excluded.keep_or_kill",
+            rows,
+        )
+        return max(cursor.rowcount, 0)
+
+    def _insert(self, conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> int:
+        return self._upsert(conn, [row for row in map(normalize, rows) if row is not None])
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Add or update experiments; returns how many were new or changed."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            added = self._insert(conn, rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return added
+
+    def ingest_csv(self, path: Path) -> int:
+        """Apply changes to ``path`` since the last call; returns rows added or changed.
+
+        Appended rows are read from the stored offset. A replaced, truncated or
+        edited file (the line before the offset no longer matches its hash) is
+        re-read from the start and reconciled.
+        """
+        path = Path(path).resolve()
+        if not path.exists():
+            return 0
+        info = path.stat()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT inode, offset, header, mtime_ns, tail FROM sources WHERE path = ?", (str(path),)
+            ).fetchone()
+            if row and (row[0], row[3], row[1]) == (info.st_ino, info.st_mtime_ns, info.st_size):
+                conn.execute("COMMIT")
+                return 0
+            with path.open("rb") as handle:
+                offset, header = 0, None
+                # Without growth a changed mtime means an in-place edit, so only growth can take the fast path.
+                if row and row[0] == info.st_ino and 0 < row[1] < info.st_size:
+                    if row[4] == _fingerprint(_last_line(handle, row[1])):
+                        offset, header = row[1], row[2]
+                handle.seek(offset)
+                chunk = handle.read(info.st_size - offset)
+            # A row still being written is left for the next call.
+            end = chunk.rfind(b"\n") + 1
+            lines = chunk[:end].decode("utf-8-sig" if offset == 0 else "utf-8", errors="replace").splitlines()
+            if header is None and lines:
+                header = lines.pop(0)
+            rows: List[Tuple] = []
+            if header:
+                fieldnames = next(csv.reader([header]))
+                reader = csv.DictReader(io.StringIO("\n".join(lines)), fieldnames=fieldnames)
+                rows = [item for item in map(normalize, reader) if item is not None]
+            changed = self._upsert(conn, rows)
+            if offset == 0:
+                changed += self._remove_missing(conn, rows)
+            tail = chunk[:end].rstrip(b"\n").rsplit(b"\n", 1)[-1] + b"\n" if end else None
+            conn.execute(
+                "INSERT INTO sources (path, inode, offset, header, mtime_ns, tail) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET inode = excluded.inode, offset = excluded.offset, "
+                "header = excluded.header, mtime_ns = excluded.mtime_ns, "
+                "tail = COALESCE(excluded.tail, sources.tail)",
+                (
+                    str(path),
+                    info.st_ino,
+                    offset + end,
+                    header,
+                    info.st_mtime_ns,
+                    _fingerprint(tail) if tail else None,
+                ),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return changed
+
+    @staticmethod
+    def _remove_missing(conn: sqlite3.Connection, rows: List[Tuple]) -> int:
+        """After a full re-read, drop experiments that are no longer in the file."""
+        key_list = ", ".join(KEY_COLUMNS)
+        conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS seen ({key_list})")
+        conn.execute("DELETE FROM seen")
+        conn.executemany("INSERT INTO seen VALUES (?, ?, ?, ?)", [row[:4] for row in rows])
+        removed = conn.execute(
+            f"DELETE FROM experiments WHERE ({key_list}) NOT IN (SELECT {key_list} FROM seen)"
+        ).rowcount
+        conn.execute("DELETE FROM seen")
+        return removed
+
+    def count(self) -> int:
+        row = self._conn().execute("SELECT SUM(experiments) FROM style_stats").fetchone()
+        return int(row[0] or 0)
+
+    def _rows(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        return [dict(zip(COLUMNS, row)) for row in self._conn().execute(sql, params)]
+
+    def top(self, k: int = 5) -> List[Dict[str, Any]]:
+        """The ``k`` experiments with the highest 3-second retention."""
+        return self._rows(
+            f"SELECT {', '.join(COLUMNS)} FROM experiments WHERE retention_3s IS NOT NULL "
+            "ORDER BY retention_3s DESC LIMIT ?",
+            (k,),
+        )
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """Experiments newest first."""
+        return self._rows(
+            f"SELECT {', '.join(COLUMNS)} FROM experiments ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)
+        )
+
+    def style_stats(self) -> List[Dict[str, Any]]:
+        """Per hook style: experiments, mean retention and CTR, keep/kill counts and keep rate."""
+        rows = self._conn().execute(
+            "SELECT hook_style, experiments, retention_n, retention_sum, ctr_n, ctr_sum, keeps, kills "
+            "FROM style_stats WHERE experiments > 0 ORDER BY experiments DESC, hook_style"
+        )
+        stats = []
+        for style, experiments, retention_n, retention_sum, ctr_n, ctr_sum, keeps, kills in rows:
+            stats.append(
+                {
+                    "hook_style": style,
+                    "experiments": experiments,
+                    "retention_3s": retention_sum / retention_n if retention_n else None,
+                    "ctr": ctr_sum / ctr_n if ctr_n else None,
+                    "keeps": keeps,
+                    "kills": kills,
+                    "keep_rate": keeps / (keeps + kills) if keeps + kills else None,
+                }
+            )
+        return stats
+
+    def hook_performance(self) -> List[Dict[str, Any]]:
+        """Per-style retention and CTR relative to the mean of all experiments, in percentage points."""
+        stats = self.style_stats()
+        row = self._conn().execute(
+            "SELECT SUM(retention_sum) / NULLIF(SUM(retention_n), 0), SUM(ctr_sum) / NULLIF(SUM(ctr_n), 0) "
+            "FROM style_stats"
+        ).fetchone()
+        retention_mean, ctr_mean = row if row else (None, None)
+        return [
+            {
+                "hook_style": style["hook_style"],
+                "ctr_delta": _points(style["ctr"], ctr_mean),
+                "retention_delta": _points(style["retention_3s"], retention_mean),
+                "experiments": style["experiments"],
+                "keep_rate": round(style["keep_rate"], 2) if style["keep_rate"] is not None else None,
+            }
+            for style in stats
+        ]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_STORES: Dict[Path, HookLabStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def store_path(data_dir: Path) -> Path:
+    return Path(data_dir) / DB_FILENAME
+
+
+def open_hook_lab(data_dir: Path) -> HookLabStore:
+    """Return the shared Hook Lab store for ``data_dir``."""
+    path = store_path(data_dir).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = HookLabStore(path)
+    return store
+
+
+def main(argv: list[str] | None = None) -> None:
+    from . import settings as settings_module
+
+    parser = argparse.ArgumentParser(description="Manage the Hook Lab experiment store.")
+    parser.add_argument("command", choices=["ingest", "stats"])
+    parser.add_argument("--data-dir", default=settings_module.settings.data_dir)
+    parser.add_argument("--csv", type=Path, help=f"Defaults to <data-dir>/{CSV_FILENAME}.")
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    store = open_hook_lab(data_dir)
+    if args.command == "ingest":
+        print(json.dumps({"added": store.ingest_csv(args.csv or data_dir / CSV_FILENAME)}))
+    print(json.dumps({"experiments": store.count(), "styles": store.style_stats()}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Import-time benchmark for the automation package.
+
+Runs ``python -X importtime`` in a fresh interpreter, parses the per-module
+timings and fails when the cumulative cost exceeds the budget or when a heavy
+dependency is imported eagerly::
+
+    python -m xseller_ai.importtime --budget-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PIPELINE = ROOT / "pipelines" / "run_ai_news.py"
+
+
+def pipeline_targets(path: Path = PIPELINE, package: str = "xseller_ai") -> List[str]:
+    """``package`` modules that ``path`` imports at module level, i.e. before main() runs."""
+    targets: Dict[str, None] = {}
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module == package:
+            names = [f"{package}.{alias.name}" for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module]
+        else:
+            continue
+        targets.update(dict.fromkeys(name for name in names if name.split(".")[0] == package))
+    return sorted(targets)
+
+
+# Kept in step with the pipeline, so a new import there is measured here too.
+DEFAULT_TARGETS = pipeline_targets()
+
+HEAVY_MODULES = ("feedparser", "requests", "certifi", "PIL", "openai", "elevenlabs", "dotenv")
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "150"))
+
+# Written to stderr once interpreter startup (site, .pth hooks) is finished.
+MARKER = "xseller-importtime-start"
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportTiming]:
+    """Parse ``-X importtime`` output into timings, skipping unrelated lines."""
+    timings: list[ImportTiming] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header row
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def measure(targets: List[str] = DEFAULT_TARGETS) -> List[ImportTiming]:
+    code = "; ".join(
+        [f"import sys; sys.stderr.write({MARKER!r} + chr(10))"] + [f"import {target}" for target in targets]
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.getenv("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=ROOT,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(targets)} failed:\n{proc.stderr}")
+    _, _, measured = proc.stderr.partition(MARKER)
+    return parse_importtime(measured)
+
+
+def summarise(timings: List[ImportTiming], prefix: str = "xseller_ai") -> Dict[str, float]:
+    """Return total ms plus per-target cumulative ms for top-level imports."""
+    top_level = [t for t in timings if t.depth == 0]
+    report = {"total_ms": sum(t.cumulative_us for t in top_level) / 1000}
+    for timing in top_level:
+        if timing.module.startswith(prefix):
+            report[timing.module] = timing.cumulative_us / 1000
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the import-time budget of xseller_ai.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest modules")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    args = parser.parse_args(argv)
+
+    timings = measure(args.targets)
+    report = summarise(timings)
+    for module, ms in sorted(report.items(), key=lambda kv: kv[1], reverse=True):
+        print(f"{ms:9.2f} ms  {module}")
+    print("slowest self times:")
+    for timing in sorted(timings, key=lambda t: t.self_us, reverse=True)[: args.top]:
+        print(f"{timing.self_us / 1000:9.2f} ms  {timing.module}")
+
+    failed = False
+    eager = sorted({t.module for t in timings if t.module.split(".")[0] in HEAVY_MODULES})
+    if eager:
+        print(f"FAIL: heavy dependencies imported eagerly: {', '.join(eager)}")
+        failed = True
+    if report["total_ms"] > args.budget_ms:
+        print(f"FAIL: import time {report['total_ms']:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print(f"OK: {report['total_ms']:.1f} ms within budget {args.budget_ms:.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Rolling latency histograms and error counts for outbound calls.
+
+Every call to an external dependency (RSS feeds, OpenAI, ElevenLabs, the
+publish providers) is timed with :func:`timed` or reported with
+:func:`record`. Latencies go into fixed log-spaced buckets (1 ms to ~5 min,
+each bucket ~25% wider than the last) kept per time slice. Only the last
+``LATENCY_WINDOW_MINUTES`` (60) of slices are retained, so memory per
+dependency is bounded no matter how many calls are made.
+
+Each process writes its slices to ``<data_dir>/metrics/latency-<host>-<pid>.json``
+at most every ``LATENCY_FLUSH_SECONDS`` (30) and on exit. Histograms merge
+by adding bucket counts, so :func:`load_merged` combines every process's file
+into one view for the dashboard. The same calls are also exported as
+Prometheus histograms through :mod:`xseller_ai.metrics`.
+"""
+from __future__ import annotations
+
+import atexit
+import math
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from . import metrics
+from . import settings as settings_module
+from .storage import atomic_write_json, read_json
+
+GROWTH = 1.25
+# Upper bounds in milliseconds, 1 ms to ~334 s; a final overflow bucket catches anything slower.
+# 58 bounds so 5-minute calls (Publer's upload timeout) still get a real bucket.
+BOUNDS_MS: List[float] = [GROWTH**index for index in range(58)]
+SLICE_SECONDS = 300
+WINDOW_SECONDS = float(os.getenv("LATENCY_WINDOW_MINUTES", "60")) * 60
+FLUSH_SECONDS = float(os.getenv("LATENCY_FLUSH_SECONDS", "30"))
+# Files from processes that stopped writing longer ago than this are deleted.
+STALE_FILE_SECONDS = 24 * 3600
+
+_DURATION = metrics.histogram(
+    "xseller_dependency_duration_seconds", "Latency of outbound calls.", ("dependency",)
+)
+_ERRORS = metrics.counter("xseller_dependency_errors_total", "Failed outbound calls.", ("dependency",))
+
+
+class Histogram:
+    """Bucket counts plus call and error totals; mergeable across processes."""
+
+    __slots__ = ("counts", "calls", "errors")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BOUNDS_MS) + 1)
+        self.calls = 0
+        self.errors = 0
+
+    def add(self, millis: float, ok: bool = True) -> None:
+        self.counts[bisect_left(BOUNDS_MS, millis)] += 1
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+
+    def merge(self, other: "Histogram") -> None:
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.calls += other.calls
+        self.errors += other.errors
+
+    def quantile(self, q: float) -> float | None:
+        """Approximate ``q`` quantile in ms (geometric midpoint of its bucket)."""
+        if not self.calls:
+            return None
+        rank = max(1, math.ceil(q * self.calls))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        if index == 0:
+            return BOUNDS_MS[0]
+        if index == len(BOUNDS_MS):
+            return BOUNDS_MS[-1]
+        return math.sqrt(BOUNDS_MS[index - 1] * BOUNDS_MS[index])
+
+    def to_dict(self) -> dict:
+        # Sparse form keeps the snapshot files small.
+        buckets = {str(index): count for index, count in enumerate(self.counts) if count}
+        return {"calls": self.calls, "errors": self.errors, "buckets": buckets}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls()
+        histogram.calls = int(data.get("calls", 0))
+        histogram.errors = int(data.get("errors", 0))
+        for index, count in data.get("buckets", {}).items():
+            if 0 <= int(index) < len(histogram.counts):
+                histogram.counts[int(index)] = int(count)
+        return histogram
+
+
+class LatencyRecorder:
+    """Per-dependency histograms in ``SLICE_SECONDS`` slices over ``WINDOW_SECONDS``."""
+
+    def __init__(self, directory: Path | None = None, flush_seconds: float = FLUSH_SECONDS) -> None:
+        self._directory = directory
+        self.flush_seconds = flush_seconds
+        self._slices: Dict[str, Dict[int, Histogram]] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._atexit = False
+
+    @property
+    def directory(self) -> Path:
+        if self._directory is not None:
+            return self._directory
+        return Path(settings_module.settings.data_dir) / "metrics"
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"latency-{socket.gethostname()}-{os.getpid()}.json"
+
+    def record(self, dependency: str, seconds: float, ok: bool = True) -> None:
+        _DURATION.labels(dependency).observe(seconds)
+        if not ok:
+            _ERRORS.labels(dependency).inc()
+        start = int(time.time() // SLICE_SECONDS * SLICE_SECONDS)
+        with self._lock:
+            slices = self._slices.setdefault(dependency, {})
+            histogram = slices.get(start)
+            if histogram is None:
+                histogram = slices[start] = Histogram()
+                oldest = start - WINDOW_SECONDS
+                for stale in [key for key in slices if key <= oldest]:
+                    del slices[stale]
+            histogram.add(seconds * 1000, ok)
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+            if not self._atexit:
+                atexit.register(self.flush)
+                self._atexit = True
+        if due:
+            self.flush()
+
+    @contextmanager
+    def timed(self, dependency: str) -> Iterator[None]:
+        """Time the block; an exception counts as an error and is re-raised."""
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(dependency, time.perf_counter() - started, ok)
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        with self._lock:
+            return {
+                dependency: {str(start): histogram.to_dict() for start, histogram in slices.items()}
+                for dependency, slices in self._slices.items()
+            }
+
+    def flush(self) -> None:
+        with self._lock:
+            self._last_flush = time.monotonic()
+        snapshot = self.snapshot()
+        if not snapshot:
+            return
+        try:
+            atomic_write_json(self.path, {"written_at": time.time(), "slices": snapshot})
+        except OSError:
+            # Metrics must never break the call being measured.
+            pass
+
+
+recorder = LatencyRecorder()
+
+
+def record(dependency: str, seconds: float, ok: bool = True) -> None:
+    recorder.record(dependency, seconds, ok)
+
+
+def timed(dependency: str):
+    return recorder.timed(dependency)
+
+
+def load_merged(directory: Path | None = None, window_seconds: float = WINDOW_SECONDS) -> Dict[str, Histogram]:
+    """Merge every process's snapshot file into one histogram per dependency."""
+    directory = directory or recorder.directory
+    now = time.time()
+    oldest = now - window_seconds
+    merged: Dict[str, Histogram] = {}
+    for path in sorted(directory.glob("latency-*.json")):
+        data = read_json(path, {})
+        if now - float(data.get("written_at", 0)) > STALE_FILE_SECONDS:
+            path.unlink(missing_ok=True)
+            continue
+        for dependency, slices in data.get("slices", {}).items():
+            for start, histogram in slices.items():
+                if float(start) + SLICE_SECONDS > oldest:
+                    merged.setdefault(dependency, Histogram()).merge(Histogram.from_dict(histogram))
+    return merged
+
+
+def summarize(histograms: Dict[str, Histogram]) -> List[dict]:
+    """One row per dependency: calls, errors, error rate and p50/p95/p99 in ms."""
+    rows = []
+    for dependency, histogram in sorted(histograms.items()):
+        row = {
+            "dependency": dependency,
+            "calls": histogram.calls,
+            "errors": histogram.errors,
+            "error_rate": round(histogram.errors / histogram.calls, 3) if histogram.calls else 0.0,
+        }
+        for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            value = histogram.quantile(q)
+            row[name] = round(value, 1) if value is not None else None
+        rows.append(row)
+    return rows
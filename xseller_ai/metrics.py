@@ -0,0 +1,305 @@
+"""Counters, gauges and histograms in the Prometheus text format.
+
+Metrics are created once at import time with :func:`counter`, :func:`gauge`
+and :func:`histogram`. Call sites then only do a dict lookup for the label
+values and a locked add, so recording is cheap enough for hot paths.
+
+Long-running processes expose them with :func:`serve` (``GET /metrics`` on
+``METRICS_PORT``). Cron runs call :func:`write_textfile` on exit, which drops
+``<job>.prom`` into ``METRICS_TEXTFILE_DIR`` for node_exporter's textfile
+collector. Both are no-ops unless the variable is set.
+"""
+from __future__ import annotations
+
+import abc
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from .storage import atomic_write_bytes
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelValues = Tuple[str, ...]
+
+_registry: Dict[str, "Metric"] = {}
+_registry_lock = threading.Lock()
+_server: ThreadingHTTPServer | None = None
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _new_child(self):
+        """A fresh child holding one label combination's value(s)."""
+
+    def labels(self, *values: str):
+        """The child for one combination of label values, created on first use."""
+        # Children are keyed by strings, so labels(200) and labels("200") share one.
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abc.abstractmethod
+    def _samples(self) -> List[Tuple[str, LabelValues, Tuple[str, ...], float]]:
+        """``(suffix, label values, extra label pairs, value)`` for every child."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self._samples():
+            names = self.labelnames + tuple(extra[0::2])
+            label_values = values + tuple(extra[1::2])
+            lines.append(f"{self.name}{suffix}{_labels_text(names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self):
+        return [("", values, (), child.value) for values, child in list(self._children.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._function: Callable[[], Dict[LabelValues, float]] | None = None
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], Dict[LabelValues, float]]) -> None:
+        """Compute the gauge at scrape time; ``function`` maps label values to a value."""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            try:
+                for values, value in self._function().items():
+                    self.labels(*values).set(value)
+            except Exception:  # noqa: BLE001 - a failing callback must not break the scrape
+                pass
+        return super()._samples()
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _samples(self):
+        samples = []
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(("_bucket", values, ("le", _format_value(bound)), cumulative))
+            samples.append(("_sum", values, (), total))
+            samples.append(("_count", values, (), cumulative))
+        return samples
+
+
+def _register(cls, name: str, *args, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, *args, **kwargs)
+        elif type(metric) is not cls:
+            raise ValueError(f"metric {name} already registered as a {metric.kind}")
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _register(Counter, name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return _register(Gauge, name, documentation, labelnames)
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return _register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+CACHE_REQUESTS = counter("xseller_cache_requests_total", "Cache lookups by result (hit/miss).", ("cache", "result"))
+STAGE_SECONDS = histogram("xseller_stage_duration_seconds", "Wall time of pipeline stages.", ("stage",))
+
+
+def stage(name: str):
+    """Time a pipeline stage: ``with metrics.stage("fetch"): ...``."""
+    return STAGE_SECONDS.labels(name).time()
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _handler():
+    # http.server pulls in http.client and ssl; only processes that serve pay for it.
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args) -> None:
+            # Scrapes every few seconds would flood the worker's log.
+            pass
+
+    return Handler
+
+
+def serve(port: int | None = None, addr: str | None = None) -> int | None:
+    """Serve ``/metrics`` from a daemon thread (once per process); returns the port."""
+    global _server
+    if port is None:
+        if not os.getenv("METRICS_PORT"):
+            return None
+        port = int(os.environ["METRICS_PORT"])
+    addr = addr or os.getenv("METRICS_ADDR", "127.0.0.1")
+    with _registry_lock:
+        if _server is None:
+            from http.server import ThreadingHTTPServer
+
+            _server = ThreadingHTTPServer((addr, port), _handler())
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server.server_address[1]
+
+
+def write_textfile(job: str, directory: str | Path | None = None) -> Path | None:
+    """Atomically write ``<job>.prom`` for the node_exporter textfile collector."""
+    directory = directory or os.getenv("METRICS_TEXTFILE_DIR")
+    if not directory:
+        return None
+    path = Path(directory) / f"{job}.prom"
+    atomic_write_bytes(path, render().encode("utf-8"))
+    return path
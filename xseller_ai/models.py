@@ -0,0 +1,205 @@
+"""Typed records for the dashboard queue.
+
+``ai_shorts_queue.json`` is stored as::
+
+    {"version": 2, "shorts": [...], "text_posts": [...]}
+
+Every record carries its ``type`` tag. The pipeline and the dashboard share
+this one format, partitioned by type, so pages read ``state.shorts`` directly
+instead of re-normalising and filtering a flat list on every render. Older
+layouts (a bare list, ``{"items": [...]}`` or an untagged
+``{"shorts", "text_posts"}``) are converted once by :func:`migrate_raw`.
+
+:class:`QueueQuery` describes one page of a filtered, sorted queue view. Both
+storage backends answer it from the columns in :func:`view_fields`, so pages
+only materialise the records they show.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from typing import Any, ClassVar, Dict, Iterable, Iterator, List, Type, Union
+from urllib.parse import urlparse
+
+SCHEMA_VERSION = 2
+
+SHORT_TYPES = {"video", "short", "short_video"}
+TEXT_POST_TYPES = {"text_post", "text", "caption"}
+
+
+@dataclass(slots=True)
+class ShortItem:
+    id: str
+    title: str = ""
+    summary: str = ""
+    why_it_matters: str = ""
+    what_happened: str = ""
+    whats_next: str = ""
+    hooks: List[str] = field(default_factory=list)
+    video_path: str | None = None
+    audio_path: str | None = None
+    queued_at: str | None = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    type: ClassVar[str] = "video"
+    kind: ClassVar[str] = "shorts"
+
+
+@dataclass(slots=True)
+class TextPostItem:
+    id: str
+    story_title: str = ""
+    platforms: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    queued_at: str | None = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    type: ClassVar[str] = "text_post"
+    kind: ClassVar[str] = "text_posts"
+
+
+QueueRecord = Union[ShortItem, TextPostItem]
+RECORD_TYPES: Dict[str, Type[QueueRecord]] = {"shorts": ShortItem, "text_posts": TextPostItem}
+_FIELDS = {kind: tuple(f.name for f in fields(cls) if f.name != "extra") for kind, cls in RECORD_TYPES.items()}
+
+
+def record_from_dict(kind: str, data: Dict[str, Any]) -> QueueRecord:
+    known = _FIELDS[kind]
+    kwargs = {key: value for key, value in data.items() if key in known}
+    kwargs.setdefault("id", "")
+    extra = {key: value for key, value in data.items() if key not in known and key != "type"}
+    return RECORD_TYPES[kind](extra=extra, **kwargs)
+
+
+def record_to_dict(record: QueueRecord) -> Dict[str, Any]:
+    data: Dict[str, Any] = {"type": record.type}
+    for name in _FIELDS[record.kind]:
+        value = getattr(record, name)
+        if value is not None:
+            data[name] = value
+    data.update(record.extra)
+    return data
+
+
+class QueueState:
+    """Type-partitioned queue with an id index."""
+
+    __slots__ = ("shorts", "text_posts", "_by_id")
+
+    def __init__(self, shorts: List[ShortItem] | None = None, text_posts: List[TextPostItem] | None = None) -> None:
+        self.shorts = shorts or []
+        self.text_posts = text_posts or []
+        self._by_id: Dict[str, QueueRecord] | None = None
+
+    @classmethod
+    def from_dicts(cls, data: Dict[str, List[dict]]) -> "QueueState":
+        return cls(
+            shorts=[record_from_dict("shorts", item) for item in data.get("shorts", [])],
+            text_posts=[record_from_dict("text_posts", item) for item in data.get("text_posts", [])],
+        )
+
+    def to_dicts(self) -> Dict[str, List[dict]]:
+        return {
+            "shorts": [record_to_dict(item) for item in self.shorts],
+            "text_posts": [record_to_dict(item) for item in self.text_posts],
+        }
+
+    @property
+    def items(self) -> Iterator[QueueRecord]:
+        yield from self.shorts
+        yield from self.text_posts
+
+    def get(self, item_id: str) -> QueueRecord | None:
+        if self._by_id is None:
+            self._by_id = {item.id: item for item in self.items}
+        return self._by_id.get(item_id)
+
+    def __len__(self) -> int:
+        return len(self.shorts) + len(self.text_posts)
+
+
+# Columns a queue view can sort on.
+SORT_KEYS = ("queued_at", "title", "source", "status")
+
+
+def view_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Filter and sort columns for a raw queue item."""
+    # Items queued before ``source`` was stored fall back to the article link.
+    source = item.get("source") or urlparse(item.get("video_path") or "").netloc
+    return {
+        "queued_at": item.get("queued_at") or "",
+        "title": item.get("title") or item.get("story_title") or "",
+        "status": item.get("status") or "queued",
+        "source": source,
+        "has_audio": bool(item.get("audio_path")),
+    }
+
+
+@dataclass(frozen=True)
+class QueueQuery:
+    """One page of queue items of ``kind``, filtered and sorted.
+
+    ``since`` and ``until`` are ISO dates or timestamps compared with
+    ``queued_at``; ``until`` is exclusive.
+    """
+
+    kind: str = "shorts"
+    since: str | None = None
+    until: str | None = None
+    status: str | None = None
+    source: str | None = None
+    has_audio: bool | None = None
+    sort: str = "queued_at"
+    descending: bool = True
+    offset: int = 0
+    limit: int = 25
+
+    def matches(self, fields: Dict[str, Any]) -> bool:
+        return (
+            (self.since is None or fields["queued_at"] >= self.since)
+            and (self.until is None or fields["queued_at"] < self.until)
+            and (self.status is None or fields["status"] == self.status)
+            and (self.source is None or fields["source"] == self.source)
+            and (self.has_audio is None or fields["has_audio"] == self.has_audio)
+        )
+
+
+@dataclass
+class QueuePage:
+    items: List[QueueRecord]
+    total: int
+
+
+def tag(items: Iterable[dict], type_name: str) -> List[dict]:
+    """Set the canonical ``type`` on every dict; returns the same dicts."""
+    tagged = list(items)
+    for item in tagged:
+        item["type"] = type_name
+    return tagged
+
+
+def is_current(raw: Any) -> bool:
+    return isinstance(raw, dict) and raw.get("version") == SCHEMA_VERSION
+
+
+def migrate_raw(raw: Any) -> Dict[str, Any]:
+    """Convert any historical queue layout into the version 2 document."""
+    if is_current(raw):
+        return raw
+    if isinstance(raw, dict) and "items" in raw:
+        raw = raw["items"]
+    shorts: list[dict] = []
+    text_posts: list[dict] = []
+    if isinstance(raw, list):
+        for item in raw:
+            item_type = item.get("type", "video")
+            if item_type in SHORT_TYPES:
+                shorts.append(item)
+            elif item_type in TEXT_POST_TYPES:
+                text_posts.append(item)
+    elif isinstance(raw, dict):
+        shorts = list(raw.get("shorts", []))
+        text_posts = list(raw.get("text_posts", []))
+    return {
+        "version": SCHEMA_VERSION,
+        "shorts": tag(shorts, ShortItem.type),
+        "text_posts": tag(text_posts, TextPostItem.type),
+    }
@@ -1,127 +1,228 @@
 from __future__ import annotations
 
-import json
 from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlparse
 
+from . import settings as settings_module
+from .history_log import open_log
 from .hooks import HookSet
+from .models import (
+    RECORD_TYPES,
+    SCHEMA_VERSION,
+    SORT_KEYS,
+    QueueQuery,
+    QueueState,
+    ShortItem,
+    TextPostItem,
+    is_current,
+    migrate_raw,
+    tag,
+    view_fields,
+)
+from .storage import atomic_write_bytes, encode_json, file_lock, read_json
 from .social import SocialPost
 from .summarizer import Script
 
 DEFAULT_QUEUE = {"shorts": [], "text_posts": []}
 
 
-def _ensure_parent(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+def _read_document(path: Path) -> Dict[str, Any]:
+    raw = read_json(path, None)
+    if raw is None:
+        return migrate_raw({kind: [] for kind in DEFAULT_QUEUE})
+    if is_current(raw):
+        return raw
+    # One-time upgrade of a legacy layout; later loads take the fast path.
+    with file_lock(path):
+        raw = read_json(path, None)
+        if raw is None or is_current(raw):
+            return migrate_raw(raw if raw is not None else {})
+        document = migrate_raw(raw)
+        atomic_write_bytes(path, encode_json(document))
+    return document
 
 
-def _load_json(path: Path, default):
-    if not path.exists():
-        return default
-    try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return default
+def load_queue(path: Path) -> Dict[str, List[dict]]:
+    document = _read_document(path)
+    return {"shorts": document["shorts"], "text_posts": document["text_posts"]}
 
 
-def load_queue(path: Path) -> Dict[str, List[dict]]:
-    data = _load_json(path, DEFAULT_QUEUE.copy())
-    if isinstance(data, list):
-        # Backward compatibility with legacy structure
-        shorts = [item for item in data if item.get("type") == "video"]
-        text_posts = [item for item in data if item.get("type") == "text_post"]
-        data = {"shorts": shorts, "text_posts": text_posts}
-    data.setdefault("shorts", [])
-    data.setdefault("text_posts", [])
-    return data
+def queue_depth(path: Path) -> int:
+    """Items queued in the configured backend (the SQLite store or ``path``)."""
+    if settings_module.settings.queue_backend == "sqlite":
+        from .store import open_store
+
+        return open_store(path.parent, queue_path=path).count_items()
+    return sum(len(items) for items in load_queue(path).values())
+
+
+def load_queue_state(path: Path) -> QueueState:
+    return QueueState.from_dicts(load_queue(path))
+
+
+def write_queue(path: Path, data: Dict[str, List[dict]] | QueueState) -> None:
+    if isinstance(data, QueueState):
+        data = data.to_dicts()
+    document = {
+        "version": SCHEMA_VERSION,
+        "shorts": tag(data.get("shorts", []), ShortItem.type),
+        "text_posts": tag(data.get("text_posts", []), TextPostItem.type),
+    }
+    atomic_write_bytes(path, encode_json(document))
+
+
+class QueueIndex:
+    """Answers :class:`QueueQuery` pages from a loaded JSON queue.
+
+    View columns are computed once per item and each sort order is built on
+    first use, so paging and re-filtering do not re-read or re-sort the file.
+    """
+
+    def __init__(self, data: Dict[str, List[dict]]) -> None:
+        self._rows = {kind: [(view_fields(item), item) for item in data.get(kind, [])] for kind in RECORD_TYPES}
+        self._orders: Dict[Tuple[str, str], List[Tuple[Dict[str, Any], dict]]] = {}
+
+    def _ordered(self, kind: str, sort: str) -> List[Tuple[Dict[str, Any], dict]]:
+        sort = sort if sort in SORT_KEYS else "queued_at"
+        order = self._orders.get((kind, sort))
+        if order is None:
+            # Stable sort keeps file order among equal keys, like SQLite's rowid tiebreak.
+            order = self._orders[(kind, sort)] = sorted(self._rows.get(kind, []), key=lambda row: row[0][sort])
+        return order
 
+    def query(self, query: QueueQuery) -> Tuple[List[dict], int]:
+        """Items on the requested page and the number matching the filters."""
+        rows = self._ordered(query.kind, query.sort)
+        ordered = reversed(rows) if query.descending else rows
+        matched = [item for fields, item in ordered if query.matches(fields)]
+        return matched[query.offset : query.offset + query.limit], len(matched)
 
-def write_queue(path: Path, data: Dict[str, List[dict]]) -> None:
-    _ensure_parent(path)
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    def distinct(self, kind: str, column: str) -> List[str]:
+        return sorted({fields[column] for fields, _ in self._rows.get(kind, []) if fields[column]})
+
+
+def load_index(path: Path) -> QueueIndex:
+    return QueueIndex(load_queue(path))
 
 
 def load_history(path: Path | None) -> List[dict]:
     if not path:
         return []
-    return _load_json(path, [])
+    return list(open_log(path).iter_records())
 
 
 def write_history(path: Path | None, data: List[dict]) -> None:
     if not path:
         return
-    _ensure_parent(path)
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    open_log(path).rewrite(data)
 
 
-def merge_into_queue(
-    queue_path: Path,
+def build_queue_payloads(
     scripts: Iterable[Script],
     hooks: Iterable[HookSet],
     social_posts: Iterable[SocialPost],
-    db_path: Path | None = None,
     audio_paths: dict[str, str] | None = None,
-) -> None:
-    queue_data = load_queue(queue_path)
-    shorts_index = {item.get("id"): idx for idx, item in enumerate(queue_data["shorts"]) if item.get("id")}
-    text_index = {item.get("id"): idx for idx, item in enumerate(queue_data["text_posts"]) if item.get("id")}
-
+) -> Tuple[List[dict], List[dict], List[dict]]:
+    """Return (shorts, text_posts, history records) for a pipeline run."""
     hooks_map = {h.script_id: h for h in hooks}
     social_map = {s.id: s for s in social_posts}
-    history = load_history(db_path)
-    history_ids = {item.get("id") for item in history}
-
     audio_paths = audio_paths or {}
+    generated_at = datetime.now(timezone.utc).isoformat()
 
+    shorts: list[dict] = []
+    text_posts: list[dict] = []
+    history: list[dict] = []
     for script in scripts:
         hooks_data = hooks_map.get(script.id)
         social_data = social_map.get(script.id)
-
-        short_payload = {
-            "id": script.id,
-            "title": script.title,
-            "summary": script.summary,
-            "why_it_matters": script.why_it_matters,
-            "what_happened": script.what_happened,
-            "whats_next": script.whats_next,
-            "hooks": hooks_data.hooks if hooks_data else [],
-            "video_path": script.link,
-            "audio_path": audio_paths.get(script.id),
-        }
-        if script.id in shorts_index:
-            queue_data["shorts"][shorts_index[script.id]].update(short_payload)
-        else:
-            queue_data["shorts"].append(short_payload)
-            shorts_index[script.id] = len(queue_data["shorts"]) - 1
-
-        if social_data:
-            text_id = f"{script.id}-text"
-            text_payload = {
-                "id": text_id,
-                "story_title": script.title,
-                "platforms": {
-                    platform: asdict(post)
-                    for platform, post in social_data.platforms.items()
-                },
+        source = urlparse(script.link).netloc
+
+        shorts.append(
+            {
+                "type": ShortItem.type,
+                "id": script.id,
+                "title": script.title,
+                "summary": script.summary,
+                "why_it_matters": script.why_it_matters,
+                "what_happened": script.what_happened,
+                "whats_next": script.whats_next,
+                "hooks": hooks_data.hooks if hooks_data else [],
+                "video_path": script.link,
+                "audio_path": audio_paths.get(script.id),
+                "source": source,
+                "queued_at": generated_at,
             }
-            if text_id in text_index:
-                queue_data["text_posts"][text_index[text_id]].update(text_payload)
-            else:
-                queue_data["text_posts"].append(text_payload)
-                text_index[text_id] = len(queue_data["text_posts"]) - 1
-
-        if db_path and script.id not in history_ids:
-            history.append(
+        )
+        if social_data:
+            text_posts.append(
                 {
-                    "id": script.id,
-                    "title": script.title,
-                    "summary": script.summary,
-                    "source": script.link,
-                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                    "type": TextPostItem.type,
+                    "id": f"{script.id}-text",
+                    "story_title": script.title,
+                    "source": source,
+                    "queued_at": generated_at,
+                    "platforms": {
+                        platform: asdict(post)
+                        for platform, post in social_data.platforms.items()
+                    },
                 }
             )
+        history.append(
+            {
+                "id": script.id,
+                "title": script.title,
+                "summary": script.summary,
+                "source": script.link,
+                "generated_at": generated_at,
+            }
+        )
+    return shorts, text_posts, history
+
+
+# Fields set when an item is first queued and kept on later updates.
+PRESERVED_FIELDS = ("queued_at",)
+
+
+def _upsert(items: List[dict], payloads: Iterable[dict]) -> None:
+    index = {item.get("id"): idx for idx, item in enumerate(items) if item.get("id")}
+    for payload in payloads:
+        if payload["id"] in index:
+            existing = items[index[payload["id"]]]
+            existing.update({k: v for k, v in payload.items() if k not in PRESERVED_FIELDS or k not in existing})
+        else:
+            items.append(payload)
+            index[payload["id"]] = len(items) - 1
+
+
+def merge_into_queue(
+    queue_path: Path,
+    scripts: Iterable[Script],
+    hooks: Iterable[HookSet],
+    social_posts: Iterable[SocialPost],
+    db_path: Path | None = None,
+    audio_paths: dict[str, str] | None = None,
+) -> None:
+    shorts, text_posts, records = build_queue_payloads(scripts, hooks, social_posts, audio_paths)
+
+    if settings_module.settings.queue_backend == "sqlite":
+        from .store import open_store
+
+        store = open_store(queue_path.parent, queue_path=queue_path, db_path=db_path)
+        with store.transaction():
+            store.upsert_items("shorts", shorts, preserve=PRESERVED_FIELDS)
+            store.upsert_items("text_posts", text_posts, preserve=PRESERVED_FIELDS)
+            if db_path:
+                store.add_history(records)
+        return
+
+    with file_lock(queue_path):
+        queue_data = load_queue(queue_path)
+        _upsert(queue_data["shorts"], shorts)
+        _upsert(queue_data["text_posts"], text_posts)
+        write_queue(queue_path, queue_data)
 
-    write_queue(queue_path, queue_data)
-    write_history(db_path, history)
+    if db_path:
+        open_log(db_path).append_new(records)
@@ -0,0 +1,86 @@
+"""Record/replay of external service responses for offline runs.
+
+``XSELLER_REPLAY=record`` captures live responses from RSS feeds, OpenAI and
+ElevenLabs into ``XSELLER_FIXTURES_DIR``. ``XSELLER_REPLAY=replay`` serves them
+back without touching the network. When ``XSELLER_STANDIN_URL`` points at a
+running :mod:`xseller_ai.standin` server, replayed payloads are fetched over
+HTTP so its latency and error injection apply.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Callable, Iterable
+
+from . import settings as settings_module
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+KINDS = ("feeds", "openai", "elevenlabs")
+KEY_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ReplayMiss(LookupError):
+    """Raised when replay mode has no recorded fixture for a request."""
+
+
+def mode() -> str:
+    value = settings_module.settings.replay_mode
+    return value if value in MODES else "off"
+
+
+def replaying() -> bool:
+    return mode() == "replay"
+
+
+def fixture_key(*parts: str) -> str:
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return digest[:32]
+
+
+def fixture_path(kind: str, key: str, root: Path | None = None) -> Path:
+    root = root or Path(settings_module.settings.fixtures_dir)
+    return root / kind / f"{key}.bin"
+
+
+def save_fixture(kind: str, key: str, payload: bytes) -> Path:
+    path = fixture_path(kind, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(payload)
+    return path
+
+
+def load_fixture(kind: str, key: str) -> bytes:
+    base_url = settings_module.settings.standin_url
+    if base_url:
+        import urllib.error
+        import urllib.request
+
+        url = f"{base_url.rstrip('/')}/{kind}/{key}"
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:  # noqa: S310
+                return response.read()
+        except urllib.error.HTTPError as exc:
+            if exc.code == 404:
+                raise ReplayMiss(f"No {kind} fixture for {key}") from exc
+            raise
+    path = fixture_path(kind, key)
+    if not path.exists():
+        raise ReplayMiss(f"No {kind} fixture for {key}")
+    return path.read_bytes()
+
+
+def through(kind: str, parts: Iterable[str], live: Callable[[], bytes]) -> bytes:
+    """Return ``live()`` or its recorded stand-in, depending on the active mode."""
+    current = mode()
+    key = fixture_key(*parts)
+    if current == "replay":
+        return load_fixture(kind, key)
+    payload = live()
+    if current == "record":
+        path = save_fixture(kind, key, payload)
+        logger.debug("Recorded %s fixture %s", kind, path)
+    return payload
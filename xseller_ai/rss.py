@@ -4,14 +4,24 @@ import datetime as dt
 import logging
 from dataclasses import dataclass
 from typing import Iterable, List
+from urllib.parse import urlparse
 
-import feedparser
-import requests
-import certifi
-
+from . import latency, metrics, replay
 
 logger = logging.getLogger(__name__)
 
+ARTICLES_FETCHED = metrics.counter(
+    "xseller_articles_fetched_total", "Feed entries kept after the age cutoff.", ("feed",)
+)
+
+DEFAULT_FEEDS = [
+    "https://techcrunch.com/tag/ai/feed/",
+    "https://venturebeat.com/category/ai/feed/",
+    "https://www.technologyreview.com/tag/artificial-intelligence/feed/",
+    "https://openai.com/blog/rss.xml",
+    "https://arxiv.org/rss/cs.AI",
+]
+
 
 @dataclass
 class Article:
@@ -51,16 +61,27 @@ def parse_entry(entry, default_source: str) -> Article | None:
     )
 
 
+def _download(feed_url: str) -> bytes:
+    import certifi
+    import requests
+
+    with latency.timed(f"feed:{urlparse(feed_url).netloc}"):
+        response = requests.get(feed_url, timeout=15, verify=certifi.where(), headers={"User-Agent": "xseller-ai-bot/1.0"})
+        response.raise_for_status()
+    return response.content
+
+
 def fetch_feeds(feeds: Iterable[str], since_hours: int = 24) -> List[Article]:
+    import feedparser
+
     cutoff = dt.datetime.utcnow().replace(tzinfo=dt.timezone.utc) - dt.timedelta(
         hours=since_hours
     )
     collected: list[Article] = []
     for feed_url in feeds:
         try:
-            response = requests.get(feed_url, timeout=15, verify=certifi.where(), headers={"User-Agent": "xseller-ai-bot/1.0"})
-            response.raise_for_status()
-            parsed = feedparser.parse(response.content)
+            content = replay.through("feeds", [feed_url], lambda: _download(feed_url))
+            parsed = feedparser.parse(content)
         except Exception as exc:  # noqa: BLE001
             logger.warning("Failed to fetch feed %s: %s", feed_url, exc)
             continue
@@ -68,6 +89,7 @@ def fetch_feeds(feeds: Iterable[str], since_hours: int = 24) -> List[Article]:
             logger.warning("Failed to parse feed %s: %s", feed_url, parsed.bozo_exception)
             continue
         source_title = parsed.feed.get("title", feed_url)
+        fetched = ARTICLES_FETCHED.labels(urlparse(feed_url).netloc)
         for entry in parsed.entries:
             article = parse_entry(entry, default_source=source_title)
             if not article:
@@ -75,6 +97,7 @@ def fetch_feeds(feeds: Iterable[str], since_hours: int = 24) -> List[Article]:
             if article.published_at < cutoff:
                 continue
             collected.append(article)
+            fetched.inc()
     # Deduplicate by link
     unique: dict[str, Article] = {}
     for art in sorted(collected, key=lambda a: a.published_at, reverse=True):
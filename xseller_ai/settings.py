@@ -15,6 +15,14 @@ class Settings:
     posting_mode: str = "manual"
     outputs_dir: str = "outputs"
     data_dir: str = "app/data"
+    queue_backend: str = "json"
+    archive_posted_after_hours: float = 24
+    archive_errored_after_days: float = 7
+    archive_max_age_days: float = 14
+    blob_retention_days: float = 30
+    replay_mode: str = "off"
+    fixtures_dir: str = "fixtures/replay"
+    standin_url: str | None = None
 
     def __post_init__(self) -> None:
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -26,6 +34,18 @@ class Settings:
         self.posting_mode = os.getenv("POSTING_MODE", self.posting_mode)
         self.outputs_dir = os.getenv("OUTPUTS_DIR", self.outputs_dir)
         self.data_dir = os.getenv("DATA_DIR", self.data_dir)
+        self.queue_backend = os.getenv("QUEUE_BACKEND", self.queue_backend).lower()
+        self.archive_posted_after_hours = float(
+            os.getenv("ARCHIVE_POSTED_AFTER_HOURS", self.archive_posted_after_hours)
+        )
+        self.archive_errored_after_days = float(
+            os.getenv("ARCHIVE_ERRORED_AFTER_DAYS", self.archive_errored_after_days)
+        )
+        self.archive_max_age_days = float(os.getenv("ARCHIVE_MAX_AGE_DAYS", self.archive_max_age_days))
+        self.blob_retention_days = float(os.getenv("BLOB_RETENTION_DAYS", self.blob_retention_days))
+        self.replay_mode = os.getenv("XSELLER_REPLAY", self.replay_mode).lower()
+        self.fixtures_dir = os.getenv("XSELLER_FIXTURES_DIR", self.fixtures_dir)
+        self.standin_url = os.getenv("XSELLER_STANDIN_URL")
 
 
 settings = Settings()
@@ -0,0 +1,133 @@
+"""Local HTTP stand-in that serves recorded fixtures.
+
+Run it next to the pipeline to replay feeds, OpenAI and ElevenLabs responses
+with realistic latency and injected failures::
+
+    python -m xseller_ai.standin --port 8765 --latency-ms 150 --error-rate 0.05
+    XSELLER_REPLAY=replay XSELLER_STANDIN_URL=http://127.0.0.1:8765 \\
+        python pipelines/run_ai_news.py
+
+Fixtures are served as ``GET /<kind>/<key>``, matching :mod:`xseller_ai.replay`.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict
+
+from . import replay
+from . import settings as settings_module
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StandinConfig:
+    fixtures_dir: Path
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    kind_latency_ms: Dict[str, float] = field(default_factory=dict)
+    seed: int | None = None
+
+
+def make_handler(config: StandinConfig) -> type[BaseHTTPRequestHandler]:
+    rng = random.Random(config.seed)
+
+    class StandinHandler(BaseHTTPRequestHandler):
+        server_version = "xseller-standin/1.0"
+
+        def do_GET(self) -> None:  # noqa: N802
+            parts = self.path.strip("/").split("/")
+            if len(parts) != 2 or parts[0] not in replay.KINDS or not replay.KEY_PATTERN.match(parts[1]):
+                self.send_error(400, "Expected /<kind>/<key>")
+                return
+            kind, key = parts
+            delay = config.kind_latency_ms.get(kind, config.latency_ms)
+            if config.jitter_ms:
+                delay += rng.uniform(0, config.jitter_ms)
+            if delay > 0:
+                time.sleep(delay / 1000)
+            if config.error_rate and rng.random() < config.error_rate:
+                self.send_error(config.error_status, "Injected failure")
+                return
+            path = replay.fixture_path(kind, key, root=config.fixtures_dir)
+            if not path.exists():
+                self.send_error(404, "Fixture not recorded")
+                return
+            body = path.read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return StandinHandler
+
+
+def serve(config: StandinConfig, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Create the stand-in server; call ``serve_forever()`` on the result."""
+    return ThreadingHTTPServer((host, port), make_handler(config))
+
+
+def _parse_kind_latency(values: list[str]) -> Dict[str, float]:
+    parsed: Dict[str, float] = {}
+    for value in values:
+        kind, _, ms = value.partition("=")
+        if kind not in replay.KINDS or not ms:
+            raise argparse.ArgumentTypeError(f"Expected <kind>=<ms> with kind in {replay.KINDS}, got {value!r}")
+        parsed[kind] = float(ms)
+    return parsed
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve recorded fixtures for offline pipeline runs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("STANDIN_PORT", "8765")))
+    parser.add_argument("--fixtures", default=settings_module.settings.fixtures_dir)
+    parser.add_argument("--latency-ms", type=float, default=float(os.getenv("STANDIN_LATENCY_MS", "0")))
+    parser.add_argument("--jitter-ms", type=float, default=float(os.getenv("STANDIN_JITTER_MS", "0")))
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("STANDIN_ERROR_RATE", "0")))
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument(
+        "--kind-latency",
+        action="append",
+        default=[],
+        metavar="KIND=MS",
+        help="Per-service latency override, e.g. openai=900",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    config = StandinConfig(
+        fixtures_dir=Path(args.fixtures),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        kind_latency_ms=_parse_kind_latency(args.kind_latency),
+        seed=args.seed,
+    )
+    server = serve(config, args.host, args.port)
+    logger.info("Serving fixtures from %s on http://%s:%s", config.fixtures_dir, args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
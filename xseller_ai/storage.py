@@ -0,0 +1,183 @@
+"""Crash-safe writes and advisory locks for the shared JSON data files.
+
+The pipeline, publish worker and dashboard all touch ``app/data``. Writes go to
+a temp file in the same directory, are fsynced and then renamed over the
+target, so readers always see either the old or the new file. Read-modify-write
+cycles hold an exclusive ``flock`` on a ``<name>.lock`` sidecar.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_held = threading.local()
+_digests: Dict[Tuple[str, int, int], str] = {}
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None  # type: ignore
+
+
+def encode_json(obj: Any, indent: int | None = None) -> bytes:
+    """Serialise ``obj``; compact output uses orjson when it is installed."""
+    if indent is None:
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, indent=indent).encode("utf-8")
+
+
+def decode_json(raw: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _fsync_dir(directory: Path) -> None:
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    atomic_write_bytes(path, text.encode(encoding))
+
+
+def atomic_write_json(path: Path, obj: Any, indent: int | None = 2) -> None:
+    atomic_write_bytes(path, encode_json(obj, indent=indent))
+
+
+def lock_path(path: Path) -> Path:
+    path = Path(path)
+    return path.with_name(f"{path.name}.lock")
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float | None = None) -> Iterator[None]:
+    """Hold an exclusive advisory lock for ``path`` across processes.
+
+    Re-entrant within a thread, so helpers that lock can call each other.
+    Raises ``TimeoutError`` if ``timeout`` seconds pass without the lock.
+    """
+    key = str(Path(path).resolve())
+    held: Dict[str, int] = _held.__dict__.setdefault("counts", {})
+    if held.get(key):
+        held[key] += 1
+        try:
+            yield
+        finally:
+            held[key] -= 1
+        return
+
+    target = lock_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target, "a+b") as handle:
+        if fcntl is not None:
+            if timeout is None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            else:
+                deadline = time.monotonic() + timeout
+                while True:
+                    try:
+                        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            raise TimeoutError(f"Timed out waiting for lock on {path}") from None
+                        time.sleep(0.05)
+        held[key] = 1
+        try:
+            yield
+        finally:
+            held.pop(key, None)
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def read_json(path: Path, default: Any) -> Any:
+    """Load JSON from ``path``, returning ``default`` if it is missing.
+
+    An unparseable file is renamed to ``<name>.corrupt-<ts>`` before falling
+    back, so the next write cannot silently overwrite the only copy.
+    """
+    path = Path(path)
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return default
+    try:
+        return decode_json(raw)
+    except ValueError as exc:
+        quarantine = path.with_name(f"{path.name}.corrupt-{int(time.time())}")
+        logger.error("Unreadable JSON in %s (%s); moved aside to %s", path, exc, quarantine)
+        try:
+            os.replace(path, quarantine)
+        except OSError:  # pragma: no cover
+            pass
+        return default
+
+
+@contextmanager
+def locked_json(path: Path, default: Any, indent: int | None = 2) -> Iterator[Any]:
+    """Lock ``path``, yield its parsed contents and atomically write them back.
+
+    Mutate the yielded object in place; nothing is written if the block raises.
+    """
+    with file_lock(path):
+        data = read_json(path, default)
+        yield data
+        atomic_write_json(path, data, indent=indent)
+
+
+def content_hash(path: Path) -> str:
+    """SHA-256 of a file, memoised on (path, size, mtime) so unchanged files are read once."""
+    path = Path(path)
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(memo_key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                hasher.update(chunk)
+        digest = _digests[memo_key] = hasher.hexdigest()
+    return digest
@@ -0,0 +1,350 @@
+"""SQLite storage for the dashboard queue and item history.
+
+Enabled with ``QUEUE_BACKEND=sqlite``. The database runs in WAL mode, so the
+dashboard can read while the pipeline writes. Rows are keyed by id, and the
+pipeline upserts only the items it touches instead of rewriting whole JSON
+files. Queue rows also carry the view columns from
+:func:`xseller_ai.models.view_fields`, indexed, so dashboard pages filter,
+sort and page in SQL. The first open imports the existing ``ai_shorts_queue.json`` and
+``ai_shorts_db.json`` once::
+
+    python -m xseller_ai.store migrate --data-dir app/data
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .models import SORT_KEYS, QueueQuery, view_fields
+
+DB_FILENAME = "xseller.sqlite3"
+QUEUE_KINDS = ("shorts", "text_posts")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_items (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    queued_at TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'queued',
+    source TEXT NOT NULL DEFAULT '',
+    has_audio INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, id)
+);
+CREATE TABLE IF NOT EXISTS history (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    generated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Added after the first release; older databases get them in _add_view_columns.
+VIEW_COLUMNS = {
+    "queued_at": "TEXT NOT NULL DEFAULT ''",
+    "title": "TEXT NOT NULL DEFAULT ''",
+    "status": "TEXT NOT NULL DEFAULT 'queued'",
+    "source": "TEXT NOT NULL DEFAULT ''",
+    "has_audio": "INTEGER NOT NULL DEFAULT 0",
+}
+VIEW_INDEXES = """
+CREATE INDEX IF NOT EXISTS queue_items_queued_at ON queue_items (kind, queued_at);
+CREATE INDEX IF NOT EXISTS queue_items_title ON queue_items (kind, title);
+CREATE INDEX IF NOT EXISTS queue_items_status ON queue_items (kind, status, queued_at);
+CREATE INDEX IF NOT EXISTS queue_items_source ON queue_items (kind, source, queued_at);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SqliteStore:
+    """Queue and history tables with ``load_queue``/``write_queue``-style accessors."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+        self._add_view_columns()
+        self._conn().executescript(VIEW_INDEXES)
+
+    def _add_view_columns(self) -> None:
+        with self.transaction() as conn:
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(queue_items)")}
+            missing = [name for name in VIEW_COLUMNS if name not in existing]
+            if not missing:
+                return
+            for name in missing:
+                conn.execute(f"ALTER TABLE queue_items ADD COLUMN {name} {VIEW_COLUMNS[name]}")
+            rows = conn.execute("SELECT kind, id, payload FROM queue_items").fetchall()
+            conn.executemany(
+                "UPDATE queue_items SET queued_at = ?, title = ?, status = ?, source = ?, has_audio = ? "
+                "WHERE kind = ? AND id = ?",
+                [(*self._view_values(json.loads(payload)), kind, item_id) for kind, item_id, payload in rows],
+            )
+
+    @staticmethod
+    def _view_values(item: dict) -> Tuple:
+        fields = view_fields(item)
+        return (fields["queued_at"], fields["title"], fields["status"], fields["source"], int(fields["has_audio"]))
+
+    def _conn(self) -> sqlite3.Connection:
+        # Streamlit runs each session in its own thread; give each one a connection.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group writes into one ``BEGIN IMMEDIATE`` transaction; nested calls join it."""
+        conn = self._conn()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -- queue -----------------------------------------------------------
+
+    def load_queue(self) -> Dict[str, List[dict]]:
+        data: Dict[str, List[dict]] = {kind: [] for kind in QUEUE_KINDS}
+        rows = self._conn().execute("SELECT kind, payload FROM queue_items ORDER BY rowid")
+        for kind, payload in rows:
+            data.setdefault(kind, []).append(json.loads(payload))
+        return data
+
+    def count_items(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM queue_items").fetchone()[0]
+
+    def write_queue(self, data: Dict[str, List[dict]]) -> None:
+        """Replace the stored queue with ``data``, like :func:`xseller_ai.queue.write_queue`."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM queue_items")
+            for kind in QUEUE_KINDS:
+                self._insert_items(conn, kind, data.get(kind, []))
+
+    def get_item(self, kind: str, item_id: str) -> dict | None:
+        row = self._conn().execute(
+            "SELECT payload FROM queue_items WHERE kind = ? AND id = ?", (kind, item_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query_items(self, query: QueueQuery) -> Tuple[List[dict], int]:
+        """Items on the requested page and the number matching the filters."""
+        clauses = ["kind = ?"]
+        params: list = [query.kind]
+        for column, operator, value in (
+            ("queued_at", ">=", query.since),
+            ("queued_at", "<", query.until),
+            ("status", "=", query.status),
+            ("source", "=", query.source),
+            ("has_audio", "=", None if query.has_audio is None else int(query.has_audio)),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        where = " AND ".join(clauses)
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM queue_items WHERE {where}", params).fetchone()[0]
+        sort = query.sort if query.sort in SORT_KEYS else "queued_at"
+        direction = "DESC" if query.descending else "ASC"
+        rows = conn.execute(
+            f"SELECT payload FROM queue_items WHERE {where} ORDER BY {sort} {direction}, rowid {direction} "
+            "LIMIT ? OFFSET ?",
+            [*params, query.limit, query.offset],
+        )
+        return [json.loads(payload) for (payload,) in rows], total
+
+    def distinct(self, kind: str, column: str) -> List[str]:
+        if column not in VIEW_COLUMNS:
+            raise ValueError(f"not a view column: {column}")
+        rows = self._conn().execute(
+            f"SELECT DISTINCT {column} FROM queue_items WHERE kind = ? AND {column} != '' ORDER BY {column}",
+            (kind,),
+        )
+        return [value for (value,) in rows]
+
+    def upsert_items(self, kind: str, payloads: Iterable[dict], preserve: Iterable[str] = ()) -> None:
+        """Insert new items and ``dict.update`` existing ones, keyed by ``id``.
+
+        Fields named in ``preserve`` keep their stored value on update.
+        """
+        preserve = tuple(preserve)
+        with self.transaction() as conn:
+            for payload in payloads:
+                existing = self.get_item(kind, payload["id"])
+                merged = payload
+                if existing:
+                    merged = {**existing, **payload}
+                    merged.update({key: existing[key] for key in preserve if key in existing})
+                self._insert_items(conn, kind, [merged])
+
+    def delete_items(self, kind: str, item_ids: Iterable[str]) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
+                "DELETE FROM queue_items WHERE kind = ? AND id = ?",
+                [(kind, item_id) for item_id in item_ids],
+            )
+
+    def _insert_items(self, conn: sqlite3.Connection, kind: str, items: Iterable[dict]) -> None:
+        now = _now()
+        conn.executemany(
+            "INSERT INTO queue_items (kind, id, payload, updated_at, queued_at, title, status, source, has_audio) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(kind, id) DO UPDATE SET payload = excluded.payload, updated_at = excluded.updated_at, "
+            "queued_at = excluded.queued_at, title = excluded.title, status = excluded.status, "
+            "source = excluded.source, has_audio = excluded.has_audio",
+            [
+                (kind, item["id"], json.dumps(item), now, *self._view_values(item))
+                for item in items
+                if item.get("id")
+            ],
+        )
+
+    # -- history ---------------------------------------------------------
+
+    def iter_history(self) -> Iterator[dict]:
+        rows = self._conn().execute("SELECT payload FROM history ORDER BY rowid")
+        for (payload,) in rows:
+            yield json.loads(payload)
+
+    def load_history(self) -> List[dict]:
+        return list(self.iter_history())
+
+    def write_history(self, items: List[dict]) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM history")
+            self.add_history(items)
+
+    def has_history(self, item_id: str) -> bool:
+        row = self._conn().execute("SELECT 1 FROM history WHERE id = ?", (item_id,)).fetchone()
+        return row is not None
+
+    def add_history(self, records: Iterable[dict]) -> int:
+        """Insert records whose id is not stored yet; returns how many were added."""
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO history (id, payload, generated_at) VALUES (?, ?, ?)",
+                [
+                    (record["id"], json.dumps(record), record.get("generated_at"))
+                    for record in records
+                    if record.get("id")
+                ],
+            )
+            return conn.total_changes - before
+
+    # -- migration -------------------------------------------------------
+
+    def get_meta(self, key: str) -> str | None:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def migrate_from_json(self, queue_path: Path | None, db_path: Path | None) -> bool:
+        """Import the legacy JSON files once; returns False if already migrated."""
+        from .queue import load_history, load_queue
+
+        with self.transaction():
+            if self.get_meta("json_migrated_at"):
+                return False
+            if queue_path and queue_path.exists():
+                queue_data = load_queue(queue_path)
+                for kind in QUEUE_KINDS:
+                    self.upsert_items(kind, [item for item in queue_data[kind] if item.get("id")])
+            if db_path:
+                self.add_history(load_history(db_path))
+            self.set_meta("json_migrated_at", _now())
+        return True
+
+
+_STORES: Dict[Path, SqliteStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def store_path(data_dir: Path) -> Path:
+    return Path(data_dir) / DB_FILENAME
+
+
+def open_store(
+    data_dir: Path,
+    *,
+    queue_path: Path | None = None,
+    db_path: Path | None = None,
+) -> SqliteStore:
+    """Return the shared store for ``data_dir``, migrating JSON files on first open."""
+    path = store_path(data_dir).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = SqliteStore(path)
+            store.migrate_from_json(queue_path, db_path)
+            _STORES[path] = store
+    return store
+
+
+def main(argv: list[str] | None = None) -> None:
+    from . import settings as settings_module
+
+    parser = argparse.ArgumentParser(description="Manage the SQLite queue store.")
+    parser.add_argument("command", choices=["migrate", "stats"])
+    parser.add_argument("--data-dir", default=settings_module.settings.data_dir)
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    store = SqliteStore(store_path(data_dir))
+    if args.command == "migrate":
+        migrated = store.migrate_from_json(data_dir / "ai_shorts_queue.json", data_dir / "ai_shorts_db.json")
+        print("Migrated JSON files." if migrated else "Already migrated; nothing to do.")
+    queue_data = store.load_queue()
+    counts = {kind: len(items) for kind, items in queue_data.items()}
+    counts["history"] = len(store.load_history())
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    main()
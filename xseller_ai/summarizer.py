@@ -5,14 +5,15 @@ from dataclasses import dataclass
 from typing import Iterable, List
 
 from .rss import Article
+from . import latency, metrics, replay
 from . import settings as settings_module
 
 logger = logging.getLogger(__name__)
 
-try:
-    from openai import OpenAI  # type: ignore
-except ImportError:
-    OpenAI = None  # type: ignore
+SUMMARIES = metrics.counter("xseller_summaries_generated_total", "Scripts summarised, by method.", ("method",))
+
+# Resolved on first use so importing the pipeline does not pull in the SDK.
+OpenAI = None  # type: ignore
 
 
 @dataclass
@@ -32,6 +33,7 @@ def fallback_summary(article: Article) -> Script:
     why = sentences[0] if sentences else summary
     what = sentences[1] if len(sentences) > 1 else article.title
     nxt = sentences[2] if len(sentences) > 2 else "Watch this space for further developments."
+    SUMMARIES.labels("fallback").inc()
     return Script(
         id=article.uid,
         title=article.title,
@@ -45,6 +47,8 @@ def fallback_summary(article: Article) -> Script:
 
 def get_openai_client():
     global OpenAI  # type: ignore
+    if not settings_module.settings.openai_api_key:
+        return None
     if OpenAI is None:
         try:
             from openai import OpenAI as OpenAIClass  # type: ignore
@@ -52,8 +56,6 @@ def get_openai_client():
             logger.warning("openai package not available; install `openai` to enable summaries.")
             return None
         OpenAI = OpenAIClass
-    if not settings_module.settings.openai_api_key:
-        return None
     try:
         return OpenAI(api_key=settings_module.settings.openai_api_key)  # type: ignore
     except Exception as exc:  # noqa: BLE001
@@ -61,9 +63,21 @@ def get_openai_client():
         return None
 
 
+def _complete(client, prompt: str) -> bytes:
+    with latency.timed("openai"):
+        completion = client.responses.create(
+            model=settings_module.settings.openai_model,
+            input=prompt,
+            max_output_tokens=400,
+            temperature=0.3,
+        )
+    return completion.output[0].content[0].text.encode("utf-8")  # type: ignore[attr-defined]
+
+
 def llm_summary(article: Article) -> Script:
-    client = get_openai_client()
-    if client is None:
+    replaying = replay.replaying()
+    client = None if replaying else get_openai_client()
+    if client is None and not replaying:
         logger.warning("OpenAI client not available; using fallback summary.")
         return fallback_summary(article)
 
@@ -76,13 +90,11 @@ def llm_summary(article: Article) -> Script:
         f"Body:\n{article.summary}\n"
     )
     try:
-        completion = client.responses.create(
-            model=settings_module.settings.openai_model,
-            input=prompt,
-            max_output_tokens=400,
-            temperature=0.3,
-        )
-        content = completion.output[0].content[0].text  # type: ignore[attr-defined]
+        content = replay.through(
+            "openai",
+            [settings_module.settings.openai_model, prompt],
+            lambda: _complete(client, prompt),
+        ).decode("utf-8")
     except Exception as exc:  # noqa: BLE001
         logger.error("OpenAI summary failed: %s", exc)
         return fallback_summary(article)
@@ -95,6 +107,7 @@ def llm_summary(article: Article) -> Script:
         logger.warning("Unexpected LLM response; falling back.")
         return fallback_summary(article)
 
+    SUMMARIES.labels("llm").inc()
     return Script(
         id=article.uid,
         title=article.title,
@@ -5,14 +5,19 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from . import latency, replay
 from .settings import settings
+from .storage import atomic_write_bytes
 
 logger = logging.getLogger(__name__)
 
-try:
-    from elevenlabs import ElevenLabs  # type: ignore
-except ImportError:  # pragma: no cover
-    ElevenLabs = None  # type: ignore
+
+def _elevenlabs_class():
+    try:
+        from elevenlabs import ElevenLabs  # type: ignore
+    except ImportError:  # pragma: no cover
+        return None
+    return ElevenLabs
 
 
 def synthesize_speech(
@@ -24,31 +29,37 @@ def synthesize_speech(
     api_key: Optional[str] = None,
 ) -> Optional[Path]:
     """Generate TTS audio using ElevenLabs if credentials are available."""
-    api_key = api_key or settings.elevenlabs_api_key or os.getenv("ELEVENLABS_API_KEY")
-    if not api_key:
-        logger.warning("ELEVENLABS_API_KEY missing; skipping TTS generation.")
-        return None
-    if ElevenLabs is None:
-        logger.warning("elevenlabs package not installed; skipping TTS generation.")
-        return None
-
     voice_id = voice_id or os.getenv("ELEVENLABS_VOICE_ID", "Bella")
     model_id = model_id or os.getenv("ELEVENLABS_MODEL_ID", "eleven_turbo_v2")
+    api_key = api_key or settings.elevenlabs_api_key or os.getenv("ELEVENLABS_API_KEY")
+    client_class = None
+    if not replay.replaying():
+        if not api_key:
+            logger.warning("ELEVENLABS_API_KEY missing; skipping TTS generation.")
+            return None
+        client_class = _elevenlabs_class()
+        if client_class is None:
+            logger.warning("elevenlabs package not installed; skipping TTS generation.")
+            return None
 
-    client = ElevenLabs(api_key=api_key)
-    logger.info("Generating TTS audio with ElevenLabs voice=%s model=%s", voice_id, model_id)
+    def convert() -> bytes:
+        client = client_class(api_key=api_key)
+        logger.info("Generating TTS audio with ElevenLabs voice=%s model=%s", voice_id, model_id)
+        with latency.timed("elevenlabs"):
+            audio = client.text_to_speech.convert(
+                voice_id=voice_id,
+                model_id=model_id,
+                text=text,
+            )
+            # Streamed audio arrives while joining, so that is part of the call.
+            return audio if isinstance(audio, bytes) else b"".join(audio)
 
     try:
-        audio = client.text_to_speech.convert(
-            voice_id=voice_id,
-            model_id=model_id,
-            text=text,
-        )
+        audio = replay.through("elevenlabs", [voice_id, model_id, text], convert)
     except Exception as exc:  # noqa: BLE001
         logger.error("ElevenLabs TTS failed: %s", exc)
         return None
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("wb") as f:
-        f.write(audio)
+    # Replace rather than overwrite: the old file may be a link into the blob store.
+    atomic_write_bytes(output_path, audio)
     return output_path